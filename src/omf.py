@@ -1,14 +1,525 @@
+import time
+# The startup time is measured from here (the time taken by the Python interpreter to start is not included).
+MODULE_LOAD_TIME = time.perf_counter()
 import os
 import sys
-import winreg
-import subprocess
 import threading
 import json
-import time
-import PySimpleGUI as sg
-from watchdog.observers import Observer
-from watchdog.events import PatternMatchingEventHandler
-from copy import copy, deepcopy
+import queue
+import argparse
+import socket
+import re
+import fnmatch
+import abc
+from copy import copy
+from bisect import bisect_left, insort
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+# The GUI modules are slow to import, so they are imported only when the GUI is started (see `import_gui_modules`) and 
+# the command line commands don't have to wait for them. For the same reason, the modules which are needed only by some 
+# parts of the application (e.g. subprocess, winreg) are imported by the functions which use them.
+sg = None
+Observer = None
+
+
+def write_file_atomically(path, text) -> None:
+    # The file is replaced at once, so an interrupted write never leaves it truncated.
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+class Entry:
+    """
+    A group entry. The entries are shared between the saved and the working versions of the groups data, so they must never 
+    be modified in place; `with_changes` returns a changed copy instead.
+    """
+
+    __slots__ = ('id', 'path', 'type', 'details')
+
+    def __init__(self, entry_id, path, entry_type, details) -> None:
+        self.id = entry_id
+        self.path = path
+        # The entry types are few, so every entry refers to the same string object instead of its own copy.
+        self.type = sys.intern(entry_type)
+        self.details = details
+
+    def with_changes(self, **changes) -> 'Entry':
+        entry = Entry(self.id, self.path, self.type, self.details)
+        for name, value in changes.items():
+            setattr(entry, name, value)
+        return entry
+
+    def to_json(self) -> dict:
+        return {
+            AppData.KEY_ENTRY_ID: self.id,
+            AppData.KEY_ENTRY_PATH: self.path,
+            AppData.KEY_ENTRY_TYPE: self.type,
+            AppData.KEY_ENTRY_DETAILS: self.details
+        }
+
+    @staticmethod
+    def from_json(entry_json) -> 'Entry':
+        return Entry(
+            entry_json[AppData.KEY_ENTRY_ID], 
+            entry_json[AppData.KEY_ENTRY_PATH], 
+            entry_json[AppData.KEY_ENTRY_TYPE], 
+            entry_json[AppData.KEY_ENTRY_DETAILS])
+
+
+class ListeningFilter:
+    """
+    The files a group listens to in its directory, selected by include and exclude glob patterns (see `fnmatch`) matched
+    against the file name and the relative path. An exclude pattern also prunes the matching subdirectories.
+    """
+
+    __slots__ = ('include_patterns', 'exclude_patterns', 'recursive', '__include_regex', '__exclude_regex')
+
+    DEFAULT_INCLUDE_PATTERNS = ('*',)
+    # Temporary files (e.g. of office applications, editors and downloads) and build artifacts.
+    DEFAULT_EXCLUDE_PATTERNS = ('~$*', '.~lock.*', '*.tmp', '*.temp', '*.swp', '*.crdownload', '*.part', '*.pyc', '__pycache__', 'node_modules', '.git')
+
+    def __init__(self, include_patterns=DEFAULT_INCLUDE_PATTERNS, exclude_patterns=DEFAULT_EXCLUDE_PATTERNS, recursive=False) -> None:
+        self.include_patterns = tuple(include_patterns)
+        self.exclude_patterns = tuple(exclude_patterns)
+        self.recursive = recursive
+        self.__include_regex = self.__compile(self.include_patterns)
+        self.__exclude_regex = self.__compile(self.exclude_patterns)
+
+    def __eq__(self, other) -> bool:
+        return (isinstance(other, ListeningFilter) and self.include_patterns == other.include_patterns 
+                and self.exclude_patterns == other.exclude_patterns and self.recursive == other.recursive)
+
+    def __hash__(self) -> int:
+        return hash((self.include_patterns, self.exclude_patterns, self.recursive))
+
+    def matches(self, relative_path) -> bool:
+        name = relative_path.rpartition('/')[2]
+        if name != relative_path:
+            if not self.recursive or not self.matches_dir(relative_path.rpartition('/')[0]):
+                return False
+        if self.__exclude_regex.match(name) or self.__exclude_regex.match(relative_path):
+            return False
+        return bool(self.__include_regex.match(name) or self.__include_regex.match(relative_path))
+
+    def matches_dir(self, relative_dir_path) -> bool:
+        """Returns whether the files of the subdirectory with the given relative path may be matched."""
+
+        if not self.recursive:
+            return False
+        parent_path = ''
+        for name in relative_dir_path.split('/'):
+            parent_path += name
+            if self.__exclude_regex.match(name) or self.__exclude_regex.match(parent_path):
+                return False
+            parent_path += '/'
+        return True
+
+    def to_json(self) -> dict:
+        return {
+            AppData.KEY_LISTENING_INCLUDE_PATTERNS: list(self.include_patterns),
+            AppData.KEY_LISTENING_EXCLUDE_PATTERNS: list(self.exclude_patterns),
+            AppData.KEY_LISTENING_RECURSIVE: self.recursive
+        }
+
+    @staticmethod
+    def from_json(filter_json) -> 'ListeningFilter':
+        if filter_json is None:
+            return ListeningFilter()
+        return ListeningFilter(
+            filter_json[AppData.KEY_LISTENING_INCLUDE_PATTERNS], 
+            filter_json[AppData.KEY_LISTENING_EXCLUDE_PATTERNS], 
+            filter_json[AppData.KEY_LISTENING_RECURSIVE])
+
+    @staticmethod
+    def __compile(patterns):
+        # The file names are not case sensitive on Windows.
+        return re.compile('|'.join(fnmatch.translate(pattern) for pattern in patterns) or '(?!)', re.IGNORECASE if os.name == 'nt' else 0)
+
+
+class Group:
+    """
+    A group of entries, kept by id in display order. The entries of a group saved with the sharded or the SQLite layout are
+    read by `entries_loader` when first accessed, and `shard` identifies them (None if they were never saved that way).
+    """
+
+    __slots__ = ('id', 'name', 'listening_dir', 'listening_filter', 'shard', '__entries', '__entries_count', '__entries_loader', '__next_entry_id')
+
+    def __init__(self, group_id, name, entries, listening_dir=None, shard=None, entries_count=0, entries_loader=None, listening_filter=None) -> None:
+        self.id = group_id
+        self.name = name
+        self.listening_dir = listening_dir
+        if listening_filter is None and listening_dir is not None:
+            listening_filter = ListeningFilter()
+        self.listening_filter = listening_filter
+        self.shard = shard
+        self.__entries = None
+        self.__entries_count = entries_count
+        self.__entries_loader = entries_loader
+        self.__next_entry_id = 0
+        if entries is not None:
+            self.__set_entries(entries)
+
+    @property
+    def entries(self):
+        """The entries of the group in display order."""
+
+        return self.load_entries().values()
+
+    @property
+    def entries_by_id(self) -> dict:
+        return self.load_entries()
+
+    def load_entries(self) -> dict:
+        entries = self.__entries
+        if entries is None:
+            entries = self.__set_entries(self.__entries_loader(self))
+        return entries
+
+    def allocate_entry_id(self) -> int:
+        """Returns a new entry id, greater than the id of any entry the group had."""
+
+        self.load_entries()
+        entry_id = self.__next_entry_id
+        self.__next_entry_id += 1
+        return entry_id
+
+    def reserve_entry_id(self, entry_id) -> None:
+        """Keeps the given id from being allocated again, e.g. after the entry was added back by undoing its deletion."""
+
+        self.__next_entry_id = max(self.__next_entry_id, entry_id + 1)
+
+    def is_loaded(self) -> bool:
+        return self.__entries is not None
+
+    def get_entries_count(self) -> int:
+        entries = self.__entries
+        return self.__entries_count if entries is None else len(entries)
+
+    def unload_entries(self) -> bool:
+        """Drops the loaded entries if they can be loaded again from the group shard. Returns False if they can't."""
+
+        entries = self.__entries
+        if entries is None or self.shard is None or self.__entries_loader is None:
+            return False
+        self.__entries_count = len(entries)
+        self.__entries = None
+        return True
+
+    def copy(self) -> 'Group':
+        # The entries are shared since they are never modified in place, and they are not loaded just for copying the group.
+        entries = self.__entries
+        group_copy = Group(
+            self.id, 
+            self.name, 
+            None if entries is None else entries.values(), 
+            self.listening_dir, 
+            self.shard, 
+            self.__entries_count, 
+            self.__entries_loader,
+            self.listening_filter)
+        group_copy.__next_entry_id = self.__next_entry_id
+        return group_copy
+
+    def to_json(self) -> dict:
+        group_json = {
+            AppData.KEY_GROUP_ID: self.id,
+            AppData.KEY_GROUP_NAME: self.name,
+            AppData.KEY_GROUP_ENTRIES: [entry.to_json() for entry in self.entries]
+        }
+        if self.listening_dir is not None:
+            group_json[AppData.KEY_GROUP_LISTENING_DIR] = self.listening_dir
+            group_json[AppData.KEY_GROUP_LISTENING_FILTER] = self.listening_filter.to_json()
+        return group_json
+
+    def to_index_json(self) -> dict:
+        group_json = {
+            AppData.KEY_GROUP_ID: self.id,
+            AppData.KEY_GROUP_NAME: self.name,
+            AppData.KEY_GROUP_ENTRIES_COUNT: self.get_entries_count(),
+            AppData.KEY_GROUP_SHARD: self.shard
+        }
+        if self.listening_dir is not None:
+            group_json[AppData.KEY_GROUP_LISTENING_DIR] = self.listening_dir
+            group_json[AppData.KEY_GROUP_LISTENING_FILTER] = self.listening_filter.to_json()
+        return group_json
+
+    @staticmethod
+    def from_json(group_json, entries_loader=None) -> 'Group':
+        return Group(
+            group_json[AppData.KEY_GROUP_ID],
+            group_json[AppData.KEY_GROUP_NAME],
+            [Entry.from_json(entry_json) for entry_json in group_json[AppData.KEY_GROUP_ENTRIES]],
+            group_json.get(AppData.KEY_GROUP_LISTENING_DIR),
+            entries_loader=entries_loader,
+            listening_filter=Group.__get_listening_filter(group_json))
+
+    @staticmethod
+    def from_index_json(group_json, entries_loader) -> 'Group':
+        return Group(
+            group_json[AppData.KEY_GROUP_ID],
+            group_json[AppData.KEY_GROUP_NAME],
+            None,
+            group_json.get(AppData.KEY_GROUP_LISTENING_DIR),
+            group_json[AppData.KEY_GROUP_SHARD],
+            group_json[AppData.KEY_GROUP_ENTRIES_COUNT],
+            entries_loader,
+            Group.__get_listening_filter(group_json))
+
+    def __set_entries(self, entries) -> dict:
+        self.__entries = {entry.id: entry for entry in entries}
+        # The ids of the deleted entries are not reused, even if they were the last ones.
+        self.__next_entry_id = max(self.__next_entry_id, max(self.__entries, default=-1) + 1)
+        return self.__entries
+
+    @staticmethod
+    def __get_listening_filter(group_json):
+        # The groups saved before the listening filters were added listen with the default one.
+        if AppData.KEY_GROUP_LISTENING_DIR not in group_json:
+            return None
+        return ListeningFilter.from_json(group_json.get(AppData.KEY_GROUP_LISTENING_FILTER))
+
+
+class SearchIndex:
+    """
+    In-memory index of the words of the group names and of the entry paths and details. Each word of a query matches the
+    words which start with it, and a group matches if its name or one of its entries matches all the words.
+    """
+
+    # How many set operations (in C) take the time of checking the words of a found document.
+    FILTER_COST_RATIO = 10
+    # The prefixes up to this length keep their groups.
+    MAX_GROUPS_PREFIX_LENGTH = 2
+    # The most documents of the most selective query word for which the groups are searched by the matching documents.
+    MAX_GROUPS_SEED_DOCUMENTS = 10000
+
+    def __init__(self) -> None:
+        # The (group_id, entry_id) of the documents, with None as the entry_id of the group name. Key:document, Value:tuple
+        self.__document_keys = dict()
+        # Key:(group_id, entry_id), Value:document
+        self.__documents = dict()
+        self.__next_document = 0
+        # Key:word, Value:set[document]
+        self.__documents_by_word = dict()
+        self.__sorted_words = []
+        # The words of each document, each one preceded by a space, so the words starting with a prefix are found as " <prefix>".
+        # Key:document, Value:str
+        self.__words_by_document = dict()
+        # Key:group_id, Value:set[document]
+        self.__documents_by_group = dict()
+        # Key:word, Value:dict[group_id, number of documents]
+        self.__groups_by_word = dict()
+        # Key:prefix, Value:dict[group_id, number of words of the documents]
+        self.__groups_by_prefix = dict()
+
+    @staticmethod
+    def get_words(text) -> set:
+        # The underscores separate words too, as in the file names.
+        return set(re.findall(r'[^\W_]+', text.lower()))
+
+    @staticmethod
+    def matches(query_words, text) -> bool:
+        """Returns True if each of the query words starts a word of the text."""
+
+        words = SearchIndex.get_words(text)
+        return all(any(word.startswith(query_word) for word in words) for query_word in query_words)
+
+    def add_group(self, group, entries=None) -> None:
+        """Adds the name and the entries of the group, or the given entries instead (e.g. read without loading the group)."""
+
+        self.set_group_name(group.id, group.name)
+        for entry in (group.entries if entries is None else entries):
+            self.add_entry(group.id, entry)
+
+    def remove_group(self, group_id) -> None:
+        document_keys = self.__document_keys
+        for document in list(self.__documents_by_group.get(group_id, ())):
+            self.__remove(document_keys[document])
+
+    def set_group_name(self, group_id, group_name) -> None:
+        self.__add((group_id, None), group_name)
+
+    def add_entry(self, group_id, entry) -> None:
+        """Adds the entry, or updates it if it was already added."""
+
+        self.__add((group_id, entry.id), f'{entry.path} {entry.details}')
+
+    def remove_entry(self, group_id, entry_id) -> None:
+        self.__remove((group_id, entry_id))
+
+    def search_entries(self, query, group_id) -> set:
+        """Returns the ids of the entries of the group which match the query."""
+
+        query_words = self.get_words(query)
+        # The documents of the group are only read, since each step makes a new set.
+        group_documents = self.__documents_by_group.get(group_id)
+        if not query_words or group_documents is None:
+            return set()
+        document_keys = self.__document_keys
+        found_entry_ids = {document_keys[document][1] for document in self.__narrow(self.__get_candidates(query_words), group_documents)}
+        found_entry_ids.discard(None)
+        return found_entry_ids
+
+    def search_groups(self, query) -> set:
+        """Returns the ids of the groups whose name or one of the entries match the query."""
+
+        query_words = self.get_words(query)
+        found_group_ids = set()
+        # The longer words usually have fewer groups.
+        for index, query_word in enumerate(sorted(query_words, key=len, reverse=True)):
+            if len(query_word) <= self.MAX_GROUPS_PREFIX_LENGTH:
+                group_ids = self.__groups_by_prefix.get(query_word, ())
+            else:
+                group_ids = set()
+                groups_by_word = self.__groups_by_word
+                sorted_words = self.__sorted_words
+                for word_index in range(*self.__find_prefixed_range(query_word)):
+                    group_ids.update(groups_by_word[sorted_words[word_index]])
+            found_group_ids = set(group_ids) if index == 0 else found_group_ids.intersection(group_ids)
+            if not found_group_ids:
+                return found_group_ids
+        if len(query_words) <= 1:
+            return found_group_ids
+        # The words may be in different documents of a group, so the groups are searched for a document having all of them.
+        candidates = self.__get_candidates(query_words)
+        if min(documents_count for documents_count, _ in candidates.values()) <= self.MAX_GROUPS_SEED_DOCUMENTS:
+            document_keys = self.__document_keys
+            return {document_keys[document][0] for document in self.__narrow(candidates, None)}
+        # Many documents have all the words, so the first one is usually found soon in each group.
+        words_by_document = self.__words_by_document
+        spaced_query_words = [' ' + query_word for query_word in query_words]
+        return {group_id for group_id in found_group_ids if any(
+            all(spaced_query_word in words_by_document[document] for spaced_query_word in spaced_query_words) 
+            for document in self.__documents_by_group[group_id])}
+
+    def __add(self, document_key, text) -> None:
+        self.__remove(document_key)
+        words = self.get_words(text)
+        group_id = document_key[0]
+        document = self.__next_document
+        self.__next_document += 1
+        self.__documents[document_key] = document
+        self.__document_keys[document] = document_key
+        self.__words_by_document[document] = ''.join(' ' + word for word in words)
+        self.__documents_by_group.setdefault(group_id, set()).add(document)
+        documents_by_word = self.__documents_by_word
+        groups_by_word = self.__groups_by_word
+        groups_by_prefix = self.__groups_by_prefix
+        for word in words:
+            documents = documents_by_word.get(word)
+            if documents is None:
+                documents = documents_by_word[word] = set()
+                groups_by_word[word] = dict()
+                insort(self.__sorted_words, word)
+            documents.add(document)
+            word_groups = groups_by_word[word]
+            word_groups[group_id] = word_groups.get(group_id, 0) + 1
+            for length in range(1, min(len(word), self.MAX_GROUPS_PREFIX_LENGTH) + 1):
+                prefix_groups = groups_by_prefix.setdefault(word[:length], dict())
+                prefix_groups[group_id] = prefix_groups.get(group_id, 0) + 1
+
+    def __remove(self, document_key) -> None:
+        document = self.__documents.pop(document_key, None)
+        if document is None:
+            return
+        del self.__document_keys[document]
+        words = self.__words_by_document.pop(document)
+        group_id = document_key[0]
+        group_documents = self.__documents_by_group[group_id]
+        group_documents.discard(document)
+        if not group_documents:
+            del self.__documents_by_group[group_id]
+        documents_by_word = self.__documents_by_word
+        groups_by_word = self.__groups_by_word
+        groups_by_prefix = self.__groups_by_prefix
+        for word in words.split():
+            documents = documents_by_word[word]
+            documents.discard(document)
+            if not documents:
+                del documents_by_word[word]
+                del groups_by_word[word]
+                del self.__sorted_words[bisect_left(self.__sorted_words, word)]
+            else:
+                self.__decrement(groups_by_word[word], group_id)
+            for length in range(1, min(len(word), self.MAX_GROUPS_PREFIX_LENGTH) + 1):
+                prefix = word[:length]
+                if not self.__decrement(groups_by_prefix[prefix], group_id):
+                    del groups_by_prefix[prefix]
+
+    def __get_candidates(self, query_words) -> dict:
+        """Returns the prefixed words of the query words. Key:query_word, Value:(number of documents of its prefixed words, range of its prefixed words)"""
+
+        documents_by_word = self.__documents_by_word
+        sorted_words = self.__sorted_words
+        candidates = dict()
+        for query_word in query_words:
+            words_range = self.__find_prefixed_range(query_word)
+            candidates[query_word] = (sum(len(documents_by_word[sorted_words[index]]) for index in range(*words_range)), words_range)
+        return candidates
+
+    def __narrow(self, candidates, found_documents) -> set:
+        """Returns the documents (of the given ones, if any) having prefixed words of all the query words."""
+
+        documents_by_word = self.__documents_by_word
+        sorted_words = self.__sorted_words
+        words_by_document = self.__words_by_document
+        # The words with fewer documents narrow the results first.
+        sorted_candidates = sorted(candidates.items(), key=lambda item: item[1][0])
+        if found_documents is None and len(sorted_candidates) > 1:
+            first_range = range(*sorted_candidates[0][1][1])
+            second_range = range(*sorted_candidates[1][1][1])
+            if len(first_range) * len(second_range) <= self.FILTER_COST_RATIO ** 2:
+                # The documents of the two most selective words are intersected by pairs of their prefixed words, which is 
+                # faster than collecting the documents of the first one.
+                found_documents = set()
+                for first_index in first_range:
+                    first_documents = documents_by_word[sorted_words[first_index]]
+                    for second_index in second_range:
+                        found_documents |= first_documents & documents_by_word[sorted_words[second_index]]
+                sorted_candidates = sorted_candidates[2:]
+        for query_word, (documents_count, words_range) in sorted_candidates:
+            if found_documents is None:
+                found_documents = set()
+                for index in range(*words_range):
+                    found_documents |= documents_by_word[sorted_words[index]]
+            elif words_range[1] - words_range[0] < self.FILTER_COST_RATIO or documents_count < self.FILTER_COST_RATIO * len(found_documents):
+                # Each intersection takes the time of the smaller set, so the documents of the prefixed words are not copied.
+                prefixed_documents = set()
+                for index in range(*words_range):
+                    prefixed_documents |= found_documents & documents_by_word[sorted_words[index]]
+                found_documents = prefixed_documents
+            else:
+                # Checking the words of each found document is cheaper than collecting the many documents of the word.
+                spaced_query_word = ' ' + query_word
+                found_documents = {document for document in found_documents if spaced_query_word in words_by_document[document]}
+            if not found_documents:
+                break
+        return found_documents
+
+    @staticmethod
+    def __decrement(counts, key) -> bool:
+        """Decrements the count of the key, removing it at zero. Returns False if no key is left."""
+
+        count = counts[key] - 1
+        if count:
+            counts[key] = count
+        else:
+            del counts[key]
+        return bool(counts)
+
+    def __find_prefixed_range(self, prefix) -> tuple:
+        """Returns the range of indexes of the sorted words which start with the prefix."""
+
+        sorted_words = self.__sorted_words
+        start = bisect_left(sorted_words, prefix)
+        end = start
+        while end < len(sorted_words) and sorted_words[end].startswith(prefix):
+            end += 1
+        return (start, end)
 
 
 class AppData:
@@ -16,10 +527,9 @@ class AppData:
     Class for managing the application data.
 
     Groups data format:
-        The groups data consists of a list of groups. Each group is a key-value type of structure which contains the group id, name, 
-        entries and the path to the directory to listen. The entries value in the group structure is a list of key-value type of
-        structure elements, each one representing a group entry. Each group entry structure contains the entry id, path/address,
-        type (executable/web address/other file) and details.
+        The groups data consists of a dict of `Group` objects by id, in display order. Each group contains the group id, name,
+        `Entry` objects by id and the directory to listen. The ids never change, and the groups and entries are shared with 
+        the saved version of the data until changed, so they must be changed only through the `AppData` methods.
 
         JSON Format:
         ```
@@ -36,12 +546,51 @@ class AppData:
                     },
                     ...
                 ],
-                "group_listening_dir": <type_str>
+                "group_listening_dir": <type_str>,
+                "group_listening_filter": {
+                    "include_patterns": [<type_str>, ...],
+                    "exclude_patterns": [<type_str>, ...],
+                    "recursive": <type_bool>
+                }
+            },
+            ...
+        ]
+        ```
+
+        Each save appends the changed groups to a journal next to the JSON file, which is compacted in the background:
+        ```
+        {"set": [<group>, ...], "delete": [<group_id>, ...]}
+        ```
+
+    Sharded storage layout:
+        With the `storage_layout` setting set to "sharded", an index holds the groups without their entries, and the entries
+        of each group are saved in a separate shard which is read when first needed.
+
+        Index format:
+        ```
+        [
+            {
+                "group_id": <type_int>,
+                "group_name": <type_str>,
+                "group_entries_count": <type_int>,
+                "group_shard": <type_str>,
+                "group_listening_dir": <type_str>,
+                "group_listening_filter": <listening_filter>
             },
             ...
         ]
         ```
 
+    SQLite storage layout:
+        With the `storage_layout` setting set to "sqlite", the groups are saved in a SQLite database, and each save writes only
+        the rows of the changed groups in a single transaction.
+
+        Schema:
+        ```
+        groups(group_key INTEGER PRIMARY KEY, group_id INTEGER, group_name TEXT, group_listening_dir TEXT, group_listening_filter TEXT)
+        entries(group_key INTEGER, entry_id INTEGER, entry_path TEXT, entry_type TEXT, entry_details TEXT)
+        ```
+
     Settings data format:
         Settings are stored simply in a key-value type of structure where each entry in the structure consists of the setting name (key)
         and the setting value.
@@ -55,68 +604,3289 @@ class AppData:
         ```
     """
 
-    ICON_EXE_FILE = b'iVBORw0KGgoAAAANSUhEUgAAABAAAAAQCAYAAAAf8/9hAAAAAXNSR0IArs4c6QAAAItJREFUOE/tksENg0AMBGfrCKUkBSAKQIg/PYU/6SAdIBqBPhYZiSiPiOguPOOPJd/teGVb/BiyXQF34JLIWoAuADNQS5pSALavwCMAlhT5GQXAQCspnB3Gpt0B3z5/en8BcsS75hwHMYMcF+fN4O9gO+VG0piyCds3YIg7KIEeKFIAQDTusvb/3mgFDG1uMt84gY0AAAAASUVORK5CYII='
-    ICON_OTHER_FILE = b'iVBORw0KGgoAAAANSUhEUgAAABAAAAAQCAYAAAAf8/9hAAAAAXNSR0IArs4c6QAAAL9JREFUOE/lkz0KAjEQRt93DkWw0M4jWFiKBxBFsPMaeg1txTt4APEQCiJ6kE8C2SUbVt3GyjSTTCZvfjIj4rI9AbZAq9Al8g6MJAVZWUoAT2Aq6Zwb2d4AyzpICrCk8pxCImANPCLkVtw3BSyAfXxUSacpINjNgUGEhFS7Yd8IUFOTMt3fAGxfgF7m+SqpH3S2/ymCMu+ssX5cg5phqqje/UIYppmk0yeA7SFwkNTJO3EM7ID2lwiCo5WkY7B7ATUxkhEHIy87AAAAAElFTkSuQmCC'
-    ICON_WEB_PAGE = b'iVBORw0KGgoAAAANSUhEUgAAABAAAAAQCAYAAAAf8/9hAAAAAXNSR0IArs4c6QAAAa5JREFUOE+d08uLDmAUx/HP2bgtJn8CWQkhFhYyyiUsxUrKLWwkk5KNZmyk3BZqmolmZSNrNOOWKGUi5bIS/gEiuS6Oztvz6u0tNTmb09Nznu85v/OcE/osM5fhADZgQbt+jzu4EhEve59E95CZs3ER2zEXT/Gh3RdoNb7jBoYi4lfddQDt8S18xDWcx4oKbIACP8dx7MJ8bC1IFzCK3XiBeS3LBZxogLMNthNfG3wiIo5E03wfi7EZV/EWC7sVVpF4h0XYhym8wWABLlXpEXE6M6txpyJisEk709EZcbKdH2IkIu5m5jAGCvAKByPicWYewsqIONweVFABOj4zx/AsIsYycy1GC/AFpbc6vB5zcLtp39h8fWHZFvzAg/ZTQ13ARAOsaYAKKKssZY+aL2k/8aQB9vZLqNJLQkmpkvsljGM6IsZ7JVQTP0XEyAybOBwR93qbuLRp+p9vXNcdpMvYM4NB2oFvWF7zEhFHu4BZuInPbZTPVS9w7B+jPIBtEfG7d5kKUjtQWWqcp1FbWFZTuaplv147UY//LlML6rjMXIL92NS3zpOt7Ne98X8AKibG9Jc6ezQAAAAASUVORK5CYII='
+    ICON_EXE_FILE = b'iVBORw0KGgoAAAANSUhEUgAAABAAAAAQCAYAAAAf8/9hAAAAAXNSR0IArs4c6QAAAItJREFUOE/tksENg0AMBGfrCKUkBSAKQIg/PYU/6SAdIBqBPhYZiSiPiOguPOOPJd/teGVb/BiyXQF34JLIWoAuADNQS5pSALavwCMAlhT5GQXAQCspnB3Gpt0B3z5/en8BcsS75hwHMYMcF+fN4O9gO+VG0piyCds3YIg7KIEeKFIAQDTusvb/3mgFDG1uMt84gY0AAAAASUVORK5CYII='
+    ICON_OTHER_FILE = b'iVBORw0KGgoAAAANSUhEUgAAABAAAAAQCAYAAAAf8/9hAAAAAXNSR0IArs4c6QAAAL9JREFUOE/lkz0KAjEQRt93DkWw0M4jWFiKBxBFsPMaeg1txTt4APEQCiJ6kE8C2SUbVt3GyjSTTCZvfjIj4rI9AbZAq9Al8g6MJAVZWUoAT2Aq6Zwb2d4AyzpICrCk8pxCImANPCLkVtw3BSyAfXxUSacpINjNgUGEhFS7Yd8IUFOTMt3fAGxfgF7m+SqpH3S2/ymCMu+ssX5cg5phqqje/UIYppmk0yeA7SFwkNTJO3EM7ID2lwiCo5WkY7B7ATUxkhEHIy87AAAAAElFTkSuQmCC'
+    ICON_WEB_PAGE = b'iVBORw0KGgoAAAANSUhEUgAAABAAAAAQCAYAAAAf8/9hAAAAAXNSR0IArs4c6QAAAa5JREFUOE+d08uLDmAUx/HP2bgtJn8CWQkhFhYyyiUsxUrKLWwkk5KNZmyk3BZqmolmZSNrNOOWKGUi5bIS/gEiuS6Oztvz6u0tNTmb09Nznu85v/OcE/osM5fhADZgQbt+jzu4EhEve59E95CZs3ER2zEXT/Gh3RdoNb7jBoYi4lfddQDt8S18xDWcx4oKbIACP8dx7MJ8bC1IFzCK3XiBeS3LBZxogLMNthNfG3wiIo5E03wfi7EZV/EWC7sVVpF4h0XYhym8wWABLlXpEXE6M6txpyJisEk709EZcbKdH2IkIu5m5jAGCvAKByPicWYewsqIONweVFABOj4zx/AsIsYycy1GC/AFpbc6vB5zcLtp39h8fWHZFvzAg/ZTQ13ARAOsaYAKKKssZY+aL2k/8aQB9vZLqNJLQkmpkvsljGM6IsZ7JVQTP0XEyAybOBwR93qbuLRp+p9vXNcdpMvYM4NB2oFvWF7zEhFHu4BZuInPbZTPVS9w7B+jPIBtEfG7d5kKUjtQWWqcp1FbWFZTuaplv147UY//LlML6rjMXIL92NS3zpOt7Ne98X8AKibG9Jc6ezQAAAAASUVORK5CYII='
+
+    ENTRY_EXE_FILE = 'executable'
+    ENTRY_OTHER_FILE = 'other'
+    ENTRY_WEB_PAGE = 'web_page'
+
+    KEY_GROUP_ID = 'group_id'
+    KEY_GROUP_NAME = 'group_name'
+    KEY_GROUP_LISTENING_DIR = 'group_listening_dir'
+    KEY_GROUP_ENTRIES = 'group_entries'
+    KEY_GROUP_ENTRIES_COUNT = 'group_entries_count'
+    KEY_GROUP_SHARD = 'group_shard'
+    KEY_GROUP_LISTENING_FILTER = 'group_listening_filter'
+    KEY_LISTENING_INCLUDE_PATTERNS = 'include_patterns'
+    KEY_LISTENING_EXCLUDE_PATTERNS = 'exclude_patterns'
+    KEY_LISTENING_RECURSIVE = 'recursive'
+    KEY_ENTRY_ID = 'entry_id'
+    KEY_ENTRY_PATH = 'entry_path'
+    KEY_ENTRY_TYPE = 'entry_type'
+    KEY_ENTRY_DETAILS = 'entry_details'
+    KEY_SETTING_START_WITH_WINDOWS = 'start_with_windows'
+    KEY_SETTING_AUTO_SAVE = 'auto_save'
+    KEY_SETTING_LISTENING_BATCH_WINDOW_MS = 'listening_batch_window_ms'
+    KEY_SETTING_LISTENING_MAX_QUEUE_DEPTH = 'listening_max_queue_depth'
+    KEY_SETTING_OPENING_MAX_WORKERS = 'opening_max_workers'
+    KEY_SETTING_OPENING_ENTRY_TIMEOUT_S = 'opening_entry_timeout_s'
+    KEY_SETTING_TREE_REBUILD_RATIO = 'tree_rebuild_ratio'
+    KEY_SETTING_VIRTUAL_TREE_THRESHOLD = 'virtual_tree_threshold'
+    KEY_SETTING_AUTO_SAVE_DEBOUNCE_S = 'auto_save_debounce_s'
+    KEY_SETTING_AUTO_SAVE_MAX_LATENCY_S = 'auto_save_max_latency_s'
+    KEY_SETTING_STORAGE_LAYOUT = 'storage_layout'
+    KEY_SETTING_LOADED_GROUPS_CACHE_SIZE = 'loaded_groups_cache_size'
+    KEY_SETTING_OPERATION_LOG_MAX_SIZE = 'operation_log_max_size'
+    KEY_SETTING_FOLDER_IMPORT_MAX_WORKERS = 'folder_import_max_workers'
+    KEY_SETTING_FOLDER_IMPORT_BATCH_SIZE = 'folder_import_batch_size'
+    KEY_SETTING_HEALTH_CHECK_MAX_WORKERS = 'health_check_max_workers'
+    KEY_SETTING_HEALTH_CHECK_TIMEOUT_S = 'health_check_timeout_s'
+    KEY_SETTING_HEALTH_CHECK_TTL_S = 'health_check_ttl_s'
+    KEY_SETTING_LAUNCH_ORDER = 'launch_order'
+    KEY_SETTING_EVENT_LOOP_PROFILING = 'event_loop_profiling'
+    KEY_SETTING_SLOW_HANDLER_THRESHOLD_MS = 'slow_handler_threshold_ms'
+
+    STORAGE_LAYOUT_SINGLE_FILE = 'single_file'
+    STORAGE_LAYOUT_SHARDED = 'sharded'
+    STORAGE_LAYOUT_SQLITE = 'sqlite'
+    LAUNCH_ORDER_STORED = 'stored'
+    LAUNCH_ORDER_SLOWEST_FIRST = 'slowest_first'
+    DEFAULT_LOADED_GROUPS_CACHE_SIZE = 32
+
+    # The journal is compacted once it gets bigger than the snapshot, but never before reaching this size.
+    JOURNAL_MIN_COMPACTION_SIZE = 64 * 1024
+
+    DATABASE_SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS groups (
+            group_key INTEGER PRIMARY KEY,
+            group_id INTEGER NOT NULL,
+            group_name TEXT NOT NULL,
+            group_listening_dir TEXT,
+            group_listening_filter TEXT
+        );
+        CREATE TABLE IF NOT EXISTS entries (
+            group_key INTEGER NOT NULL REFERENCES groups(group_key),
+            entry_id INTEGER NOT NULL,
+            entry_path TEXT NOT NULL,
+            entry_type TEXT NOT NULL,
+            entry_details TEXT NOT NULL,
+            PRIMARY KEY (group_key, entry_id)
+        );
+        CREATE INDEX IF NOT EXISTS groups_group_id ON groups(group_id);
+        CREATE INDEX IF NOT EXISTS groups_listening_dir ON groups(group_listening_dir);
+        CREATE INDEX IF NOT EXISTS entries_entry_path ON entries(entry_path, group_key);
+    '''
+
+    def __init__(self, groups_path, settings_path) -> None:
+        self.groups_path = groups_path
+        self.journal_path = os.path.splitext(groups_path)[0] + '.journal'
+        self.__compacting_journal_path = self.journal_path + '.compacting'
+        self.shards_dir_path = os.path.splitext(groups_path)[0]
+        self.shards_index_path = os.path.join(self.shards_dir_path, 'index.json')
+        self.database_path = os.path.splitext(groups_path)[0] + '.sqlite3'
+        self.listening_snapshots_path = os.path.join(os.path.split(groups_path)[0], 'listening_snapshots.json')
+        self.listening_snapshots = ListeningSnapshots()
+        # The storage layout of the data files the groups data was loaded from (and is saved to, until the setting changes).
+        self.__loaded_layout = AppData.STORAGE_LAYOUT_SINGLE_FILE
+        # The groups whose entries were loaded from their shards, from the least to the most recently used. Key:Group, Value:None
+        self.__loaded_groups = OrderedDict()
+        self.__journal_lock = threading.Lock()
+        self.__compaction_thread = None
+        self.__snapshot_size = 0
+        self.__journal_size = 0
+        # Key:group_id, Value:Group. Ordered as shown.
+        self.__saved_groups_data = dict()
+        self.groups_data = dict()
+        # Ids of the groups whose working version is not shared with the saved one (including added and removed groups).
+        self.__dirty_group_ids = set()
+        # Ids of the changed groups which are also kept by the operation log, so they are copied before being changed again.
+        self.__shared_group_ids = set()
+        self.__next_group_id = 0
+        self.operation_log = OperationLog()
+        # The operation which records the changes made by `recording_operation`, if any.
+        self.__pending_operation = None
+        self.__data_lock = threading.RLock()
+        # Key:listening_dir, Value:set[group_id]
+        self.__listening_dir_index = dict()
+        # Key:group_id, Value:dict[entry_path, entry_id]
+        self.__entry_path_index = dict()
+        # Built in the background by `start_search_indexing`, and kept up to date from the start.
+        self.__search_index = None
+        self.__search_index_ready = False
+        self.__on_search_index_ready = None
+        self.settings_path = settings_path
+        self.__saved_settings = dict()
+        self.settings = dict()
+        # List of actions which will be performed after each change of the groups data or settings (from the changing thread). list[action()]
+        self.on_change_actions = []
+
+    def load_groups_data(self):
+        self.__load_listening_snapshots()
+        self.__loaded_groups.clear()
+        self.__loaded_layout = self.__get_saved_layout()
+        if self.__loaded_layout == AppData.STORAGE_LAYOUT_SHARDED:
+            saved_groups = [Group.from_index_json(group_json, self.__load_group_entries) for group_json in self.__read_shards_index()]
+            self.__remove_unused_shards(saved_groups)
+        elif self.__loaded_layout == AppData.STORAGE_LAYOUT_SQLITE:
+            saved_groups = self.__read_database_groups(self.__load_group_entries)
+        else:
+            groups_json = self.__read_snapshot()
+            if os.path.isfile(self.groups_path):
+                self.__snapshot_size = os.path.getsize(self.groups_path)
+            # A journal left by an interrupted compaction holds records older than the ones in the current journal. Replaying 
+            # it again over a snapshot which may already contain it is harmless since the records are absolute assignments.
+            self.__replay_journal(self.__compacting_journal_path, groups_json)
+            self.__journal_size = self.__replay_journal(self.journal_path, groups_json)
+            saved_groups = [Group.from_json(group_json, self.__load_group_entries) for group_json in groups_json.values()]
+        self.__saved_groups_data = {group.id: group for group in saved_groups}
+        self.groups_data = copy(self.__saved_groups_data)
+        self.__dirty_group_ids.clear()
+        self.__shared_group_ids.clear()
+        self.__next_group_id = max(self.groups_data, default=-1) + 1
+        self.operation_log.clear()
+        self.__listening_dir_index.clear()
+        self.__entry_path_index.clear()
+        with self.__data_lock:
+            self.__search_index = None
+            self.__search_index_ready = False
+        for group in self.groups_data.values():
+            self.__index_group(group)
+        if self.__on_search_index_ready is not None:
+            self.start_search_indexing(self.__on_search_index_ready)
+        if os.path.isfile(self.__compacting_journal_path):
+            self.__start_compaction()
+
+    def read_saved_groups(self) -> list:
+        """
+        Returns the saved groups without loading them and without changing the data files, so it can be used while the 
+        application may be running (e.g. by the command line commands, which need only a few groups). With the sharded 
+        storage layout, the entries of a returned group are read from its shard only when they are accessed.
+        """
+
+        saved_layout = self.__get_saved_layout()
+        if saved_layout == AppData.STORAGE_LAYOUT_SHARDED:
+            return [Group.from_index_json(group_json, lambda group: self.__read_shard(group.shard)) for group_json in self.__read_shards_index()]
+        if saved_layout == AppData.STORAGE_LAYOUT_SQLITE:
+            return self.__read_database_groups(lambda group: self.__read_database_entries(group.shard), read_only=True)
+        while True:
+            snapshot_mtime = self.__get_snapshot_mtime()
+            groups_json = self.__read_snapshot()
+            self.__replay_journal(self.__compacting_journal_path, groups_json, drop_torn_record=False)
+            self.__replay_journal(self.journal_path, groups_json, drop_torn_record=False)
+            # A compaction finished meanwhile may have removed journal records which are not in the snapshot read above.
+            if self.__get_snapshot_mtime() == snapshot_mtime:
+                return [Group.from_json(group_json) for group_json in groups_json.values()]
+
+    def find_saved_group(self, group_name):
+        """Returns the saved group with the given name, with its entries loaded, or None if there is no such group (see `read_saved_groups`)."""
+
+        while True:
+            group = next((group for group in self.read_saved_groups() if group.name == group_name), None)
+            if group is None:
+                return None
+            try:
+                group.load_entries()
+                return group
+            except (FileNotFoundError, KeyError):
+                # The entries were replaced by a save made after the groups were read, so the groups are read again.
+                continue
+
+    def read_saved_groups_json(self) -> list:
+        """Returns all the saved groups in the JSON format of the single file layout (see `read_saved_groups`)."""
+
+        if self.__get_saved_layout() == AppData.STORAGE_LAYOUT_SQLITE:
+            # The groups and their entries are read in a single transaction, so they are consistent with each other.
+            with self.__connect_database(read_only=True) as connection:
+                groups = self.__read_database_groups(None, connection=connection)
+                entries = dict()
+                for group_key, *entry_row in connection.execute(
+                        'SELECT group_key, entry_id, entry_path, entry_type, entry_details FROM entries ORDER BY group_key, entry_id'):
+                    entries.setdefault(group_key, []).append(Entry(*entry_row))
+            return [Group(group.id, group.name, entries.get(group.shard, []), group.listening_dir, listening_filter=group.listening_filter).to_json() 
+                    for group in groups]
+        while True:
+            try:
+                return [group.to_json() for group in self.read_saved_groups()]
+            except (FileNotFoundError, KeyError):
+                continue
+
+    def load_settings(self):
+        if os.path.isfile(self.settings_path):
+            with open(self.settings_path, 'r') as f:
+                self.__saved_settings = json.load(f)
+                self.settings = dict(self.__saved_settings)
+
+    def save_group_data(self):
+        self.__save_listening_snapshots()
+        layout = self.settings.get(AppData.KEY_SETTING_STORAGE_LAYOUT, AppData.STORAGE_LAYOUT_SINGLE_FILE)
+        if layout != self.__loaded_layout:
+            self.__migrate_groups_data(layout)
+            return
+        if layout == AppData.STORAGE_LAYOUT_SHARDED:
+            self.__save_shards()
+            return
+        if layout == AppData.STORAGE_LAYOUT_SQLITE:
+            self.__save_database()
+            return
+        with self.__data_lock:
+            if not self.__dirty_group_ids:
+                return
+            # The new groups have greater ids than the other ones, so they are appended in display order.
+            dirty_group_ids = sorted(self.__dirty_group_ids)
+            changed_groups = [self.groups_data[group_id] for group_id in dirty_group_ids if group_id in self.groups_data]
+            deleted_group_ids = [group_id for group_id in dirty_group_ids if group_id not in self.groups_data]
+            # The saved groups are never modified in place, only replaced, so a compaction running in the background can safely 
+            # serialize a shallow copy of them. From now on, the saved groups are shared again with the working ones.
+            new_saved = copy(self.__saved_groups_data)
+            for group_id in deleted_group_ids:
+                new_saved.pop(group_id, None)
+            self.__put_by_id(new_saved, [(group.id, group) for group in changed_groups])
+            previous_save_point = self.__take_save_point()
+        try:
+            changed_groups_json = [group.to_json() for group in changed_groups]
+            record = (json.dumps({'set': changed_groups_json, 'delete': deleted_group_ids}, separators=(',', ':')) + '\n').encode('utf-8')
+
+            os.makedirs(os.path.split(self.groups_path)[0], exist_ok=True)
+            with self.__journal_lock:
+                with open(self.journal_path, 'ab', buffering=0) as f:
+                    try:
+                        if f.write(record) != len(record):
+                            raise OSError('The journal record was not completely written')
+                        os.fsync(f.fileno())
+                    except BaseException:
+                        # A partly written record would stop the replay before the next records, so it's dropped.
+                        os.ftruncate(f.fileno(), self.__journal_size)
+                        raise
+                self.__journal_size += len(record)
+                self.__saved_groups_data = new_saved
+        except BaseException:
+            self.__restore_save_point(previous_save_point)
+            raise
+        if self.__journal_size > max(self.__snapshot_size, AppData.JOURNAL_MIN_COMPACTION_SIZE):
+            self.__start_compaction()
+    
+    def save_settings(self):
+        settings = dict(self.settings)
+        os.makedirs(os.path.split(self.settings_path)[0], exist_ok=True)
+        self.__write_json_file(self.settings_path, settings)
+        self.__saved_settings = settings
+
+    def change_setting(self, setting_name, value) -> None:
+        self.settings[setting_name] = value
+        self.__notify_changed()
+
+    def revert_changes(self):
+        with self.__data_lock:
+            # The reverted operations can be redone, unless the log doesn't reach the save point anymore.
+            self.operation_log.rewind_to_save_point()
+            saved = self.__saved_groups_data
+            for group_id in self.__dirty_group_ids:
+                if group_id in self.groups_data:
+                    self.__unindex_group(self.groups_data[group_id])
+            # The deleted groups are shown again in their place.
+            self.groups_data.clear()
+            self.groups_data.update(saved)
+            for group_id in self.__dirty_group_ids:
+                if group_id in saved:
+                    self.__index_group(saved[group_id])
+            self.__dirty_group_ids.clear()
+            self.__shared_group_ids.clear()
+        # The saved snapshots match the saved groups, so the reverted changes are found again by the next reconciliation.
+        self.__load_listening_snapshots()
+        self.settings = dict(self.__saved_settings)
+
+    def has_unsaved_changes(self) -> bool:
+        return bool(self.__dirty_group_ids) or self.settings != self.__saved_settings
+
+    def get_groups_listening_to(self, listening_dir) -> list:
+        """Returns the ids of the groups listening to the given directory."""
+
+        return list(self.__listening_dir_index.get(listening_dir, ()))
+
+    def start_search_indexing(self, on_ready) -> None:
+        """
+        Builds the search index in a background thread and then calls `on_ready` (from that thread). The entries of the groups 
+        which are not loaded are read from the data files without loading them. The index is built again the same way 
+        whenever the groups data is loaded again.
+        """
+
+        with self.__data_lock:
+            self.__on_search_index_ready = on_ready
+            search_index = self.__search_index = SearchIndex()
+            self.__search_index_ready = False
+            groups = list(self.groups_data.values())
+        threading.Thread(target=self.__async_building_search_index, args=(search_index, groups), daemon=True).start()
+
+    def search_groups(self, query):
+        """
+        Returns the ids of the groups whose name or entries match the query (see `SearchIndex`), or None if the groups can't be 
+        searched until the search index is built. With the SQLite storage layout, the saved entries are searched in the 
+        database until then.
+        """
+
+        with self.__data_lock:
+            if self.__search_index_ready:
+                return self.__search_index.search_groups(query)
+            if self.__loaded_layout != AppData.STORAGE_LAYOUT_SQLITE:
+                return None
+            query_words = SearchIndex.get_words(query)
+            if not query_words:
+                return set()
+            found_group_ids = set()
+            # Key:group_key, Value:group_id
+            database_group_ids = dict()
+            for group in self.groups_data.values():
+                if SearchIndex.matches(query_words, group.name):
+                    found_group_ids.add(group.id)
+                elif group.shard is not None:
+                    database_group_ids[group.shard] = group.id
+                elif any(SearchIndex.matches(query_words, f'{entry.path} {entry.details}') for entry in group.entries):
+                    found_group_ids.add(group.id)
+            if database_group_ids:
+                found_group_ids.update(database_group_ids[group_key] for group_key in self.__search_database(query_words) if group_key in database_group_ids)
+            return found_group_ids
+
+    def search_entries(self, query, group_id) -> set:
+        """
+        Returns the ids of the entries of the group which match the query (see `SearchIndex`). Until the search index is built, 
+        the entries of the group are searched one by one, or in the database with the SQLite storage layout.
+        """
+
+        with self.__data_lock:
+            if self.__search_index_ready:
+                return self.__search_index.search_entries(query, group_id)
+            query_words = SearchIndex.get_words(query)
+            if not query_words:
+                return set()
+            group = self.groups_data[group_id]
+            if self.__loaded_layout == AppData.STORAGE_LAYOUT_SQLITE and group.shard is not None:
+                return set(self.__search_database(query_words, group.shard))
+            return {entry.id for entry in group.entries if SearchIndex.matches(query_words, f'{entry.path} {entry.details}')}
+
+    def find_entry_id(self, group_id, entry_path):
+        """Returns the id of the group entry with the given path, or None if the group doesn't contain the path."""
+
+        with self.__data_lock:
+            group = self.groups_data[group_id]
+            # The path is looked up in the database instead of loading the entries of an unchanged group.
+            if (self.__loaded_layout == AppData.STORAGE_LAYOUT_SQLITE and group.id not in self.__entry_path_index 
+                    and not group.is_loaded() and group.shard is not None):
+                return self.__find_database_entry_id(group.shard, entry_path)
+            return self.__get_entry_path_index(group_id).get(entry_path)
+
+    def import_groups(self, groups, replace=False) -> int:
+        """
+        Adds the given groups after the existing ones, or in place of them if `replace` is True. The groups and their entries
+        get new ids and the entries with a path which is already in the group are skipped. Returns the number of imported entries.
+        """
+
+        imported_entries_count = 0
+        with self.__data_lock:
+            removed_group_ids = list(self.groups_data) if replace else []
+            new_groups = []
+            for group in groups:
+                entries = []
+                entry_paths = set()
+                for entry in group.entries:
+                    if entry.path not in entry_paths:
+                        entry_paths.add(entry.path)
+                        entries.append(entry.with_changes(id=len(entries)))
+                new_groups.append(Group(self.__allocate_group_id(), group.name, entries, group.listening_dir, 
+                                        entries_loader=self.__load_group_entries, listening_filter=group.listening_filter))
+                imported_entries_count += len(entries)
+            self.__apply_operation('Import Groups', [(Operation.STEP_GROUPS, removed_group_ids, new_groups)])
+        self.__notify_changed()
+        return imported_entries_count
+
+    def add_group(self, group_name) -> Group:
+        with self.__data_lock:
+            group = Group(self.__allocate_group_id(), group_name, [], entries_loader=self.__load_group_entries)
+            self.__apply_operation('Create Group', [(Operation.STEP_GROUPS, [], [group])])
+        self.__notify_changed()
+        return group
+
+    def delete_groups(self, group_ids) -> None:
+        with self.__data_lock:
+            # The other groups keep their ids, so only the deleted ones change.
+            group_ids = [group_id for group_id in group_ids if group_id in self.groups_data]
+            if not group_ids:
+                return
+            self.__apply_operation('Delete Groups', [(Operation.STEP_GROUPS, group_ids, [])])
+        self.__notify_changed()
+
+    def rename_group(self, group_id, group_name) -> None:
+        with self.__data_lock:
+            group = self.groups_data[group_id]
+            self.__apply_operation('Rename Group', [(Operation.STEP_GROUP_ATTRIBUTES, group_id, group_name, group.listening_dir, group.listening_filter)])
+        self.__notify_changed()
+
+    def add_entries(self, group_id, new_entries) -> int:
+        """
+        Adds entries to a group. The `new_entries` argument is a list of (path, entry type) tuples. 
+        Returns the number of added entries (the paths already in the group are skipped).
+        """
+
+        with self.__data_lock:
+            entry_path_index = self.__get_entry_path_index(group_id)
+            new_entries = [(entry_path, entry_type) for entry_path, entry_type in new_entries if entry_path not in entry_path_index]
+            if not new_entries:
+                return 0
+            group = self.__get_group_for_changing(group_id)
+            added_entries = dict()
+            for entry_path, entry_type in new_entries:
+                # The same path may appear more than once in the new entries.
+                if entry_path not in added_entries:
+                    added_entries[entry_path] = Entry(group.allocate_entry_id(), entry_path, entry_type, '')
+            self.__apply_operation('Add Entries', [(Operation.STEP_ENTRIES, group_id, [], list(added_entries.values()))])
+        self.__notify_changed()
+        return len(added_entries)
+
+    def delete_entries(self, group_id, entry_ids) -> None:
+        with self.__data_lock:
+            # The other entries keep their ids, so only the deleted ones change.
+            entries = self.groups_data[group_id].entries_by_id
+            entry_ids = [entry_id for entry_id in entry_ids if entry_id in entries]
+            if not entry_ids:
+                return
+            self.__apply_operation('Delete Entries', [(Operation.STEP_ENTRIES, group_id, entry_ids, [])])
+        self.__notify_changed()
+
+    def delete_entries_with_path(self, group_id, entry_path) -> bool:
+        """Deletes the group entry with the given path. Returns False if the group doesn't contain the path."""
+
+        with self.__data_lock:
+            entry_id = self.__get_entry_path_index(group_id).get(entry_path)
+            if entry_id is None:
+                return False
+            self.__apply_operation('Delete Entries', [(Operation.STEP_ENTRIES, group_id, [entry_id], [])])
+        self.__notify_changed()
+        return True
+
+    def change_entries_path(self, group_id, old_entry_path, new_entry_path) -> bool:
+        """Changes the path of the group entry with the given path. Returns False if the group doesn't contain the path."""
+
+        with self.__data_lock:
+            entry_path_index = self.__get_entry_path_index(group_id)
+            entry_id = entry_path_index.get(old_entry_path)
+            if entry_id is None:
+                return False
+            # Moving over a path which is already in the group replaces that entry.
+            if new_entry_path in entry_path_index:
+                return self.delete_entries_with_path(group_id, old_entry_path)
+            entry = self.groups_data[group_id].entries_by_id[entry_id].with_changes(path=new_entry_path)
+            self.__apply_operation('Move Entry', [(Operation.STEP_ENTRIES, group_id, [], [entry])])
+        self.__notify_changed()
+        return True
+
+    def change_entries_details(self, group_id, entry_ids, new_details) -> None:
+        with self.__data_lock:
+            entries = self.groups_data[group_id].entries_by_id
+            changed_entries = [entries[entry_id].with_changes(details=new_details) for entry_id in entry_ids if entry_id in entries]
+            if not changed_entries:
+                return
+            self.__apply_operation('Edit Details', [(Operation.STEP_ENTRIES, group_id, [], changed_entries)])
+        self.__notify_changed()
+
+    def change_listening_dir(self, group_id, listening_dir, listening_filter=None) -> None:
+        """
+        Sets the directory the group listens to and the filter of its files (the default one if None), or stops the group 
+        from listening if `listening_dir` is None.
+        """
+
+        with self.__data_lock:
+            group = self.groups_data[group_id]
+            listening_filter = None if listening_dir is None else (listening_filter or ListeningFilter())
+            self.__apply_operation('Stop Listening' if listening_dir is None else 'Start Listening', 
+                                   [(Operation.STEP_GROUP_ATTRIBUTES, group_id, group.name, listening_dir, listening_filter)])
+        self.__notify_changed()
+
+    def clear_listening_dirs(self, group_ids) -> list:
+        """
+        Stops the groups from listening, e.g. to directories which don't exist anymore, and returns the ids of the changed groups. 
+        Unlike `change_listening_dir`, the change isn't a user operation, so it's not recorded in the operation log.
+        """
+
+        with self.__data_lock:
+            changed_group_ids = [group_id for group_id in group_ids if group_id in self.groups_data and self.groups_data[group_id].listening_dir is not None]
+            for group_id in changed_group_ids:
+                self.__apply_steps([(Operation.STEP_GROUP_ATTRIBUTES, group_id, self.groups_data[group_id].name, None, None)])
+        if changed_group_ids:
+            self.__notify_changed()
+        return changed_group_ids
+
+    @contextmanager
+    def recording_operation(self, operation_name):
+        """
+        Records all the changes made in the `with` block as a single operation with the given name (e.g. the changes made
+        by a batch of listening events). The groups data can't be saved until the block ends.
+        """
+
+        with self.__data_lock:
+            if self.__pending_operation is not None:
+                yield
+                return
+            self.__pending_operation = Operation(operation_name, [], [])
+            try:
+                yield
+            finally:
+                operation = self.__pending_operation
+                self.__pending_operation = None
+                if operation.steps:
+                    self.__record_operation(operation)
+
+    def undo(self):
+        """Undoes the last operation and returns it, or returns None if there is no operation to undo."""
+
+        with self.__data_lock:
+            operation = self.operation_log.take_undo()
+            if operation is None:
+                return None
+            operation.steps = self.__apply_steps(operation.undo_steps)
+            self.__share_saved_groups()
+        self.__notify_changed()
+        return operation
+
+    def redo(self):
+        """Redoes the last undone operation and returns it, or returns None if there is no operation to redo."""
+
+        with self.__data_lock:
+            operation = self.operation_log.take_redo()
+            if operation is None:
+                return None
+            operation.undo_steps = self.__apply_steps(operation.steps)
+            self.__share_saved_groups()
+        self.__notify_changed()
+        return operation
+    
+    def wait_for_compaction(self) -> None:
+        thread = self.__compaction_thread
+        if thread is not None:
+            thread.join()
+
+    def __load_listening_snapshots(self) -> None:
+        snapshots_json = dict()
+        if os.path.isfile(self.listening_snapshots_path):
+            with open(self.listening_snapshots_path, 'r') as f:
+                snapshots_json = json.load(f)
+        self.listening_snapshots.load_json(snapshots_json)
+
+    def __save_listening_snapshots(self) -> None:
+        with self.__data_lock:
+            listening_dirs = set(self.__listening_dir_index)
+        snapshots_json = self.listening_snapshots.take_changed_json(listening_dirs)
+        if snapshots_json is not None:
+            os.makedirs(os.path.split(self.listening_snapshots_path)[0], exist_ok=True)
+            self.__write_json_file(self.listening_snapshots_path, snapshots_json, indent=None)
+
+    def __notify_changed(self) -> None:
+        for action in self.on_change_actions:
+            action()
+
+    def __read_snapshot(self) -> dict:
+        if not os.path.isfile(self.groups_path):
+            return dict()
+        with open(self.groups_path, 'r') as f:
+            return {group_json[AppData.KEY_GROUP_ID]: group_json for group_json in json.load(f)}
+
+    def __get_snapshot_mtime(self):
+        try:
+            return os.stat(self.groups_path).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    def __replay_journal(self, journal_path, groups_json, drop_torn_record=True) -> int:
+        """
+        Applies the journal records over the groups data in the JSON format (a dict of the groups by id, in display order) and
+        returns the size of the valid part of the journal.
+        """
+
+        if not os.path.isfile(journal_path):
+            return 0
+        valid_size = 0
+        with open(journal_path, 'rb') as f:
+            for line in f:
+                try:
+                    # A record without the line terminator was not completely written.
+                    if not line.endswith(b'\n'):
+                        raise ValueError('Incomplete journal record')
+                    record = json.loads(line)
+                    changed_groups = [(group_json[AppData.KEY_GROUP_ID], group_json) for group_json in record['set']]
+                    deleted_group_ids = record['delete']
+                except (ValueError, KeyError, TypeError):
+                    break
+                for group_id in deleted_group_ids:
+                    groups_json.pop(group_id, None)
+                self.__put_by_id(groups_json, changed_groups)
+                valid_size += len(line)
+        # Drops the torn record so that the next records are appended after a complete one.
+        if drop_torn_record and valid_size < os.path.getsize(journal_path):
+            with open(journal_path, 'r+b') as f:
+                f.truncate(valid_size)
+        return valid_size
+
+    def __get_saved_layout(self) -> str:
+        # After an interrupted migration the files of two layouts exist, and the ones written last hold the groups data.
+        saved_layout = AppData.STORAGE_LAYOUT_SINGLE_FILE
+        saved_layout_mtime = self.__get_snapshot_mtime()
+        for layout, path in ((AppData.STORAGE_LAYOUT_SHARDED, self.shards_index_path), (AppData.STORAGE_LAYOUT_SQLITE, self.database_path)):
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except FileNotFoundError:
+                continue
+            if saved_layout_mtime is None or mtime > saved_layout_mtime:
+                saved_layout = layout
+                saved_layout_mtime = mtime
+        return saved_layout
+
+    def __read_shards_index(self) -> list:
+        with open(self.shards_index_path, 'r') as f:
+            return json.load(f)
+
+    def __read_shard(self, shard) -> list:
+        with open(os.path.join(self.shards_dir_path, shard + '.json'), 'r') as f:
+            return [Entry.from_json(entry_json) for entry_json in json.load(f)]
+
+    def __write_shard(self, entries) -> str:
+        import uuid
+
+        # Each save writes a new shard, so the one referenced by the current index is never overwritten.
+        shard = uuid.uuid4().hex
+        with open(os.path.join(self.shards_dir_path, shard + '.json'), 'w') as f:
+            json.dump([entry.to_json() for entry in entries], f, separators=(',', ':'))
+            f.flush()
+            os.fsync(f.fileno())
+        return shard
+
+    def __load_group_entries(self, group) -> list:
+        entries = self.__read_group_entries(group)
+        with self.__data_lock:
+            self.__mark_group_used(group)
+        return entries
+
+    def __read_group_entries(self, group) -> list:
+        if self.__loaded_layout == AppData.STORAGE_LAYOUT_SQLITE:
+            return self.__read_database_entries(group.shard)
+        return self.__read_shard(group.shard)
+
+    def __mark_group_used(self, group) -> None:
+        loaded_groups = self.__loaded_groups
+        loaded_groups[group] = None
+        loaded_groups.move_to_end(group)
+        cache_size = max(1, self.settings.get(AppData.KEY_SETTING_LOADED_GROUPS_CACHE_SIZE, AppData.DEFAULT_LOADED_GROUPS_CACHE_SIZE))
+        while len(loaded_groups) > cache_size:
+            least_used_group, _ = loaded_groups.popitem(last=False)
+            # The changed groups are never unloaded. The entry path index of an unloaded working group is created again when needed.
+            if least_used_group.unload_entries():
+                group_id = least_used_group.id
+                if self.groups_data.get(group_id) is least_used_group:
+                    self.__entry_path_index.pop(group_id, None)
+
+    def __save_shards(self, force=False) -> None:
+        with self.__data_lock:
+            if not self.__dirty_group_ids and not force:
+                return
+            # From now on, the saved groups are shared again with the working ones (which are copied before being changed).
+            new_saved = copy(self.groups_data)
+            old_saved = self.__saved_groups_data
+            previous_save_point = self.__take_save_point()
+        groups_to_write = [group for group in new_saved.values() if group.shard is None]
+
+        with self.__journal_lock:
+            try:
+                os.makedirs(self.shards_dir_path, exist_ok=True)
+                # The shards written before a failure are kept by their groups, and the next save writes only the others.
+                for group in groups_to_write:
+                    group.shard = self.__write_shard(group.entries)
+                self.__write_json_file(self.shards_index_path, [group.to_index_json() for group in new_saved.values()])
+            except BaseException:
+                self.__restore_save_point(previous_save_point)
+                raise
+            self.__saved_groups_data = new_saved
+            used_shards = {group.shard for group in new_saved.values()}
+            for shard in {group.shard for group in old_saved.values() if group.shard is not None} - used_shards:
+                try:
+                    os.remove(os.path.join(self.shards_dir_path, shard + '.json'))
+                except FileNotFoundError:
+                    pass
+        with self.__data_lock:
+            for group in groups_to_write:
+                self.__mark_group_used(group)
+
+    def __connect_database(self, read_only=False):
+        import sqlite3
+        from contextlib import closing
+        from pathlib import Path
+
+        if read_only:
+            return closing(sqlite3.connect(Path(os.path.abspath(self.database_path)).as_uri() + '?mode=ro', uri=True))
+        os.makedirs(os.path.split(self.database_path)[0], exist_ok=True)
+        connection = sqlite3.connect(self.database_path)
+        connection.executescript(AppData.DATABASE_SCHEMA)
+        return closing(connection)
+
+    def __read_database_groups(self, entries_loader, read_only=False, connection=None) -> list:
+        if connection is None:
+            with self.__connect_database(read_only) as connection:
+                return self.__read_database_groups(entries_loader, connection=connection)
+        rows = connection.execute('''
+            SELECT groups.group_key, group_id, group_name, group_listening_dir, group_listening_filter, COUNT(entries.group_key)
+            FROM groups LEFT JOIN entries ON entries.group_key = groups.group_key
+            GROUP BY groups.group_key
+            ORDER BY group_id
+        ''').fetchall()
+        return [Group(group_id, group_name, None, listening_dir, group_key, entries_count, entries_loader, 
+                      None if listening_dir is None else ListeningFilter.from_json(None if filter_json is None else json.loads(filter_json))) 
+                for group_key, group_id, group_name, listening_dir, filter_json, entries_count in rows]
+
+    def __read_database_entries(self, group_key) -> list:
+        with self.__connect_database(read_only=True) as connection:
+            rows = connection.execute(
+                'SELECT entry_id, entry_path, entry_type, entry_details FROM entries WHERE group_key = ? ORDER BY entry_id', (group_key,)).fetchall()
+            # A group without entries still has its row, unless it was replaced by a save.
+            if not rows and connection.execute('SELECT 1 FROM groups WHERE group_key = ?', (group_key,)).fetchone() is None:
+                raise KeyError(group_key)
+        return [Entry(*row) for row in rows]
+
+    def __search_database(self, query_words, group_key=None) -> list:
+        """
+        Returns the ids of the saved entries of the given group which match all the query words, or without a group, the keys of 
+        the groups having such entries.
+        """
+
+        # The entries containing the words (which have no wildcards) are found by the database, and the words they start are then 
+        # checked. The database ignores the case of the ASCII letters only, so the other uppercase letters are not matched.
+        conditions = ' AND '.join(["(entry_path || ' ' || entry_details) LIKE ?"] * len(query_words) + ['matches_query(entry_path, entry_details)'])
+        parameters = [f'%{query_word}%' for query_word in query_words]
+        if group_key is None:
+            # Each group is searched until its first matching entry.
+            query = f'SELECT group_key FROM groups WHERE EXISTS (SELECT 1 FROM entries WHERE entries.group_key = groups.group_key AND {conditions})'
+        else:
+            query = f'SELECT entry_id FROM entries WHERE group_key = ? AND {conditions}'
+            parameters.insert(0, group_key)
+        with self.__connect_database(read_only=True) as connection:
+            connection.create_function('matches_query', 2, lambda path, details: SearchIndex.matches(query_words, f'{path} {details}'))
+            return [row[0] for row in connection.execute(query, parameters)]
+
+    def __find_database_entry_id(self, group_key, entry_path):
+        with self.__connect_database(read_only=True) as connection:
+            row = connection.execute(
+                'SELECT MIN(entry_id) FROM entries WHERE entry_path = ? AND group_key = ?', (entry_path, group_key)).fetchone()
+        return row[0]
+
+    def __save_database(self, force=False) -> None:
+        with self.__data_lock:
+            if not self.__dirty_group_ids and not force:
+                return
+            dirty_group_ids = sorted(self.__dirty_group_ids)
+            # From now on, the saved groups are shared again with the working ones (which are copied before being changed).
+            new_saved = copy(self.groups_data)
+            old_saved = self.__saved_groups_data
+            previous_save_point = self.__take_save_point()
+        groups_to_write = [group for group in new_saved.values() if group.shard is None]
+        # The groups which only changed their listening directory keep their entry rows.
+        groups_to_update = [new_saved[group_id] for group_id in dirty_group_ids if group_id in new_saved and new_saved[group_id].shard is not None]
+
+        with self.__journal_lock:
+            try:
+                with self.__connect_database() as connection:
+                    # The connection commits all the changes at once when the block ends, or rolls them back on error.
+                    with connection:
+                        group_keys = []
+                        for group in groups_to_write:
+                            group_key = connection.execute(
+                                'INSERT INTO groups (group_id, group_name, group_listening_dir, group_listening_filter) VALUES (?, ?, ?, ?)',
+                                (group.id, group.name, group.listening_dir, self.__get_listening_filter_text(group))).lastrowid
+                            connection.executemany(
+                                'INSERT INTO entries (group_key, entry_id, entry_path, entry_type, entry_details) VALUES (?, ?, ?, ?, ?)',
+                                [(group_key, entry.id, entry.path, entry.type, entry.details) for entry in group.entries])
+                            group_keys.append(group_key)
+                        connection.executemany(
+                            'UPDATE groups SET group_id = ?, group_name = ?, group_listening_dir = ?, group_listening_filter = ? WHERE group_key = ?',
+                            [(group.id, group.name, group.listening_dir, self.__get_listening_filter_text(group), group.shard) for group in groups_to_update])
+                        used_group_keys = {group.shard for group in new_saved.values()}
+                        unused_group_keys = [(group.shard,) for group in old_saved.values() if group.shard is not None and group.shard not in used_group_keys]
+                        connection.executemany('DELETE FROM entries WHERE group_key = ?', unused_group_keys)
+                        connection.executemany('DELETE FROM groups WHERE group_key = ?', unused_group_keys)
+            except BaseException:
+                # The transaction was rolled back, so the groups are written again by the next save.
+                self.__restore_save_point(previous_save_point)
+                raise
+            for group, group_key in zip(groups_to_write, group_keys):
+                group.shard = group_key
+            self.__saved_groups_data = new_saved
+        with self.__data_lock:
+            for group in groups_to_write:
+                self.__mark_group_used(group)
+
+    @staticmethod
+    def __get_listening_filter_text(group):
+        return None if group.listening_filter is None else json.dumps(group.listening_filter.to_json())
+
+    def __remove_unused_shards(self, groups) -> None:
+        # The shards written by a save which was interrupted before the index was replaced are not used by any group.
+        used_shard_files = {group.shard + '.json' for group in groups}
+        used_shard_files.add(os.path.basename(self.shards_index_path))
+        for file_name in os.listdir(self.shards_dir_path):
+            if file_name not in used_shard_files:
+                os.remove(os.path.join(self.shards_dir_path, file_name))
+
+    def __migrate_groups_data(self, layout) -> None:
+        """Saves all the groups with the given storage layout and removes the data files of the other layouts."""
+
+        import shutil
+
+        self.wait_for_compaction()
+        with self.__data_lock:
+            # Each layout stores the entries differently, so all of them are loaded to be saved again.
+            for group in list(self.__saved_groups_data.values()) + list(self.groups_data.values()):
+                group.load_entries()
+                group.shard = None
+            self.__loaded_groups.clear()
+            previous_layout = self.__loaded_layout
+            self.__loaded_layout = layout
+        try:
+            if layout == AppData.STORAGE_LAYOUT_SHARDED:
+                self.__save_shards(force=True)
+            elif layout == AppData.STORAGE_LAYOUT_SQLITE:
+                self.__save_database(force=True)
+            else:
+                with self.__data_lock:
+                    new_saved = copy(self.groups_data)
+                    previous_save_point = self.__take_save_point()
+                with self.__journal_lock:
+                    try:
+                        os.makedirs(os.path.split(self.groups_path)[0], exist_ok=True)
+                        self.__write_json_file(self.groups_path, [group.to_json() for group in new_saved.values()])
+                    except BaseException:
+                        self.__restore_save_point(previous_save_point)
+                        raise
+                    self.__snapshot_size = os.path.getsize(self.groups_path)
+                    self.__saved_groups_data = new_saved
+        except BaseException:
+            # The data files of the previous layout are still the saved ones, so the next save migrates again.
+            with self.__data_lock:
+                self.__loaded_layout = previous_layout
+            raise
+
+        with self.__journal_lock:
+            # The journal is already contained in the new data files, whatever the layout.
+            for path in (self.journal_path, self.__compacting_journal_path):
+                if os.path.isfile(path):
+                    os.remove(path)
+            self.__journal_size = 0
+            if layout != AppData.STORAGE_LAYOUT_SINGLE_FILE and os.path.isfile(self.groups_path):
+                os.remove(self.groups_path)
+                self.__snapshot_size = 0
+            if layout != AppData.STORAGE_LAYOUT_SHARDED and os.path.isdir(self.shards_dir_path):
+                if os.path.isfile(self.shards_index_path):
+                    os.remove(self.shards_index_path)
+                shutil.rmtree(self.shards_dir_path, ignore_errors=True)
+            if layout != AppData.STORAGE_LAYOUT_SQLITE and os.path.isfile(self.database_path):
+                os.remove(self.database_path)
+
+    @staticmethod
+    def __write_json_file(path, data, indent='\t') -> None:
+        write_file_atomically(path, json.dumps(data, indent=indent, separators=None if indent else (',', ':')))
+
+    def __start_compaction(self) -> None:
+        with self.__journal_lock:
+            if self.__compaction_thread is not None and self.__compaction_thread.is_alive():
+                return
+            # The current journal is set aside and new records go to a fresh one while the snapshot is written.
+            if not os.path.isfile(self.__compacting_journal_path) and os.path.isfile(self.journal_path):
+                os.replace(self.journal_path, self.__compacting_journal_path)
+                self.__journal_size = 0
+            groups_to_write = copy(self.__saved_groups_data)
+            self.__compaction_thread = threading.Thread(target=self.__async_compaction, args=(groups_to_write,), daemon=True)
+            self.__compaction_thread.start()
+
+    def __async_compaction(self, groups_to_write) -> None:
+        self.__write_json_file(self.groups_path, [group.to_json() for group in groups_to_write.values()])
+        self.__snapshot_size = os.path.getsize(self.groups_path)
+        if os.path.isfile(self.__compacting_journal_path):
+            os.remove(self.__compacting_journal_path)
+
+    def __get_group_for_changing(self, group_id, changing_entries=True) -> Group:
+        """Returns the working version of a group which can be changed, copying the group if it's shared with the saved version."""
+
+        group = self.groups_data[group_id]
+        if group_id not in self.__dirty_group_ids or group_id in self.__shared_group_ids:
+            group = group.copy()
+            self.groups_data[group_id] = group
+            self.__dirty_group_ids.add(group_id)
+            self.__shared_group_ids.discard(group_id)
+        # The changed entries no longer match the group shard, so they are saved to a new one and never unloaded until then.
+        if changing_entries and group.shard is not None:
+            group.load_entries()
+            group.shard = None
+        return group
+
+    def __apply_operation(self, operation_name, steps) -> None:
+        undo_steps = self.__apply_steps(steps)
+        pending_operation = self.__pending_operation
+        if pending_operation is not None:
+            pending_operation.steps.extend(steps)
+            pending_operation.undo_steps[:0] = undo_steps
+        else:
+            self.__record_operation(Operation(operation_name, steps, undo_steps))
+
+    def __record_operation(self, operation) -> None:
+        self.operation_log.record(operation, self.settings.get(AppData.KEY_SETTING_OPERATION_LOG_MAX_SIZE, OperationLog.DEFAULT_MAX_SIZE))
+
+    def __apply_steps(self, steps) -> list:
+        """Applies the steps of an operation in order and returns their undo steps (see `Operation`)."""
+
+        undo_steps = []
+        for step_type, *arguments in steps:
+            if step_type == Operation.STEP_GROUPS:
+                undo_steps.append(self.__apply_groups_step(*arguments))
+            elif step_type == Operation.STEP_GROUP_ATTRIBUTES:
+                undo_steps.append(self.__apply_group_attributes_step(*arguments))
+            else:
+                undo_steps.append(self.__apply_entries_step(*arguments))
+        undo_steps.reverse()
+        return undo_steps
+
+    def __apply_groups_step(self, removed_group_ids, added_groups) -> tuple:
+        removed_groups = []
+        for group_id in removed_group_ids:
+            group = self.groups_data.pop(group_id, None)
+            if group is None:
+                continue
+            self.__unindex_group(group)
+            # The deleted group is kept by the operation log, so its entries are kept loaded in case a save removes its shard.
+            group.load_entries()
+            self.__loaded_groups.pop(group, None)
+            self.__dirty_group_ids.add(group_id)
+            self.__shared_group_ids.discard(group_id)
+            removed_groups.append(group)
+        last_group_id = next(reversed(self.groups_data), -1)
+        for group in added_groups:
+            if self.__saved_groups_data.get(group.id) is group:
+                self.__dirty_group_ids.discard(group.id)
+            else:
+                # The shard of the group may have been removed by a save since it was deleted, so the group is saved again.
+                group.shard = None
+                self.__dirty_group_ids.add(group.id)
+                self.__shared_group_ids.add(group.id)
+            self.groups_data[group.id] = group
+            self.__next_group_id = max(self.__next_group_id, group.id + 1)
+            self.__index_group(group)
+        if any(group.id < last_group_id for group in added_groups):
+            self.__sort_by_id(self.groups_data)
+        return (Operation.STEP_GROUPS, [group.id for group in added_groups], removed_groups)
+
+    def __apply_group_attributes_step(self, group_id, group_name, listening_dir, listening_filter) -> tuple:
+        group = self.__get_group_for_changing(group_id, changing_entries=False)
+        undo_step = (Operation.STEP_GROUP_ATTRIBUTES, group_id, group.name, group.listening_dir, group.listening_filter)
+        self.__unindex_listening_dir(group)
+        if self.__search_index is not None and group_name != group.name:
+            self.__search_index.set_group_name(group_id, group_name)
+        group.name = group_name
+        group.listening_dir = listening_dir
+        group.listening_filter = listening_filter
+        self.__index_listening_dir(group)
+        return undo_step
+
+    def __apply_entries_step(self, group_id, removed_entry_ids, added_entries) -> tuple:
+        group = self.__get_group_for_changing(group_id)
+        entries = group.entries_by_id
+        # The entry path index is kept up to date only if it was already created.
+        entry_path_index = self.__entry_path_index.get(group_id)
+        search_index = self.__search_index
+        removed_entries = []
+        for entry_id in removed_entry_ids:
+            entry = entries.pop(entry_id, None)
+            if entry is not None:
+                removed_entries.append(entry)
+                if entry_path_index is not None and entry_path_index.get(entry.path) == entry_id:
+                    del entry_path_index[entry.path]
+                if search_index is not None:
+                    search_index.remove_entry(group_id, entry_id)
+        last_entry_id = next(reversed(entries), -1)
+        new_entry_ids = []
+        for entry in added_entries:
+            old_entry = entries.get(entry.id)
+            if old_entry is None:
+                new_entry_ids.append(entry.id)
+                group.reserve_entry_id(entry.id)
+            else:
+                removed_entries.append(old_entry)
+                if entry_path_index is not None and entry_path_index.get(old_entry.path) == entry.id:
+                    del entry_path_index[old_entry.path]
+            entries[entry.id] = entry
+            if entry_path_index is not None:
+                entry_path_index.setdefault(entry.path, entry.id)
+            if search_index is not None:
+                search_index.add_entry(group_id, entry)
+        if new_entry_ids and min(new_entry_ids) < last_entry_id:
+            self.__sort_by_id(entries)
+        return (Operation.STEP_ENTRIES, group_id, new_entry_ids, removed_entries)
+
+    @staticmethod
+    def __put_by_id(items, new_items) -> None:
+        """Puts the (id, item) pairs in the dict of items by id, in display order."""
+
+        last_id = next(reversed(items), -1)
+        # The items which are already in the dict are replaced in place, and the others are appended.
+        is_sorted = all(item_id > last_id or item_id in items for item_id, _ in new_items)
+        items.update(new_items)
+        if not is_sorted:
+            AppData.__sort_by_id(items)
+
+    @staticmethod
+    def __sort_by_id(items) -> None:
+        # The items added back by undoing their deletion are put again in display order, which is the order of their ids.
+        sorted_items = sorted(items.items(), key=lambda item: item[0])
+        items.clear()
+        items.update(sorted_items)
+
+    def __set_save_point(self) -> None:
+        self.__dirty_group_ids.clear()
+        self.__shared_group_ids.clear()
+        self.operation_log.set_save_point()
+
+    def __take_save_point(self) -> tuple:
+        """Sets the save point before the data is written, and returns the previous one for `__restore_save_point`."""
+
+        previous_save_point = (set(self.__dirty_group_ids), set(self.__shared_group_ids), self.operation_log.get_save_point())
+        self.__set_save_point()
+        return previous_save_point
+
+    def __restore_save_point(self, previous_save_point) -> None:
+        """Marks the groups written by a failed save as changed again, so they are saved by the next one."""
+
+        dirty_group_ids, shared_group_ids, save_point = previous_save_point
+        with self.__data_lock:
+            # The groups changed during the save are already marked, and copied from the ones being written.
+            self.__dirty_group_ids.update(dirty_group_ids)
+            self.__shared_group_ids.update(shared_group_ids)
+            self.operation_log.set_save_point(save_point)
+
+    def __share_saved_groups(self) -> None:
+        """Shares the groups with the saved version again if the operations were undone or redone up to the save point."""
+
+        if not self.operation_log.is_at_save_point():
+            return
+        saved = self.__saved_groups_data
+        for group_id in self.__dirty_group_ids:
+            group = self.groups_data.get(group_id)
+            saved_group = saved.get(group_id)
+            if group is not None and saved_group is not None:
+                self.__unindex_group(group)
+                self.groups_data[group_id] = saved_group
+                self.__index_group(saved_group)
+        self.__dirty_group_ids.clear()
+        self.__shared_group_ids.clear()
+
+    def __async_building_search_index(self, search_index, groups) -> None:
+        # The groups changed meanwhile are kept up to date in the index, and they are indexed again as they are now.
+        for group in groups:
+            entries = None
+            if not group.is_loaded():
+                try:
+                    entries = self.__read_group_entries(group)
+                except Exception:
+                    # E.g. the shard was replaced by a save, the group is then indexed as it is now.
+                    pass
+            with self.__data_lock:
+                if self.__search_index is not search_index:
+                    return
+                current_group = self.groups_data.get(group.id)
+                if current_group is None:
+                    continue
+                if current_group.is_loaded() or current_group.shard != group.shard:
+                    entries = None
+                self.__add_to_search_index(current_group, entries)
+        with self.__data_lock:
+            if self.__search_index is not search_index:
+                return
+            self.__search_index_ready = True
+        self.__on_search_index_ready()
+
+    def __add_to_search_index(self, group, entries=None) -> None:
+        # The entries of a group which is not loaded are read without loading them.
+        if entries is None and not group.is_loaded() and group.shard is not None:
+            entries = self.__read_group_entries(group)
+        self.__search_index.add_group(group, entries)
+
+    def __allocate_group_id(self) -> int:
+        # The ids of the deleted groups are not reused, so a stale id never identifies another group.
+        group_id = self.__next_group_id
+        self.__next_group_id += 1
+        return group_id
+
+    def __index_group(self, group) -> None:
+        # The entry path index of the group is created when it's first needed, so the entries are not loaded just for it.
+        self.__entry_path_index.pop(group.id, None)
+        self.__index_listening_dir(group)
+        if self.__search_index is not None:
+            self.__add_to_search_index(group)
+
+    def __get_entry_path_index(self, group_id) -> dict:
+        entry_path_index = self.__entry_path_index.get(group_id)
+        if entry_path_index is None:
+            entry_path_index = self.__create_entry_path_index(self.groups_data[group_id].entries)
+            self.__entry_path_index[group_id] = entry_path_index
+        return entry_path_index
+
+    def __unindex_group(self, group) -> None:
+        self.__entry_path_index.pop(group.id, None)
+        self.__unindex_listening_dir(group)
+        if self.__search_index is not None:
+            self.__search_index.remove_group(group.id)
+
+    def __index_listening_dir(self, group) -> None:
+        if group.listening_dir is not None:
+            self.__listening_dir_index.setdefault(group.listening_dir, set()).add(group.id)
+
+    def __unindex_listening_dir(self, group) -> None:
+        if group.listening_dir is not None:
+            group_ids = self.__listening_dir_index.get(group.listening_dir)
+            if group_ids is not None:
+                group_ids.discard(group.id)
+                if not group_ids:
+                    self.__listening_dir_index.pop(group.listening_dir)
+
+    @staticmethod
+    def __create_entry_path_index(entries) -> dict:
+        entry_path_index = dict()
+        for entry in entries:
+            entry_path_index.setdefault(entry.path, entry.id)
+        return entry_path_index
+
+
+class Operation:
+    """
+    A reversible change of the groups data, recorded in the `OperationLog`. The `steps` make the change and the
+    `undo_steps` revert it, both being lists of steps which are applied in order by `AppData`.
+    """
+
+    # (STEP_GROUPS, removed_group_ids, added_groups)
+    STEP_GROUPS = 'groups'
+    # (STEP_GROUP_ATTRIBUTES, group_id, group_name, listening_dir, listening_filter)
+    STEP_GROUP_ATTRIBUTES = 'group_attributes'
+    # (STEP_ENTRIES, group_id, removed_entry_ids, added_entries)
+    STEP_ENTRIES = 'entries'
+
+    __slots__ = ('number', 'name', 'steps', 'undo_steps', 'size')
+
+    def __init__(self, name, steps, undo_steps) -> None:
+        self.number = 0
+        self.name = name
+        self.steps = steps
+        self.undo_steps = undo_steps
+        self.size = 0
+
+    def compute_size(self) -> int:
+        size = 0
+        for step in self.steps + self.undo_steps:
+            if step[0] == Operation.STEP_GROUPS:
+                size += len(step[1]) + sum(1 + group.get_entries_count() for group in step[2])
+            elif step[0] == Operation.STEP_ENTRIES:
+                size += len(step[2]) + len(step[3])
+            else:
+                size += 1
+        return size
+
+
+class OperationLog:
+    """
+    Bounded log of the operations applied to the groups data, for undoing and redoing them. The save point is the state
+    of the saved data, identified by the number of the last applied operation.
+    """
+
+    DEFAULT_MAX_SIZE = 100000
+
+    def __init__(self) -> None:
+        # The applied operations, from the oldest to the last one, and the undone ones, from the last one undone to the oldest.
+        self.__done = deque()
+        self.__undone = []
+        self.__size = 0
+        self.__last_number = 0
+        # The state before the oldest applied operation.
+        self.__base_state = 0
+        self.__save_point = 0
+
+    def record(self, operation, max_size=DEFAULT_MAX_SIZE) -> None:
+        for undone_operation in self.__undone:
+            self.__size -= undone_operation.size
+        self.__undone.clear()
+        self.__last_number += 1
+        operation.number = self.__last_number
+        operation.size = operation.compute_size()
+        self.__done.append(operation)
+        self.__size += operation.size
+        while self.__size > max_size and self.__done:
+            dropped_operation = self.__done.popleft()
+            self.__base_state = dropped_operation.number
+            self.__size -= dropped_operation.size
+
+    def merge_last(self, operation) -> bool:
+        """
+        Merges the last applied operation into the given one, if that is the operation applied before it and the save point
+        is not between them (e.g. to undo the batches of a long-running change at once). Returns whether they were merged.
+        """
+
+        if len(self.__done) < 2 or self.__done[-2] is not operation or self.__save_point == operation.number:
+            return False
+        last_operation = self.__done.pop()
+        operation.steps.extend(last_operation.steps)
+        operation.undo_steps[:0] = last_operation.undo_steps
+        operation.number = last_operation.number
+        operation.size += last_operation.size
+        return True
+
+    def clear(self) -> None:
+        """Drops all the operations, setting the save point to the current state (e.g. after the groups data was loaded)."""
+
+        self.__done.clear()
+        self.__undone.clear()
+        self.__size = 0
+        self.__last_number += 1
+        self.__base_state = self.__last_number
+        self.__save_point = self.__base_state
+
+    def get_state(self) -> int:
+        return self.__done[-1].number if self.__done else self.__base_state
+
+    def can_undo(self) -> bool:
+        return bool(self.__done)
+
+    def can_redo(self) -> bool:
+        return bool(self.__undone)
+
+    def peek_undo(self):
+        return self.__done[-1] if self.__done else None
+
+    def peek_redo(self):
+        return self.__undone[-1] if self.__undone else None
+
+    def take_undo(self):
+        """Returns the operation to undo, which is moved to the undone ones, or None if there is no such operation."""
+
+        if not self.__done:
+            return None
+        operation = self.__done.pop()
+        self.__undone.append(operation)
+        return operation
+
+    def take_redo(self):
+        """Returns the operation to redo, which is moved to the applied ones, or None if there is no such operation."""
+
+        if not self.__undone:
+            return None
+        operation = self.__undone.pop()
+        self.__done.append(operation)
+        return operation
+
+    def get_save_point(self) -> int:
+        return self.__save_point
+
+    def set_save_point(self, state=None) -> None:
+        self.__save_point = self.get_state() if state is None else state
+
+    def is_at_save_point(self) -> bool:
+        return self.get_state() == self.__save_point
+
+    def rewind_to_save_point(self) -> bool:
+        """
+        Moves the operations between the current state and the save point to the undone or to the applied ones, without 
+        applying them, for when the data was restored to the saved version by other means. If the save point was dropped 
+        meanwhile, the log is cleared instead and False is returned.
+        """
+
+        save_point = self.__save_point
+        if save_point == self.__base_state or any(operation.number == save_point for operation in self.__done):
+            while self.get_state() != save_point:
+                self.__undone.append(self.__done.pop())
+            return True
+        if any(operation.number == save_point for operation in self.__undone):
+            while self.get_state() != save_point:
+                self.__done.append(self.__undone.pop())
+            return True
+        self.clear()
+        return False
+
+
+class ListeningEventQueue:
+    """
+    Thread-safe queue which coalesces the file system events of the listening groups into batches, keeping only the net
+    change of each path. `on_batch_ready` is called from a background thread once per batch, and it must not block.
+    """
+
+    DEFAULT_BATCH_WINDOW_MS = 250
+    DEFAULT_MAX_QUEUE_DEPTH = 10000
+
+    def __init__(self, on_batch_ready, batch_window_ms=DEFAULT_BATCH_WINDOW_MS, max_queue_depth=DEFAULT_MAX_QUEUE_DEPTH) -> None:
+        self.on_batch_ready = on_batch_ready
+        self.batch_window_ms = batch_window_ms
+        self.max_queue_depth = max_queue_depth
+        # Key:(scope, path), Value:(exists, moved_from_path). Ordered by the time of the last event on the path.
+        self.__pending = dict()
+        self.__lock = threading.Lock()
+        self.__batch_timer = None
+        self.__batch_ready_signaled = False
+        self.__events_received = 0
+        self.__changes_taken = 0
+        self.__batches_taken = 0
+        self.__full_queue_flushes = 0
+        self.__last_batch_size = 0
+        self.__largest_batch_size = 0
+        self.__last_batch_duration_ms = 0.0
+
+    def push_created(self, scope, path) -> None:
+        with self.__lock:
+            key = (scope, path)
+            moved_from_path = self.__pending.pop(key, (False, None))[1]
+            self.__pending[key] = (True, moved_from_path)
+            self.__on_event_pushed()
+
+    def push_deleted(self, scope, path) -> None:
+        with self.__lock:
+            key = (scope, path)
+            moved_from_path = self.__pending.pop(key, (False, None))[1]
+            self.__pending[key] = (False, None)
+            # The file was moved in the batch, so the file it was moved from is gone unless it has been created again.
+            if moved_from_path is not None and (scope, moved_from_path) not in self.__pending:
+                self.__pending[(scope, moved_from_path)] = (False, None)
+            self.__on_event_pushed()
+
+    def push_moved(self, scope, old_path, new_path) -> None:
+        with self.__lock:
+            old_key = (scope, old_path)
+            new_key = (scope, new_path)
+            moved_from_path = self.__pending.get(old_key, (False, None))[1] or old_path
+            # The old path stays in the same position, so its removal is ordered before the move.
+            self.__pending[old_key] = (False, None)
+            self.__pending.pop(new_key, None)
+            self.__pending[new_key] = (True, moved_from_path)
+            self.__on_event_pushed()
+
+    def take_batch(self) -> list:
+        """
+        Takes the pending changes as a list of (scope, path, exists, moved_from_path) tuples. The changes with a 
+        `moved_from_path` are ordered first, then the deleted paths and then the created ones.
+        """
+
+        with self.__lock:
+            pending = self.__pending
+            self.__pending = dict()
+            if self.__batch_timer is not None:
+                self.__batch_timer.cancel()
+                self.__batch_timer = None
+            self.__batch_ready_signaled = False
+            self.__batches_taken += 1
+            self.__changes_taken += len(pending)
+            self.__last_batch_size = len(pending)
+            self.__largest_batch_size = max(self.__largest_batch_size, len(pending))
+        moved = []
+        deleted = []
+        created = []
+        for (scope, path), (exists, moved_from_path) in pending.items():
+            if moved_from_path is not None:
+                moved.append((scope, path, exists, moved_from_path))
+            elif exists:
+                created.append((scope, path, exists, None))
+            else:
+                deleted.append((scope, path, exists, None))
+        return moved + deleted + created
+
+    def record_batch_duration(self, duration_ms) -> None:
+        with self.__lock:
+            self.__last_batch_duration_ms = duration_ms
+
+    def get_metrics(self) -> dict:
+        with self.__lock:
+            return {
+                'batch_window_ms': self.batch_window_ms,
+                'max_queue_depth': self.max_queue_depth,
+                'queue_depth': len(self.__pending),
+                'events_received': self.__events_received,
+                'events_merged': self.__events_received - self.__changes_taken - len(self.__pending),
+                'batches_taken': self.__batches_taken,
+                'full_queue_flushes': self.__full_queue_flushes,
+                'last_batch_size': self.__last_batch_size,
+                'largest_batch_size': self.__largest_batch_size,
+                'last_batch_duration_ms': self.__last_batch_duration_ms
+            }
+
+    def __on_event_pushed(self) -> None:
+        self.__events_received += 1
+        if self.__batch_ready_signaled:
+            return
+        if len(self.__pending) >= self.max_queue_depth:
+            self.__full_queue_flushes += 1
+            if self.__batch_timer is not None:
+                self.__batch_timer.cancel()
+                self.__batch_timer = None
+            self.__signal_batch_ready()
+        elif self.__batch_timer is None:
+            self.__batch_timer = threading.Timer(self.batch_window_ms / 1000, self.__on_batch_window_passed)
+            self.__batch_timer.daemon = True
+            self.__batch_timer.start()
+
+    def __on_batch_window_passed(self) -> None:
+        with self.__lock:
+            self.__batch_timer = None
+            if self.__batch_ready_signaled or not self.__pending:
+                return
+            self.__signal_batch_ready()
+
+    def __signal_batch_ready(self) -> None:
+        self.__batch_ready_signaled = True
+        self.on_batch_ready()
+
+
+class ListeningSnapshots:
+    """
+    Compact snapshots of the listened directories (a [mtime_ns, inode] signature per relative file path), used to find
+    the changes made while the directories were not listened to.
+
+    JSON Format:
+    ```
+    {
+        <listening_dir>: {
+            <relative_file_path>: [<mtime_ns>, <inode>],
+            ...
+        },
+        ...
+    }
+    ```
+    """
+
+    def __init__(self) -> None:
+        # Key:listening_dir, Value:dict[relative_file_path, [mtime_ns, inode]]
+        self.__snapshots = dict()
+        self.__lock = threading.Lock()
+        self.__changed = False
+
+    def load_json(self, snapshots_json) -> None:
+        with self.__lock:
+            self.__snapshots = snapshots_json
+            self.__changed = False
+
+    def take_changed_json(self, listening_dirs):
+        """
+        Returns the snapshots of the given directories in the JSON format if they changed since they were last taken or 
+        loaded, otherwise None. The snapshots of the directories which are no longer listened to are dropped.
+        """
+
+        with self.__lock:
+            for listening_dir in [listening_dir for listening_dir in self.__snapshots if listening_dir not in listening_dirs]:
+                del self.__snapshots[listening_dir]
+                self.__changed = True
+            if not self.__changed:
+                return None
+            self.__changed = False
+            return {listening_dir: dict(snapshot) for listening_dir, snapshot in self.__snapshots.items()}
+
+    def has_snapshot(self, listening_dir) -> bool:
+        with self.__lock:
+            return listening_dir in self.__snapshots
+
+    def set_snapshot(self, listening_dir, snapshot) -> None:
+        with self.__lock:
+            self.__snapshots[listening_dir] = snapshot
+            self.__changed = True
+
+    def diff(self, listening_dir, fresh_snapshot) -> list:
+        """
+        Returns the changes between the snapshot of the directory and a fresh scan of it. Without a snapshot, all the files 
+        are reported as created.
+        """
+
+        with self.__lock:
+            snapshot = self.__snapshots.get(listening_dir, dict())
+            removed_names = [name for name in snapshot if name not in fresh_snapshot]
+            added_names = [name for name in fresh_snapshot if name not in snapshot]
+            removed_signatures = {tuple(snapshot[name]): name for name in removed_names}
+        moved = []
+        created_names = []
+        for name in added_names:
+            old_name = removed_signatures.pop(tuple(fresh_snapshot[name]), None)
+            if old_name is not None:
+                moved.append((listening_dir, self.__join(listening_dir, name), True, self.__join(listening_dir, old_name)))
+            else:
+                created_names.append(name)
+        deleted = [(listening_dir, self.__join(listening_dir, name), False, None) for name in removed_signatures.values()]
+        return moved + deleted + self.get_files_as_created(listening_dir, created_names)
+
+    @staticmethod
+    def get_files_as_created(listening_dir, file_names) -> list:
+        """Returns the changes for the given files of the directory being created (e.g. for a group which starts listening to it)."""
+
+        return [(listening_dir, ListeningSnapshots.__join(listening_dir, name), True, None) for name in file_names]
+
+    def apply_changes(self, changes) -> None:
+        """Updates the snapshots with the changes applied to the listening groups. The created files are looked up for their signatures."""
+
+        with self.__lock:
+            for listening_dir, file_path, exists, moved_from_path in changes:
+                snapshot = self.__snapshots.get(listening_dir)
+                if snapshot is None:
+                    continue
+                if moved_from_path is not None:
+                    snapshot.pop(ListeningSnapshots.get_relative_path(listening_dir, moved_from_path), None)
+                name = ListeningSnapshots.get_relative_path(listening_dir, file_path)
+                if exists:
+                    try:
+                        stat = os.stat(file_path)
+                    except OSError:
+                        continue
+                    snapshot[name] = [stat.st_mtime_ns, stat.st_ino]
+                else:
+                    snapshot.pop(name, None)
+                self.__changed = True
+
+    @staticmethod
+    def scan(listening_dir, listening_filters) -> dict:
+        """
+        Returns a fresh snapshot of the files of the directory matched by any of the given filters. The subdirectories are 
+        scanned only if a filter may match their files.
+        """
+
+        snapshot = dict()
+        pending_dirs = [('', listening_dir)]
+        while pending_dirs:
+            relative_dir_path, dir_path = pending_dirs.pop()
+            try:
+                dir_entries = os.scandir(dir_path)
+            except OSError:
+                # Only a missing listening directory is an error, the subdirectories may be removed while scanning.
+                if not relative_dir_path:
+                    raise
+                continue
+            with dir_entries:
+                for dir_entry in dir_entries:
+                    relative_path = relative_dir_path + dir_entry.name
+                    try:
+                        if dir_entry.is_file():
+                            if any(listening_filter.matches(relative_path) for listening_filter in listening_filters):
+                                snapshot[relative_path] = [dir_entry.stat().st_mtime_ns, dir_entry.inode()]
+                        elif dir_entry.is_dir(follow_symlinks=False):
+                            if any(listening_filter.matches_dir(relative_path) for listening_filter in listening_filters):
+                                pending_dirs.append((relative_path + '/', dir_entry.path))
+                    except OSError:
+                        continue
+        return snapshot
+
+    @staticmethod
+    def get_relative_path(listening_dir, file_path) -> str:
+        return file_path[len(listening_dir):].lstrip('/')
+
+    @staticmethod
+    def __join(listening_dir, name) -> str:
+        # The paths are formatted like the ones of the listening events.
+        return os.path.join(listening_dir, name).replace(os.sep, '/')
+
+
+class WatchRegistry:
+    """
+    Registry of the directories listened to by the groups, each one scheduled once on the watchdog observer with a
+    reference count of its subscribers. The events are filtered in the observer thread by the subscribers' filters.
+    """
+
+    def __init__(self, observer, on_created, on_deleted, on_moved) -> None:
+        self.observer = observer
+        self.on_created = on_created
+        self.on_deleted = on_deleted
+        self.on_moved = on_moved
+        # The subscriptions are tuples which are replaced, not changed, so the observer thread can read them without locking.
+        # Key:listening_dir, Value:tuple[ListeningFilter] (one per subscriber)
+        self.__subscriptions = dict()
+        # Key:listening_dir, Value:(ObservedWatch, recursive)
+        self.__watches = dict()
+        self.__lock = threading.Lock()
+
+    def subscribe(self, listening_dir, listening_filter) -> None:
+        with self.__lock:
+            self.__subscriptions[listening_dir] = self.__subscriptions.get(listening_dir, ()) + (listening_filter,)
+            self.__update_watch(listening_dir)
+
+    def unsubscribe(self, listening_dir, listening_filter) -> None:
+        """Removes a subscription to the directory with the given filter (the subscribers with equal filters are interchangeable)."""
+
+        with self.__lock:
+            subscriptions = list(self.__subscriptions.get(listening_dir, ()))
+            if listening_filter in subscriptions:
+                subscriptions.remove(listening_filter)
+            if subscriptions:
+                self.__subscriptions[listening_dir] = tuple(subscriptions)
+            else:
+                self.__subscriptions.pop(listening_dir, None)
+            self.__update_watch(listening_dir)
+
+    def unsubscribe_all(self) -> None:
+        with self.__lock:
+            self.__subscriptions.clear()
+            for listening_dir in list(self.__watches):
+                self.__update_watch(listening_dir)
+
+    def get_filters(self, listening_dir) -> tuple:
+        return self.__subscriptions.get(listening_dir, ())
+
+    def get_subscribers_count(self, listening_dir) -> int:
+        return len(self.__subscriptions.get(listening_dir, ()))
+
+    def __update_watch(self, listening_dir) -> None:
+        subscriptions = self.__subscriptions.get(listening_dir, ())
+        recursive = any(listening_filter.recursive for listening_filter in subscriptions)
+        watch = self.__watches.get(listening_dir)
+        if watch is not None and (not subscriptions or watch[1] != recursive):
+            self.observer.unschedule(watch[0])
+            del self.__watches[listening_dir]
+            watch = None
+        if watch is None and subscriptions:
+            handler = WatchEventHandler(self, listening_dir)
+            self.__watches[listening_dir] = (self.observer.schedule(handler, listening_dir, recursive=recursive), recursive)
+
+    def dispatch(self, listening_dir, event) -> None:
+        if event.is_directory or event.event_type not in ('created', 'deleted', 'moved'):
+            return
+        subscriptions = self.__subscriptions.get(listening_dir)
+        if not subscriptions:
+            return
+        path = event.src_path.replace(os.sep, '/')
+        is_matched = self.__is_matched(listening_dir, subscriptions, path)
+        if event.event_type == 'moved':
+            new_path = event.dest_path.replace(os.sep, '/')
+            is_new_path_matched = self.__is_matched(listening_dir, subscriptions, new_path)
+            if is_matched and is_new_path_matched:
+                self.on_moved(listening_dir, path, new_path)
+            elif is_matched:
+                self.on_deleted(listening_dir, path)
+            elif is_new_path_matched:
+                self.on_created(listening_dir, new_path)
+        elif is_matched:
+            if event.event_type == 'created':
+                self.on_created(listening_dir, path)
+            else:
+                self.on_deleted(listening_dir, path)
+
+    @staticmethod
+    def __is_matched(listening_dir, subscriptions, path) -> bool:
+        # A path moved out of the directory is not matched.
+        if not path.startswith(listening_dir.rstrip('/') + '/'):
+            return False
+        relative_path = ListeningSnapshots.get_relative_path(listening_dir, path)
+        return any(listening_filter.matches(relative_path) for listening_filter in subscriptions)
+
+
+class WatchEventHandler:
+    """The watchdog event handler of a directory scheduled by the `WatchRegistry`, which passes the events to the registry."""
+
+    __slots__ = ('registry', 'listening_dir')
+
+    def __init__(self, registry, listening_dir) -> None:
+        self.registry = registry
+        self.listening_dir = listening_dir
+
+    def dispatch(self, event) -> None:
+        self.registry.dispatch(self.listening_dir, event)
+
+
+class LauncherBackend(abc.ABC):
+    """
+    Base class for the platform specific ways of launching the group entries. The handler of an entry is resolved once
+    per association key, and it's resolved again when the association version of the key changes.
+    """
+
+    # The association key of the web pages, which are opened with the browser.
+    ASSOCIATION_WEB_BROWSER = 'web_browser'
+    # The association key of the executable files, which are run by themselves.
+    ASSOCIATION_EXECUTABLE = 'executable'
+    # The name under which the application is started at login.
+    APP_NAME = 'OpenMyFiles'
+
+    def get_file_entry_type(self, file_path) -> str:
+        if file_path.split('.')[-1] == 'exe':
+            return AppData.ENTRY_EXE_FILE
+        return AppData.ENTRY_OTHER_FILE
+
+    def get_association_key(self, entry):
+        if entry.type == AppData.ENTRY_WEB_PAGE:
+            return self.ASSOCIATION_WEB_BROWSER
+        if entry.type == AppData.ENTRY_EXE_FILE:
+            return self.ASSOCIATION_EXECUTABLE
+        return os.path.splitext(entry.path)[1].lower()
+
+    def get_association_version(self, association_key):
+        return None
+
+    def resolve_handler(self, entry):
+        return None
+
+    def get_browser_path(self) -> str:
+        """Returns the path to the default browser. Raises `OSError` if it can't be found."""
+
+        raise OSError('The default browser is not known')
+
+    def launch_file(self, file_path, handler):
+        """
+        Launches the file with a handler given by `resolve_handler`. Returns the started process, or None if it's not known 
+        (e.g. the file was opened through the shell). Raises `OSError` if it can't be launched.
+        """
+
+        self.open_with_default(file_path)
+        return None
+
+    def wait_for_window(self, process, timeout_s) -> bool:
+        """
+        Waits until a process started by `launch_file` shows its first window. Returns False if it timed out or if it 
+        can't be detected (e.g. on this platform, or for a console process).
+        """
+
+        return False
+
+    @abc.abstractmethod
+    def open_with_default(self, target) -> None:
+        """Opens a file or address with the system default mechanism."""
+
+    def set_start_at_login(self, command) -> None:
+        """
+        Makes a command (a tuple of arguments) run when the user logs in, replacing the previous one, or stops running it 
+        if the command is None. Does nothing on the platforms where it's not supported.
+        """
+
+        pass
+
+
+class WindowsLauncherBackend(LauncherBackend):
+    """Launches the entries on Windows, with the command line templates of the file extensions as handlers."""
+
+    FILE_EXTS_KEY_PATH = 'Software\\Microsoft\\Windows\\CurrentVersion\\Explorer\\FileExts'
+    URL_ASSOCIATIONS_KEY_PATH = 'Software\\Microsoft\\Windows\\Shell\\Associations\\UrlAssociations'
+    RUN_KEY_PATH = 'Software\\Microsoft\\Windows\\CurrentVersion\\Run'
+
+    def get_association_version(self, association_key):
+        import winreg
+        if association_key == self.ASSOCIATION_EXECUTABLE:
+            return None
+        if association_key == self.ASSOCIATION_WEB_BROWSER:
+            key_paths = ((winreg.HKEY_CURRENT_USER, f'{self.FILE_EXTS_KEY_PATH}\\.html\\UserChoice'), 
+                         (winreg.HKEY_CURRENT_USER, f'{self.URL_ASSOCIATIONS_KEY_PATH}\\https\\UserChoice'))
+        else:
+            key_paths = ((winreg.HKEY_CURRENT_USER, f'{self.FILE_EXTS_KEY_PATH}\\{association_key}\\UserChoice'), 
+                         (winreg.HKEY_CLASSES_ROOT, association_key))
+        version = []
+        for root_key, key_path in key_paths:
+            try:
+                with winreg.OpenKey(root_key, key_path) as key:
+                    version.append(winreg.QueryInfoKey(key)[2])
+            except OSError:
+                version.append(None)
+        return tuple(version)
+
+    def resolve_handler(self, entry):
+        import ctypes
+        association_key = self.get_association_key(entry)
+        if association_key in (self.ASSOCIATION_EXECUTABLE, self.ASSOCIATION_WEB_BROWSER, ''):
+            return None
+        ASSOCSTR_COMMAND = 1
+        S_OK = 0
+        size = ctypes.c_uint(0)
+        assoc_query_string = ctypes.windll.shlwapi.AssocQueryStringW
+        assoc_query_string(0, ASSOCSTR_COMMAND, association_key, 'open', None, ctypes.byref(size))
+        if size.value == 0:
+            return None
+        command = ctypes.create_unicode_buffer(size.value)
+        if assoc_query_string(0, ASSOCSTR_COMMAND, association_key, 'open', command, ctypes.byref(size)) != S_OK:
+            return None
+        return command.value or None
+
+    def get_browser_path(self) -> str:
+        import winreg
+        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, f'{self.FILE_EXTS_KEY_PATH}\\.html\\UserChoice') as id_key:
+            browser_id = winreg.QueryValueEx(id_key, 'ProgId')[0]
+        with winreg.OpenKey(winreg.HKEY_CLASSES_ROOT, f"{browser_id}\\shell\\open\\command") as path_key:
+            browser_path = winreg.QueryValueEx(path_key, '')[0]
+        return browser_path.split('"')[1]
+
+    def launch_file(self, file_path, handler):
+        import subprocess
+        if handler is None:
+            self.open_with_default(file_path)
+            return None
+        # %1 and %L are replaced by the file path, while the other placeholders (e.g. %*) are dropped.
+        command = re.sub(r'%([0-9*]|[lL])', lambda match: file_path if match.group(1) in '1lL' else '', os.path.expandvars(handler))
+        return subprocess.Popen(command, creationflags=subprocess.DETACHED_PROCESS, cwd=os.path.dirname(file_path))
+
+    def wait_for_window(self, process, timeout_s) -> bool:
+        import ctypes
+        WAIT_SUCCESS = 0
+        # It returns once the process waits for user input after its startup, i.e. after its first window is shown. It
+        # fails right away for the console processes.
+        return ctypes.windll.user32.WaitForInputIdle(ctypes.c_void_p(int(process._handle)), int(timeout_s * 1000)) == WAIT_SUCCESS
+
+    def open_with_default(self, target) -> None:
+        os.startfile(target)
+
+    def set_start_at_login(self, command) -> None:
+        import winreg
+        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, self.RUN_KEY_PATH, access=winreg.KEY_SET_VALUE) as reg_key:
+            if command is None:
+                try:
+                    winreg.DeleteValue(reg_key, self.APP_NAME)
+                except FileNotFoundError:
+                    pass
+            else:
+                winreg.SetValueEx(reg_key, self.APP_NAME, 0, winreg.REG_SZ, ' '.join(f'"{argument}"' for argument in command))
+
+
+class LinuxLauncherBackend(LauncherBackend):
+    """
+    Launches the entries on Linux, with the commands of the desktop entries associated to the MIME types as handlers.
+    """
+
+    EXECUTABLE_HANDLER = ('%f',)
+    DEFAULT_HANDLER = ('xdg-open', '%f')
+
+    def get_file_entry_type(self, file_path) -> str:
+        if os.path.isfile(file_path) and os.access(file_path, os.X_OK):
+            return AppData.ENTRY_EXE_FILE
+        return super().get_file_entry_type(file_path)
+
+    def get_association_key(self, entry):
+        import mimetypes
+        association_key = super().get_association_key(entry)
+        if association_key in (self.ASSOCIATION_EXECUTABLE, self.ASSOCIATION_WEB_BROWSER):
+            return association_key
+        # The files with an unknown type are resolved one by one, by their content.
+        return mimetypes.guess_type(entry.path)[0] or ('path', entry.path)
+
+    def get_association_version(self, association_key):
+        version = []
+        for directory in (self.__get_config_home(), *self.__get_data_dirs()):
+            for file_name in ('mimeapps.list', os.path.join('applications', 'mimeapps.list'), os.path.join('applications', 'mimeinfo.cache')):
+                try:
+                    version.append(os.stat(os.path.join(directory, file_name)).st_mtime_ns)
+                except OSError:
+                    version.append(None)
+        return tuple(version)
+
+    def resolve_handler(self, entry):
+        association_key = self.get_association_key(entry)
+        if association_key == self.ASSOCIATION_EXECUTABLE:
+            return self.EXECUTABLE_HANDLER
+        mime_type = association_key
+        if isinstance(association_key, tuple):
+            mime_type = self.__run_xdg_mime('query', 'filetype', entry.path)
+        command = self.__get_desktop_entry_command(self.__run_xdg_mime('query', 'default', mime_type)) if mime_type else None
+        return command or self.DEFAULT_HANDLER
+
+    def get_browser_path(self) -> str:
+        import shutil
+        command = self.__get_desktop_entry_command(self.__run_xdg_mime('query', 'default', 'x-scheme-handler/https'))
+        browser_path = shutil.which(command[0]) if command else None
+        if browser_path is None:
+            raise OSError('The default browser is not known')
+        return browser_path
+
+    def launch_file(self, file_path, handler):
+        import subprocess
+        arguments = []
+        for argument in handler:
+            # The other field codes (e.g. the icon or the name of the desktop entry) are dropped, with their argument.
+            if len(argument) == 2 and argument[0] == '%' and argument not in ('%f', '%F', '%u', '%U', '%%'):
+                continue
+            arguments.append(re.sub('%(.)', lambda match: file_path if match.group(1) in 'fFuU' else '%' if match.group(1) == '%' else '', argument))
+        return subprocess.Popen(arguments, start_new_session=True, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def open_with_default(self, target) -> None:
+        self.launch_file(target, self.DEFAULT_HANDLER)
+
+    def set_start_at_login(self, command) -> None:
+        # The command is started by an XDG autostart desktop entry.
+        autostart_dir = os.path.join(self.__get_config_home(), 'autostart')
+        desktop_path = os.path.join(autostart_dir, f'{self.APP_NAME}.desktop')
+        if command is None:
+            try:
+                os.remove(desktop_path)
+            except FileNotFoundError:
+                pass
+            return
+        # In the Exec key, the arguments are quoted with double quotes, in which ", `, $ and \ are escaped, and % is doubled.
+        exec_value = ' '.join('"' + re.sub(r'(["`$\\])', r'\\\1', argument).replace('%', '%%') + '"' for argument in command)
+        os.makedirs(autostart_dir, exist_ok=True)
+        with open(desktop_path, 'w', encoding='utf-8') as f:
+            f.write(f'[Desktop Entry]\nType=Application\nName={self.APP_NAME}\nExec={exec_value}\n')
+
+    @staticmethod
+    def __get_config_home() -> str:
+        return os.getenv('XDG_CONFIG_HOME') or os.path.join(os.path.expanduser('~'), '.config')
+
+    @staticmethod
+    def __get_data_dirs() -> list:
+        data_home = os.getenv('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+        return [data_home, *(os.getenv('XDG_DATA_DIRS') or '/usr/local/share:/usr/share').split(':')]
+
+    @staticmethod
+    def __run_xdg_mime(*arguments) -> str:
+        import subprocess
+        try:
+            return subprocess.run(['xdg-mime', *arguments], capture_output=True, text=True, timeout=5).stdout.strip()
+        except (OSError, subprocess.SubprocessError):
+            return ''
+
+    def __get_desktop_entry_command(self, desktop_id):
+        """Returns the command of a desktop entry as a tuple of arguments, or None if the desktop entry is not found."""
+
+        import shlex
+        if not desktop_id:
+            return None
+        for data_dir in self.__get_data_dirs():
+            # The desktop entries in subdirectories have the directory name in their id (e.g. kde-app.desktop is kde/app.desktop).
+            desktop_path = os.path.join(data_dir, 'applications', desktop_id)
+            if not os.path.isfile(desktop_path):
+                desktop_path = os.path.join(data_dir, 'applications', *desktop_id.split('-', 1))
+                if not os.path.isfile(desktop_path):
+                    continue
+            in_main_group = False
+            with open(desktop_path, 'r', encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    line = line.strip()
+                    if line.startswith('['):
+                        in_main_group = line == '[Desktop Entry]'
+                    elif in_main_group and line.startswith('Exec='):
+                        try:
+                            return tuple(shlex.split(line[len('Exec='):])) or None
+                        except ValueError:
+                            return None
+        return None
+
+
+class FakeLauncherBackend(LauncherBackend):
+    """A launcher backend which launches nothing and records what it would have done, for testing without a desktop."""
+
+    def __init__(self, browser_path='fake-browser') -> None:
+        self.browser_path = browser_path
+        # Key:association_key, Value:version
+        self.association_versions = dict()
+        self.resolved_entries = []
+        # list[(file_path, handler)]
+        self.launched_files = []
+        self.start_at_login_command = None
+
+    def get_association_version(self, association_key):
+        return self.association_versions.get(association_key)
+
+    def resolve_handler(self, entry):
+        self.resolved_entries.append(entry)
+        return self.get_association_key(entry)
+
+    def get_browser_path(self) -> str:
+        return self.browser_path
+
+    def launch_file(self, file_path, handler):
+        self.launched_files.append((file_path, handler))
+        return None
+
+    def open_with_default(self, target) -> None:
+        self.launched_files.append((target, None))
+
+    def set_start_at_login(self, command) -> None:
+        self.start_at_login_command = command
+
+
+class LaunchPlanner:
+    """
+    Keeps the resolved handlers of the entries of each opened group, so that opening a group again doesn't resolve them
+    again unless the entries or their associations changed.
+    """
+
+    def __init__(self, backend) -> None:
+        self.backend = backend
+        self.__lock = threading.Lock()
+        # Key:group_id, Value:dict[(entry_path, entry_type), (association_key, association_version, handler)]
+        self.__plans = dict()
+        # Key:association_key, Value:(association_version, handler)
+        self.__handlers = dict()
+        self.resolved_handlers_count = 0
+
+    def get_plan(self, group_id, entries) -> list:
+        """Returns the (entry, handler) pairs for launching the entries of the group."""
+
+        with self.__lock:
+            old_plan = self.__plans.get(group_id, dict())
+            plan = dict()
+            # The association version of each key is read once per plan.
+            versions = dict()
+            entry_handlers = []
+            for entry in entries:
+                plan_key = (entry.path, entry.type)
+                planned = old_plan.get(plan_key) or plan.get(plan_key)
+                association_key = planned[0] if planned is not None else self.backend.get_association_key(entry)
+                if association_key not in versions:
+                    versions[association_key] = self.backend.get_association_version(association_key)
+                if planned is None or planned[1] != versions[association_key]:
+                    planned = (association_key, versions[association_key], self.__get_handler(entry, association_key, versions[association_key]))
+                plan[plan_key] = planned
+                entry_handlers.append((entry, planned[2]))
+            # The entries which are not in the group anymore are dropped from the plan.
+            self.__plans[group_id] = plan
+            return entry_handlers
+
+    def keep_plans(self, group_ids) -> None:
+        """Drops the plans of the groups which are not in `group_ids` (e.g. the deleted ones)."""
+
+        with self.__lock:
+            for group_id in [group_id for group_id in self.__plans if group_id not in group_ids]:
+                del self.__plans[group_id]
+
+    def get_browser_path(self) -> str:
+        with self.__lock:
+            association_key = LauncherBackend.ASSOCIATION_WEB_BROWSER
+            version = self.backend.get_association_version(association_key)
+            cached = self.__handlers.get(association_key)
+            if cached is None or cached[0] != version:
+                cached = (version, self.backend.get_browser_path())
+                self.__handlers[association_key] = cached
+            return cached[1]
+
+    def __get_handler(self, entry, association_key, version):
+        if association_key == LauncherBackend.ASSOCIATION_WEB_BROWSER:
+            return None
+        cached = self.__handlers.get(association_key)
+        if cached is None or cached[0] != version:
+            cached = (version, self.backend.resolve_handler(entry))
+            self.__handlers[association_key] = cached
+            self.resolved_handlers_count += 1
+        return cached[1]
+
+
+class BrowserLauncher:
+    """
+    Opens web pages with a browser executable, passing as many pages as the command line limit allows to each browser
+    invocation. The next invocations wait until the first browser is ready.
+    """
+
+    # Windows limits a command line to 32767 characters.
+    DEFAULT_MAX_COMMAND_LINE_LENGTH = 32000 if os.name == 'nt' else 128 * 1024
+    DEFAULT_READY_TIMEOUT_S = 5
+
+    def __init__(self, browser_path=None, max_command_line_length=DEFAULT_MAX_COMMAND_LINE_LENGTH, ready_timeout_s=DEFAULT_READY_TIMEOUT_S, resolve_browser_path=None) -> None:
+        self.__browser_path = browser_path
+        self.__resolve_browser_path = resolve_browser_path
+        self.max_command_line_length = max_command_line_length
+        self.ready_timeout_s = ready_timeout_s
+
+    @property
+    def browser_path(self) -> str:
+        return self.resolve_browser_path()
+
+    def resolve_browser_path(self) -> str:
+        """Returns the browser path, resolving it if needed. Raises `OSError` if it can't be resolved."""
+
+        if self.__browser_path is None and self.__resolve_browser_path is not None:
+            return self.__resolve_browser_path()
+        return self.__browser_path
+
+    def split_in_chunks(self, urls, browser_path=None) -> list:
+        """Splits the URLs in lists which fit in a browser command line (a URL too long for any command line gets its own list)."""
+
+        import subprocess
+        browser_path = browser_path if browser_path is not None else self.browser_path
+        chunks = []
+        chunk = []
+        command_line_length = len(subprocess.list2cmdline([browser_path]))
+        for url in urls:
+            # The argument is separated by a space and it may be quoted.
+            url_length = len(subprocess.list2cmdline([url])) + 1
+            if chunk and command_line_length + url_length > self.max_command_line_length:
+                chunks.append(chunk)
+                chunk = []
+                command_line_length = len(subprocess.list2cmdline([browser_path]))
+            chunk.append(url)
+            command_line_length += url_length
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    def spawn(self, urls, browser_path=None) -> 'subprocess.Popen':
+        import subprocess
+        browser_path = browser_path if browser_path is not None else self.browser_path
+        if os.name == 'nt':
+            return subprocess.Popen([browser_path, *urls], creationflags=subprocess.DETACHED_PROCESS)
+        return subprocess.Popen([browser_path, *urls], start_new_session=True, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def wait_until_ready(self, process) -> bool:
+        """
+        Waits for the browser process to be ready to receive more pages. Returns False if the timeout passed before that.
+
+        A browser which is already running usually hands the pages to the running instance and exits, so an exited process 
+        is considered ready. On Windows, a process which keeps running is ready once it waits for user input.
+        """
+
+        deadline = time.perf_counter() + self.ready_timeout_s
+        if os.name == 'nt':
+            import ctypes
+            WAIT_TIMEOUT = 0x102
+            result = ctypes.windll.user32.WaitForInputIdle(int(process._handle), int(self.ready_timeout_s * 1000))
+            if result != WAIT_TIMEOUT:
+                return True
+        while time.perf_counter() < deadline:
+            if process.poll() is not None:
+                return True
+            time.sleep(0.05)
+        return process.poll() is not None
+
+    def open_pages(self, urls, on_chunk_launched=None) -> bool:
+        """
+        Opens the web pages. The `on_chunk_launched` callable is called with each list of URLs passed to the browser and 
+        whether the browser could be launched. Returns False if any browser invocation failed.
+        """
+
+        try:
+            browser_path = self.resolve_browser_path()
+        except OSError:
+            if on_chunk_launched is not None:
+                on_chunk_launched(urls, False)
+            return False
+        success = True
+        for index, chunk in enumerate(self.split_in_chunks(urls, browser_path)):
+            try:
+                process = self.spawn(chunk, browser_path)
+            except OSError:
+                process = None
+                success = False
+            if on_chunk_launched is not None:
+                on_chunk_launched(chunk, process is not None)
+            if index == 0 and process is not None and len(chunk) < len(urls):
+                self.wait_until_ready(process)
+        return success
+
+
+class LaunchTelemetry:
+    """
+    Rolling history of the launch times of the file entries, kept by path in a JSON file:
+    ```
+    {<entry_path>: {"spawn_ms": [<type_float>, ...], "window_ms": [<type_float>, ...]}, ...}
+    ```
+    """
+
+    KEY_SPAWN_MS = 'spawn_ms'
+    KEY_WINDOW_MS = 'window_ms'
+
+    MAX_SAMPLES = 10
+    MAX_ENTRIES = 5000
+
+    def __init__(self, stats_path) -> None:
+        self.stats_path = stats_path
+        # Key:entry_path, Value:dict[samples_key, list[milliseconds]]. Ordered by the time of the last launch.
+        self.__stats = None
+        self.__changed = False
+        self.__lock = threading.Lock()
+
+    def record_spawn(self, entry_path, spawn_ms) -> None:
+        self.__record(entry_path, self.KEY_SPAWN_MS, spawn_ms)
+
+    def record_window(self, entry_path, window_ms) -> None:
+        self.__record(entry_path, self.KEY_WINDOW_MS, window_ms)
+
+    def get_stats(self, entry_path):
+        """Returns the number of launches and the median spawn and window times of the entry, or None if it was not launched."""
+
+        with self.__lock:
+            entry_stats = self.__get_all_stats().get(entry_path)
+            if entry_stats is None or not entry_stats.get(self.KEY_SPAWN_MS):
+                return None
+            return {
+                'launches': len(entry_stats[self.KEY_SPAWN_MS]),
+                self.KEY_SPAWN_MS: self.__get_median(entry_stats[self.KEY_SPAWN_MS]),
+                self.KEY_WINDOW_MS: self.__get_median(entry_stats.get(self.KEY_WINDOW_MS))
+            }
+
+    def get_expected_ms(self, entry_path) -> float:
+        """Returns the usual time for the entry to start (its window time if known, else its spawn time), or 0 if it was not launched."""
+
+        entry_stats = self.get_stats(entry_path)
+        if entry_stats is None:
+            return 0
+        return entry_stats[self.KEY_WINDOW_MS] or entry_stats[self.KEY_SPAWN_MS]
+
+    def get_report(self, entries) -> str:
+        """Returns a table of the launch stats of the given file entries, from the slowest one."""
+
+        rows = []
+        not_launched_count = 0
+        for entry in entries:
+            if entry.type == AppData.ENTRY_WEB_PAGE:
+                continue
+            entry_stats = self.get_stats(entry.path)
+            if entry_stats is None:
+                not_launched_count += 1
+            else:
+                rows.append((entry_stats[self.KEY_WINDOW_MS] or entry_stats[self.KEY_SPAWN_MS], entry_stats, entry.path))
+        rows.sort(key=lambda row: row[0], reverse=True)
+        lines = [f"{'Spawn (ms)':>10}  {'Window (ms)':>11}  {'Launches':>8}  Path"]
+        for _, entry_stats, entry_path in rows:
+            window_ms = entry_stats[self.KEY_WINDOW_MS]
+            lines.append(f"{entry_stats[self.KEY_SPAWN_MS]:>10.1f}  {'-' if window_ms is None else f'{window_ms:.1f}':>11}  {entry_stats['launches']:>8}  {entry_path}")
+        if not_launched_count:
+            lines.append(f"{not_launched_count} {'file' if not_launched_count == 1 else 'files'} not launched yet")
+        return '\n'.join(lines)
+
+    def save(self) -> None:
+        """Writes the history, if it changed since it was read or last written."""
+
+        with self.__lock:
+            if not self.__changed:
+                return
+            stats_json = json.dumps(self.__stats)
+            os.makedirs(os.path.split(self.stats_path)[0], exist_ok=True)
+            write_file_atomically(self.stats_path, stats_json)
+            self.__changed = False
+
+    def __record(self, entry_path, samples_key, milliseconds) -> None:
+        with self.__lock:
+            stats = self.__get_all_stats()
+            entry_stats = stats.pop(entry_path, None) or dict()
+            stats[entry_path] = entry_stats
+            samples = entry_stats.setdefault(samples_key, [])
+            samples.append(round(milliseconds, 1))
+            del samples[:-self.MAX_SAMPLES]
+            while len(stats) > self.MAX_ENTRIES:
+                del stats[next(iter(stats))]
+            self.__changed = True
+
+    def __get_all_stats(self) -> dict:
+        # Called with the lock held.
+        if self.__stats is None:
+            self.__stats = dict()
+            if os.path.isfile(self.stats_path):
+                try:
+                    with open(self.stats_path, 'r') as f:
+                        self.__stats = json.load(f)
+                except (OSError, ValueError):
+                    # The history is only informative, so a damaged file is started over.
+                    pass
+        return self.__stats
+
+    @staticmethod
+    def __get_median(samples):
+        if not samples:
+            return None
+        return sorted(samples)[len(samples) // 2]
+
+
+class EntryHealthChecker:
+    """
+    Checks in the background whether the files of the entries exist, and caches the state of each path for a limited
+    time. `on_checked` is called from a background thread when states change, and it must not block.
+    """
+
+    STATE_OK = 'ok'
+    STATE_MISSING = 'missing'
+    STATE_SLOW = 'slow'
+
+    DEFAULT_MAX_WORKERS = 4
+    DEFAULT_TIMEOUT_S = 2
+    DEFAULT_TTL_S = 60
+
+    def __init__(self, on_checked=None, max_workers=DEFAULT_MAX_WORKERS, timeout_s=DEFAULT_TIMEOUT_S, ttl_s=DEFAULT_TTL_S) -> None:
+        self.on_checked = on_checked
+        self.max_workers = max(1, max_workers)
+        self.timeout_s = timeout_s
+        self.ttl_s = ttl_s
+        # Key:path, Value:(state, the time when it was checked)
+        self.__states = dict()
+        # The paths to check. Key:path, Value:the time when its check started, or None if it's queued.
+        self.__pending = dict()
+        self.__queued_paths = deque()
+        self.__checked_paths = set()
+        # The (path, start time) of the checks which timed out while their workers are stuck.
+        self.__timed_out_checks = set()
+        self.__workers_count = 0
+        self.__monitoring = False
+        self.__lock = threading.Lock()
+
+    def get_state(self, path):
+        """Returns the cached state of the path, or None if it was not checked or its state expired."""
+
+        with self.__lock:
+            state = self.__states.get(path)
+            if state is None or time.monotonic() - state[1] > self.ttl_s:
+                return None
+            return state[0]
+
+    def set_state(self, path, exists) -> None:
+        """Caches the state of a path which was checked by other means (e.g. when opening the entry)."""
+
+        with self.__lock:
+            self.__pending.pop(path, None)
+            self.__set_state(path, self.STATE_OK if exists else self.STATE_MISSING)
+
+    def check(self, paths) -> None:
+        """Checks in the background the given paths whose states are not cached."""
+
+        with self.__lock:
+            now = time.monotonic()
+            for path in paths:
+                if path in self.__pending:
+                    continue
+                state = self.__states.get(path)
+                if state is not None and now - state[1] <= self.ttl_s:
+                    continue
+                self.__pending[path] = None
+                self.__queued_paths.append(path)
+            self.__start_workers()
+
+    def invalidate(self, paths) -> None:
+        """Drops the cached states of the given paths. The checks in progress for them are ignored."""
+
+        with self.__lock:
+            for path in paths:
+                self.__states.pop(path, None)
+                self.__pending.pop(path, None)
+
+    def take_checked_paths(self) -> set:
+        """Takes the paths whose states changed since the last call."""
+
+        with self.__lock:
+            checked_paths = self.__checked_paths
+            self.__checked_paths = set()
+            return checked_paths
+
+    def __set_state(self, path, state) -> bool:
+        # Called with the lock held. Returns True if the consumer should be signaled.
+        old_state = self.__states.get(path)
+        self.__states[path] = (state, time.monotonic())
+        if old_state is not None and old_state[0] == state:
+            return False
+        was_empty = not self.__checked_paths
+        self.__checked_paths.add(path)
+        return was_empty
+
+    def __start_workers(self) -> None:
+        # Called with the lock held.
+        while self.__workers_count < min(self.max_workers, len(self.__queued_paths)):
+            self.__workers_count += 1
+            # Daemon threads are used since a worker may be stuck on a path and it must not keep the application running.
+            threading.Thread(target=self.__async_worker, daemon=True).start()
+        if self.__workers_count and not self.__monitoring:
+            self.__monitoring = True
+            threading.Thread(target=self.__async_monitoring, daemon=True).start()
+
+    def __async_worker(self) -> None:
+        while True:
+            with self.__lock:
+                path = None
+                while self.__queued_paths:
+                    path = self.__queued_paths.popleft()
+                    # The path may have been invalidated or queued again meanwhile.
+                    if path in self.__pending and self.__pending[path] is None:
+                        break
+                    path = None
+                if path is None:
+                    self.__workers_count -= 1
+                    return
+                start_time = time.monotonic()
+                self.__pending[path] = start_time
+            state = self.STATE_OK if os.path.isfile(path) else self.STATE_MISSING
+            with self.__lock:
+                should_signal = False
+                timed_out = (path, start_time) in self.__timed_out_checks
+                if timed_out:
+                    # The slow path got its state late, unless it was invalidated meanwhile.
+                    self.__timed_out_checks.discard((path, start_time))
+                    if path not in self.__pending and self.__states.get(path, (None,))[0] == self.STATE_SLOW:
+                        should_signal = self.__set_state(path, state)
+                elif self.__pending.get(path) == start_time:
+                    del self.__pending[path]
+                    should_signal = self.__set_state(path, state)
+            if should_signal and self.on_checked is not None:
+                self.on_checked()
+            # The worker which timed out was replaced.
+            if timed_out:
+                return
+
+    def __async_monitoring(self) -> None:
+        monitoring = True
+        while monitoring:
+            time.sleep(0.1)
+            should_signal = False
+            with self.__lock:
+                now = time.monotonic()
+                timed_out = [(path, start_time) for path, start_time in self.__pending.items() if start_time is not None and now - start_time > self.timeout_s]
+                for path, start_time in timed_out:
+                    # The stuck worker is not counted anymore, so another one takes its place.
+                    del self.__pending[path]
+                    self.__timed_out_checks.add((path, start_time))
+                    self.__workers_count -= 1
+                    should_signal = self.__set_state(path, self.STATE_SLOW) or should_signal
+                self.__start_workers()
+                if not self.__workers_count:
+                    monitoring = self.__monitoring = False
+            if should_signal and self.on_checked is not None:
+                self.on_checked()
+
+
+class GroupOpening:
+    """An opening of a group entries which is in progress, as started by `GroupOpener.open`. It can be cancelled."""
+
+    RESULT_LAUNCHED = 'launched'
+    RESULT_MISSING = 'missing'
+    RESULT_FAILED = 'failed'
+    RESULT_TIMED_OUT = 'timed_out'
+    RESULT_CANCELLED = 'cancelled'
+
+    def __init__(self, group_id, group_name, entries_count) -> None:
+        self.group_id = group_id
+        self.group_name = group_name
+        self.entries_count = entries_count
+        self.__results = dict()
+        # Key:entry_id, Value:the time when the entry opening started.
+        self.__started = dict()
+        self.__cancelled = threading.Event()
+        self.__finished = threading.Event()
+        self.__condition = threading.Condition()
+
+    def cancel(self) -> None:
+        self.__cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        return self.__cancelled.is_set()
+
+    def is_finished(self) -> bool:
+        return self.__finished.is_set()
+
+    def wait(self, timeout=None) -> bool:
+        return self.__finished.wait(timeout)
+
+    def get_progress(self) -> dict:
+        """Returns the number of entries for each result, and the total number of entries (with the 'total' key)."""
+
+        with self.__condition:
+            progress = {result: 0 for result in (self.RESULT_LAUNCHED, self.RESULT_MISSING, self.RESULT_FAILED, self.RESULT_TIMED_OUT, self.RESULT_CANCELLED)}
+            for result in self.__results.values():
+                progress[result] += 1
+            progress['total'] = self.entries_count
+            return progress
+
+    def get_progress_message(self) -> str:
+        progress = self.get_progress()
+        message = f"{progress[self.RESULT_LAUNCHED]} of {progress['total']} launched"
+        for result, description in ((self.RESULT_MISSING, 'missing'), (self.RESULT_FAILED, 'failed'), (self.RESULT_TIMED_OUT, 'timed out'), (self.RESULT_CANCELLED, 'cancelled')):
+            if progress[result]:
+                message += f', {progress[result]} {description}'
+        return message
+
+    def start_entry(self, entry_id) -> bool:
+        """Marks the entry as started. Returns False if the entry should not be opened anymore."""
+
+        with self.__condition:
+            if not self.can_launch(entry_id):
+                return False
+            self.__started[entry_id] = time.perf_counter()
+            return True
+
+    def can_launch(self, entry_id) -> bool:
+        with self.__condition:
+            return not self.is_cancelled() and entry_id not in self.__results
+
+    def set_result(self, entry_id, result) -> bool:
+        """Sets the result of an entry. Returns False if the entry already has a result (e.g. it timed out)."""
+
+        with self.__condition:
+            if entry_id in self.__results:
+                return False
+            self.__results[entry_id] = result
+            self.__started.pop(entry_id, None)
+            self.__condition.notify_all()
+            return True
+
+    def time_out_entries(self, timeout_s) -> int:
+        """Sets the timed out result for the entries started more than `timeout_s` seconds ago and returns their number."""
+
+        with self.__condition:
+            now = time.perf_counter()
+            timed_out = [entry_id for entry_id, start_time in self.__started.items() if now - start_time > timeout_s]
+            for entry_id in timed_out:
+                self.__results[entry_id] = self.RESULT_TIMED_OUT
+                self.__started.pop(entry_id)
+            return len(timed_out)
+
+    def wait_for_results(self, timeout) -> bool:
+        """Waits until all entries have a result or the timeout passes. Returns True if all entries have a result."""
+
+        with self.__condition:
+            return self.__condition.wait_for(lambda: len(self.__results) >= self.entries_count, timeout)
+
+    def set_finished(self) -> None:
+        self.__finished.set()
+
+
+class GroupOpener:
+    """
+    Opens the entries of a group in parallel on a bounded number of worker threads, so a slow entry delays only itself.
+    The progress is reported from a background thread through the `on_progress` and `on_finished` callables.
+    """
+
+    DEFAULT_MAX_WORKERS = 8
+    DEFAULT_ENTRY_TIMEOUT_S = 10
+    # How long the launched processes are waited for to show their first window, for the launch telemetry.
+    WINDOW_TIMEOUT_S = 60
+
+    def __init__(self, browser_launcher, launch_planner, max_workers=DEFAULT_MAX_WORKERS, entry_timeout_s=DEFAULT_ENTRY_TIMEOUT_S, 
+                 health_checker=None, launch_telemetry=None, slowest_first=False) -> None:
+        self.browser_launcher = browser_launcher
+        self.launch_planner = launch_planner
+        self.max_workers = max(1, max_workers)
+        self.entry_timeout_s = entry_timeout_s
+        self.health_checker = health_checker
+        self.launch_telemetry = launch_telemetry
+        self.slowest_first = slowest_first
+
+    def open(self, group_id, group_name, entries, on_progress=None, on_finished=None) -> GroupOpening:
+        opening = GroupOpening(group_id, group_name, len(entries))
+        threading.Thread(target=self.__async_opening, args=(opening, entries, on_progress, on_finished), daemon=True).start()
+        return opening
+
+    def __async_opening(self, opening, entries, on_progress, on_finished) -> None:
+        # Key:entry_id, Value:handler
+        handlers = {entry.id: handler for entry, handler in self.launch_planner.get_plan(opening.group_id, entries)}
+        tasks = queue.SimpleQueue()
+        web_entries = [entry for entry in entries if entry.type == AppData.ENTRY_WEB_PAGE]
+        if web_entries:
+            tasks.put(web_entries)
+        file_entries = [entry for entry in entries if entry.type != AppData.ENTRY_WEB_PAGE]
+        if self.slowest_first and self.launch_telemetry is not None:
+            # The sort is stable, so the entries which were not launched yet keep their order, after the others.
+            file_entries.sort(key=lambda entry: self.launch_telemetry.get_expected_ms(entry.path), reverse=True)
+        for entry in file_entries:
+            tasks.put([entry])
+        tasks_count = len(entries) - len(web_entries) + (1 if web_entries else 0)
+        for _ in range(min(self.max_workers, tasks_count)):
+            self.__start_worker(opening, tasks, handlers, on_progress)
+
+        while not opening.wait_for_results(0.1):
+            timed_out_count = opening.time_out_entries(self.entry_timeout_s)
+            # Each worker stuck on a timed out entry is replaced, so the number of working threads stays the same.
+            for _ in range(timed_out_count):
+                self.__start_worker(opening, tasks, handlers, on_progress)
+            if timed_out_count and on_progress is not None:
+                on_progress(opening)
+        # The history is written before the opening is finished, since the process may exit then (e.g. the "open" command).
+        if self.launch_telemetry is not None:
+            self.launch_telemetry.save()
+        opening.set_finished()
+        if on_finished is not None:
+            on_finished(opening)
+
+    def __start_worker(self, opening, tasks, handlers, on_progress) -> None:
+        # Daemon threads are used since a worker may be stuck on an entry and it must not keep the application running.
+        threading.Thread(target=self.__async_worker, args=(opening, tasks, handlers, on_progress), daemon=True).start()
+
+    def __async_worker(self, opening, tasks, handlers, on_progress) -> None:
+        while True:
+            try:
+                task_entries = tasks.get_nowait()
+            except queue.Empty:
+                return
+            if task_entries[0].type == AppData.ENTRY_WEB_PAGE:
+                self.__open_web_pages(opening, task_entries, on_progress)
+                continue
+            for entry in task_entries:
+                entry_id = entry.id
+                if not opening.start_entry(entry_id):
+                    result = GroupOpening.RESULT_CANCELLED
+                else:
+                    result = self.__open_file(opening, entry, handlers[entry_id])
+                if opening.set_result(entry_id, result) and on_progress is not None:
+                    on_progress(opening)
+
+    def __open_web_pages(self, opening, entries, on_progress) -> None:
+        # Several entries may have the same address, so each address keeps the list of its entries.
+        entries_by_url = dict()
+        for entry in entries:
+            if opening.start_entry(entry.id):
+                entries_by_url.setdefault(entry.path, []).append(entry)
+            elif opening.set_result(entry.id, GroupOpening.RESULT_CANCELLED) and on_progress is not None:
+                on_progress(opening)
+
+        def on_chunk_launched(urls, launched) -> None:
+            result = GroupOpening.RESULT_LAUNCHED if launched else GroupOpening.RESULT_FAILED
+            for url in urls:
+                for entry in entries_by_url[url]:
+                    opening.set_result(entry.id, result)
+            if on_progress is not None:
+                on_progress(opening)
+
+        # Using this approach because os.startfile(URL) will not work if the URL specified by user doesn't contain the protocol.
+        # Also, in this case, webbrowser.open(URL) will use Microsoft Edge regardless of the default browser.
+        if entries_by_url:
+            self.browser_launcher.open_pages(list(entries_by_url), on_chunk_launched)
+
+    def __open_file(self, opening, entry, handler) -> str:
+        state = None if self.health_checker is None else self.health_checker.get_state(entry.path)
+        # A missing file is checked again since it may have been restored, and the check is quick for it anyway.
+        if state is None or state == EntryHealthChecker.STATE_MISSING:
+            exists = os.path.isfile(entry.path)
+            if self.health_checker is not None:
+                self.health_checker.set_state(entry.path, exists)
+            if not exists:
+                return GroupOpening.RESULT_MISSING
+        # The existence check may have been slow enough for the entry to time out or for the opening to be cancelled.
+        if not opening.can_launch(entry.id):
+            return GroupOpening.RESULT_CANCELLED
+        start_time = time.perf_counter()
+        try:
+            process = self.launch_planner.backend.launch_file(entry.path, handler)
+        except OSError:
+            return GroupOpening.RESULT_FAILED
+        if self.launch_telemetry is not None:
+            self.launch_telemetry.record_spawn(entry.path, (time.perf_counter() - start_time) * 1000)
+            if process is not None:
+                threading.Thread(target=self.__async_waiting_for_window, args=(entry.path, process, start_time), daemon=True).start()
+        return GroupOpening.RESULT_LAUNCHED
+
+    def __async_waiting_for_window(self, entry_path, process, start_time) -> None:
+        if self.launch_planner.backend.wait_for_window(process, self.WINDOW_TIMEOUT_S):
+            self.launch_telemetry.record_window(entry_path, (time.perf_counter() - start_time) * 1000)
+            self.launch_telemetry.save()
+
+
+class FolderImport:
+    """An import of the files of a folder into a group which is in progress, as started by `FolderImporter.start`."""
+
+    def __init__(self, group_id, folder_path) -> None:
+        self.group_id = group_id
+        self.folder_path = folder_path
+        # The last operation which added files of the import, so the next batches are merged into it.
+        self.operation = None
+        self.__pending_files = deque()
+        self.__scanned_dirs_count = 0
+        self.__failed_dirs_count = 0
+        self.__found_files_count = 0
+        self.__added_files_count = 0
+        self.__skipped_files_count = 0
+        self.__lock = threading.Lock()
+        self.__cancelled = threading.Event()
+        self.__finished = threading.Event()
+
+    def cancel(self) -> None:
+        self.__cancelled.set()
+
+    def is_cancelled(self) -> bool:
+        return self.__cancelled.is_set()
+
+    def is_finished(self) -> bool:
+        return self.__finished.is_set()
+
+    def wait(self, timeout=None) -> bool:
+        return self.__finished.wait(timeout)
+
+    def push_files(self, new_files) -> bool:
+        """
+        Queues the (path, entry type) tuples of the files found in a scanned directory. Returns True if the queue was empty
+        before, i.e. the consumer should be signaled to take a batch.
+        """
+
+        with self.__lock:
+            was_empty = not self.__pending_files
+            self.__pending_files.extend(new_files)
+            self.__scanned_dirs_count += 1
+            self.__found_files_count += len(new_files)
+            return was_empty and bool(new_files)
+
+    def push_failed_dir(self) -> None:
+        with self.__lock:
+            self.__failed_dirs_count += 1
+
+    def take_batch(self, max_count) -> list:
+        """Takes at most `max_count` of the queued files, in the order they were found."""
+
+        with self.__lock:
+            pending_files = self.__pending_files
+            return [pending_files.popleft() for _ in range(min(max_count, len(pending_files)))]
+
+    def has_pending_files(self) -> bool:
+        with self.__lock:
+            return bool(self.__pending_files)
+
+    def record_added(self, taken_count, added_count) -> None:
+        """Records how many of the taken files were added, the others being already in the group."""
+
+        with self.__lock:
+            self.__added_files_count += added_count
+            self.__skipped_files_count += taken_count - added_count
+
+    def get_progress_message(self) -> str:
+        with self.__lock:
+            message = f'{self.__found_files_count} files found in {self.__scanned_dirs_count} folders, {self.__added_files_count} added'
+            if self.__skipped_files_count:
+                message += f', {self.__skipped_files_count} already in the group'
+            if self.__failed_dirs_count:
+                message += f', {self.__failed_dirs_count} folders not readable'
+            return message
+
+    def set_finished(self) -> None:
+        self.__finished.set()
+
+
+class FolderImporter:
+    """
+    Imports the files of a folder matched by a `ListeningFilter` into a group, scanning the directories in parallel on
+    a bounded number of worker threads. The found files are taken in batches from the returned `FolderImport`.
+    """
+
+    DEFAULT_MAX_WORKERS = 4
+    DEFAULT_BATCH_SIZE = 1000
+
+    def __init__(self, get_file_entry_type, max_workers=DEFAULT_MAX_WORKERS) -> None:
+        self.get_file_entry_type = get_file_entry_type
+        self.max_workers = max(1, max_workers)
+
+    def start(self, group_id, folder_path, files_filter, on_files_found=None, on_finished=None) -> FolderImport:
+        folder_import = FolderImport(group_id, folder_path)
+        threading.Thread(target=self.__async_importing, args=(folder_import, files_filter, on_files_found, on_finished), daemon=True).start()
+        return folder_import
+
+    def __async_importing(self, folder_import, files_filter, on_files_found, on_finished) -> None:
+        tasks = queue.Queue()
+        tasks.put(('', folder_import.folder_path))
+        workers = [threading.Thread(target=self.__async_worker, args=(folder_import, files_filter, tasks, on_files_found), daemon=True)
+                   for _ in range(self.max_workers)]
+        for worker in workers:
+            worker.start()
+        # The subdirectories are queued before their directory is done, so all of them are scanned once the queue is joined.
+        tasks.join()
+        for _ in workers:
+            tasks.put(None)
+        folder_import.set_finished()
+        if on_finished is not None:
+            on_finished(folder_import)
+
+    def __async_worker(self, folder_import, files_filter, tasks, on_files_found) -> None:
+        while True:
+            task = tasks.get()
+            if task is None:
+                return
+            try:
+                if not folder_import.is_cancelled():
+                    self.__scan_dir(folder_import, files_filter, tasks, on_files_found, *task)
+            finally:
+                tasks.task_done()
+
+    def __scan_dir(self, folder_import, files_filter, tasks, on_files_found, relative_dir_path, dir_path) -> None:
+        file_paths = []
+        try:
+            dir_entries = os.scandir(dir_path)
+        except OSError:
+            folder_import.push_failed_dir()
+            return
+        with dir_entries:
+            for dir_entry in dir_entries:
+                relative_path = relative_dir_path + dir_entry.name
+                try:
+                    if dir_entry.is_file():
+                        if files_filter.matches(relative_path):
+                            # The paths are formatted like the ones of the listening events, so the same file is not added twice.
+                            file_paths.append(os.path.join(folder_import.folder_path, relative_path).replace(os.sep, '/'))
+                    elif dir_entry.is_dir(follow_symlinks=False):
+                        if files_filter.matches_dir(relative_path):
+                            tasks.put((relative_path + '/', dir_entry.path))
+                except OSError:
+                    continue
+        file_paths.sort()
+        new_files = [(file_path, self.get_file_entry_type(file_path)) for file_path in file_paths]
+        if folder_import.push_files(new_files) and on_files_found is not None:
+            on_files_found(folder_import)
+
+
+class TreeRowsView:
+    """
+    Keeps the rows shown by a PySimpleGUI `Tree` element (used as a flat list) in sync with the application data,
+    updating only the rows which changed.
+    """
+
+    DEFAULT_REBUILD_RATIO = 0.5
+
+    def __init__(self, tree_element, rebuild_ratio=DEFAULT_REBUILD_RATIO) -> None:
+        self.tree_element = tree_element
+        self.rebuild_ratio = rebuild_ratio
+        # Key:row_key, Value:(text, values, icon). Ordered as shown.
+        self.__shown_rows = dict()
+
+    def update(self, rows) -> None:
+        new_rows = {key: (text, values, icon) for key, text, values, icon in rows}
+        shown_rows = self.__shown_rows
+        deleted_keys = [key for key in shown_rows if key not in new_rows]
+        changes_count = len(deleted_keys)
+        for key, row in new_rows.items():
+            if shown_rows.get(key) != row:
+                changes_count += 1
+        if changes_count == 0:
+            return
+        kept_keys_in_shown_order = [key for key in shown_rows if key in new_rows]
+        kept_keys_in_new_order = [key for key in new_rows if key in shown_rows]
+        if kept_keys_in_shown_order != kept_keys_in_new_order or changes_count > self.rebuild_ratio * len(new_rows):
+            self.__rebuild(new_rows)
+            return
+
+        element = self.tree_element
+        for key in deleted_keys:
+            self.__delete_row(key)
+        for index, (key, row) in enumerate(new_rows.items()):
+            if key not in shown_rows:
+                self.__insert_row(index, key, row)
+            elif shown_rows[key] != row:
+                self.__update_row(key, row)
+        self.__shown_rows = new_rows
+        element.SelectedRows = [key for key in element.SelectedRows if key in new_rows]
+
+    def get_shown_keys(self):
+        return self.__shown_rows.keys()
+
+    def remove_rows(self, keys) -> None:
+        """Removes the rows with the given keys, without comparing the other rows."""
+
+        element = self.tree_element
+        keys = set(keys)
+        for key in keys:
+            if key in self.__shown_rows:
+                self.__delete_row(key)
+                del self.__shown_rows[key]
+        element.SelectedRows = [key for key in element.SelectedRows if key not in keys]
+
+    def update_rows(self, rows) -> None:
+        """Updates only the given rows, which must already be shown."""
+
+        for key, text, values, icon in rows:
+            row = (text, values, icon)
+            if key in self.__shown_rows and self.__shown_rows[key] != row:
+                self.__update_row(key, row)
+                self.__shown_rows[key] = row
+
+    def __rebuild(self, new_rows) -> None:
+        element = self.tree_element
+        element.TKTreeview.delete(*element.TKTreeview.get_children())
+        element.IdToKey = {'': ''}
+        element.KeyToID = {'': ''}
+        for index, (key, row) in enumerate(new_rows.items()):
+            self.__insert_row(index, key, row)
+        self.__shown_rows = new_rows
+        element.SelectedRows = []
+
+    def __insert_row(self, index, key, row) -> None:
+        element = self.tree_element
+        text, values, icon = row
+        row_id = element.TKTreeview.insert('', index, text=text, values=values, image=self.__get_photo(icon))
+        element.IdToKey[row_id] = key
+        element.KeyToID[key] = row_id
+
+    def __delete_row(self, key) -> None:
+        element = self.tree_element
+        row_id = element.KeyToID.pop(key)
+        element.IdToKey.pop(row_id)
+        element.TKTreeview.delete(row_id)
+
+    def __update_row(self, key, row) -> None:
+        text, values, icon = row
+        self.tree_element.TKTreeview.item(self.tree_element.KeyToID[key], text=text, values=values, image=self.__get_photo(icon))
+
+    def __get_photo(self, icon):
+        # The images are shared by all rows with the same icon, using the element's cache.
+        if icon is None:
+            return ''
+        image_dict = self.tree_element.image_dict
+        if icon not in image_dict:
+            image_dict[icon] = sg.tk.PhotoImage(data=icon)
+        return image_dict[icon]
+
+
+class VirtualTreeRowsView(TreeRowsView):
+    """
+    A `TreeRowsView` which, for more rows than the threshold, inserts in the widget only the rows around the visible ones.
+    """
+
+    DEFAULT_THRESHOLD = 2000
+    # Tkinter event state flags for the Shift and Control keys (which extend the selection instead of replacing it).
+    EXTEND_SELECTION_STATE_MASK = 0x0001 | 0x0004
+
+    def __init__(self, tree_element, rebuild_ratio=TreeRowsView.DEFAULT_REBUILD_RATIO, threshold=DEFAULT_THRESHOLD) -> None:
+        super().__init__(tree_element, rebuild_ratio)
+        self.threshold = threshold
+        self.__rows = []
+        # Index of the first inserted row and of the top visible row, relative to all rows.
+        self.__first_index = 0
+        self.__top_index = 0
+        self.__visible_rows_count = tree_element.NumRows
+        self.__selected_keys = set()
+        self.__extend_selection = False
+        # The widget selection set when paging rows, which doesn't change the selected keys.
+        self.__paged_selection = None
+
+        widget = tree_element.TKTreeview
+        widget.configure(yscrollcommand=self.__on_widget_scrolled)
+        if tree_element.vsb is not None:
+            tree_element.vsb.configure(command=self.__on_scrollbar_used)
+        widget.bind('<<TreeviewSelect>>', self.__on_widget_selection)
+        widget.bind('<ButtonPress-1>', self.__on_selection_input, add='+')
+        widget.bind('<KeyPress>', self.__on_selection_input, add='+')
+
+    def is_virtual(self) -> bool:
+        return len(self.__rows) > self.threshold
+
+    def update(self, rows) -> None:
+        self.__rows = list(rows)
+        # The row keys are never reused for other rows, so the selected rows which are still shown stay selected.
+        if self.__selected_keys:
+            self.__selected_keys.intersection_update(row[0] for row in self.__rows)
+        self.__show_rows_from(self.__top_index)
+
+    def remove_rows(self, keys) -> None:
+        keys = set(keys)
+        self.__rows = [row for row in self.__rows if row[0] not in keys]
+        self.__selected_keys.difference_update(keys)
+        super().remove_rows(keys)
+        self.__show_rows_from(self.__top_index)
+
+    def update_rows(self, rows) -> None:
+        rows = list(rows)
+        positions = {row[0]: index for index, row in enumerate(self.__rows)} if len(rows) > 1 else None
+        for row in rows:
+            index = positions.get(row[0]) if positions is not None else next((index for index, shown_row in enumerate(self.__rows) if shown_row[0] == row[0]), None)
+            if index is not None:
+                self.__rows[index] = row
+        super().update_rows(rows)
+
+    def reset(self) -> None:
+        """Clears the selection and scrolls to the top, for when the rows are replaced by unrelated ones."""
+        self.__selected_keys = set()
+        self.__top_index = 0
+        self.tree_element.TKTreeview.yview_moveto(0)
+
+    def __get_window_size(self) -> int:
+        return self.__visible_rows_count * 3
+
+    def __show_rows_from(self, top_index) -> None:
+        widget = self.tree_element.TKTreeview
+        rows_count = len(self.__rows)
+        if not self.is_virtual():
+            self.__first_index = 0
+            self.__top_index = 0
+            super().update(self.__rows)
+        else:
+            window_size = self.__get_window_size()
+            self.__top_index = max(0, min(top_index, rows_count - self.__visible_rows_count))
+            self.__first_index = max(0, min(self.__top_index - self.__visible_rows_count, rows_count - window_size))
+            super().update(self.__rows[self.__first_index:self.__first_index + window_size])
+            shown_count = len(self.get_shown_keys())
+            if shown_count:
+                widget.yview_moveto((self.__top_index - self.__first_index) / shown_count)
+
+        element = self.tree_element
+        selected_ids = [element.KeyToID[key] for key in self.get_shown_keys() if key in self.__selected_keys]
+        if set(selected_ids) != set(widget.selection()):
+            widget.selection_set(selected_ids)
+        self.__paged_selection = frozenset(selected_ids)
+        element.SelectedRows = list(self.__selected_keys)
+
+    def __on_widget_scrolled(self, first_fraction, last_fraction) -> None:
+        first_fraction = float(first_fraction)
+        last_fraction = float(last_fraction)
+        scrollbar = self.tree_element.vsb
+        if not self.is_virtual():
+            if scrollbar is not None:
+                scrollbar.set(first_fraction, last_fraction)
+            return
+
+        shown_count = len(self.get_shown_keys())
+        rows_count = len(self.__rows)
+        self.__visible_rows_count = max(1, round((last_fraction - first_fraction) * shown_count))
+        self.__top_index = self.__first_index + round(first_fraction * shown_count)
+        if scrollbar is not None:
+            scrollbar.set(self.__top_index / rows_count, min(1.0, (self.__top_index + self.__visible_rows_count) / rows_count))
+        # The rows are paged once the visible ones get close to the edges of the inserted ones.
+        margin = self.__visible_rows_count // 2
+        near_start = self.__first_index > 0 and self.__top_index - self.__first_index < margin
+        near_end = self.__first_index + shown_count < rows_count and self.__first_index + shown_count - (self.__top_index + self.__visible_rows_count) < margin
+        if near_start or near_end:
+            self.tree_element.TKTreeview.after_idle(self.__show_rows_from, self.__top_index)
+
+    def __on_scrollbar_used(self, *args) -> None:
+        if not self.is_virtual():
+            self.tree_element.TKTreeview.yview(*args)
+            return
+        if args[0] == 'moveto':
+            top_index = int(float(args[1]) * len(self.__rows))
+        else:
+            step = self.__visible_rows_count if args[2] == 'pages' else 1
+            top_index = self.__top_index + int(args[1]) * step
+        self.__show_rows_from(top_index)
+
+    def __on_selection_input(self, event) -> None:
+        self.__extend_selection = bool(event.state & self.EXTEND_SELECTION_STATE_MASK)
+        self.__paged_selection = None
+
+    def __on_widget_selection(self, event) -> None:
+        element = self.tree_element
+        widget_selection = frozenset(element.TKTreeview.selection())
+        if widget_selection == self.__paged_selection:
+            return
+        selected_shown_keys = {element.IdToKey[row_id] for row_id in widget_selection}
+        if self.__extend_selection:
+            self.__selected_keys.difference_update(self.get_shown_keys())
+            self.__selected_keys.update(selected_shown_keys)
+        else:
+            self.__selected_keys = selected_shown_keys
+        element._treeview_selected(event)
+        element.SelectedRows = list(self.__selected_keys)
+
+
+class AutoSaver:
+    """
+    Saves the application data on a dedicated writer thread, once the changes stop for the debounce window (but no later
+    than the max latency). A failed save is retried after the debounce window.
+    """
+
+    DEFAULT_DEBOUNCE_S = 2
+    DEFAULT_MAX_LATENCY_S = 30
+
+    def __init__(self, save, on_saved=None, debounce_s=DEFAULT_DEBOUNCE_S, max_latency_s=DEFAULT_MAX_LATENCY_S) -> None:
+        self.save = save
+        self.on_saved = on_saved
+        self.debounce_s = debounce_s
+        self.max_latency_s = max_latency_s
+        self.__condition = threading.Condition()
+        self.__enabled = False
+        self.__stopped = False
+        self.__save_requested = False
+        # The monotonic times of the first and of the last change which are not being saved yet.
+        self.__first_change_time = None
+        self.__last_change_time = None
+        self.__saves_started = 0
+        self.__saves_finished = 0
+        self.__last_save_error = None
+        self.__thread = None
+
+    def set_enabled(self, enabled) -> None:
+        with self.__condition:
+            self.__enabled = enabled
+            self.__wake_writer()
+
+    def is_enabled(self) -> bool:
+        return self.__enabled
+
+    def notify_changed(self) -> None:
+        with self.__condition:
+            now = time.monotonic()
+            if self.__first_change_time is None:
+                self.__first_change_time = now
+            self.__last_change_time = now
+            self.__wake_writer()
+
+    def save_now(self) -> None:
+        with self.__condition:
+            self.__save_requested = True
+            self.__wake_writer()
+
+    def flush(self, timeout=None) -> bool:
+        """
+        Saves the changes made so far and waits for the save to finish. Returns False if the save failed, or if the timeout 
+        passed or the writer thread was stopped before it finished.
+        """
+
+        with self.__condition:
+            # A save which is already running may have missed the latest changes, so the next one is waited for.
+            saves_to_finish = self.__saves_started + 1
+            self.__save_requested = True
+            self.__wake_writer()
+            self.__condition.wait_for(lambda: self.__saves_finished >= saves_to_finish or self.__stopped, timeout)
+            return self.__saves_finished >= saves_to_finish and self.__last_save_error is None
+
+    def stop(self) -> None:
+        """Stops the writer thread, waiting for the running save to finish. The pending changes are not saved."""
+
+        with self.__condition:
+            self.__stopped = True
+            self.__condition.notify_all()
+            thread = self.__thread
+        if thread is not None:
+            thread.join()
+
+    def __wake_writer(self) -> None:
+        # The writer thread is started only when it's first needed.
+        if self.__thread is None and not self.__stopped:
+            self.__thread = threading.Thread(target=self.__async_writing, daemon=True)
+            self.__thread.start()
+        self.__condition.notify_all()
+
+    def __async_writing(self) -> None:
+        while True:
+            with self.__condition:
+                while not self.__save_requested:
+                    if self.__stopped:
+                        return
+                    if self.__enabled and self.__first_change_time is not None:
+                        deadline = min(self.__last_change_time + self.debounce_s, self.__first_change_time + self.max_latency_s)
+                        remaining_s = deadline - time.monotonic()
+                        if remaining_s <= 0:
+                            break
+                        self.__condition.wait(remaining_s)
+                    else:
+                        self.__condition.wait()
+                requested = self.__save_requested
+                self.__save_requested = False
+                self.__first_change_time = None
+                self.__last_change_time = None
+                self.__saves_started += 1
+
+            error = None
+            try:
+                self.save()
+            except Exception as save_error:
+                error = save_error
+            with self.__condition:
+                self.__saves_finished += 1
+                self.__last_save_error = error
+                if error is not None and self.__first_change_time is None:
+                    self.__first_change_time = self.__last_change_time = time.monotonic()
+                self.__condition.notify_all()
+            if self.on_saved is not None:
+                self.on_saved(requested, error)
+
+
+class InstanceServer:
+    """
+    Makes the running application reachable by other processes through a local socket, so that only one instance owns
+    the data files. Each connection carries one request and one response, each a JSON object on a single line:
+    ```
+    {"token": <type_str>, "command": <type_str>, ...command arguments}
+    {"ok": <type_bool>, "message": <type_str>} or {"ok": false, "error": <type_str>}
+    ```
+    """
+
+    COMMAND_PING = 'ping'
+    COMMAND_SHOW_WINDOW = 'show_window'
+    COMMAND_OPEN_GROUP = 'open_group'
+    COMMAND_RELOAD = 'reload'
+
+    MAX_REQUEST_SIZE = 64 * 1024
+
+    def __init__(self, instance_path, on_request) -> None:
+        self.instance_path = instance_path
+        self.on_request = on_request
+        import secrets
+        self.__token = secrets.token_hex(16)
+        self.__socket = None
+        self.__socket_path = None
+
+    def start(self) -> bool:
+        """Starts listening for requests. Returns False if another instance is already running."""
+
+        if InstanceClient(self.instance_path).is_instance_running():
+            return False
+        os.makedirs(os.path.split(self.instance_path)[0], exist_ok=True)
+        if hasattr(socket, 'AF_UNIX'):
+            self.__socket_path = os.path.splitext(self.instance_path)[0] + '.sock'
+            # A socket file left by an instance which didn't stop properly would make the bind fail.
+            if os.path.exists(self.__socket_path):
+                os.remove(self.__socket_path)
+            self.__socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self.__socket.bind(self.__socket_path)
+            os.chmod(self.__socket_path, 0o600)
+            address = self.__socket_path
+        else:
+            self.__socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self.__socket.bind(('127.0.0.1', 0))
+            address = list(self.__socket.getsockname())
+        self.__socket.listen()
+
+        # The instance file is replaced at once, so a client never reads it half written.
+        tmp_path = self.instance_path + '.tmp'
+        with open(os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), 'w') as f:
+            json.dump({'address': address, 'token': self.__token}, f)
+        os.replace(tmp_path, self.instance_path)
+        threading.Thread(target=self.__async_accepting, args=(self.__socket,), daemon=True).start()
+        return True
 
-    ENTRY_EXE_FILE = 'executable'
-    ENTRY_OTHER_FILE = 'other'
-    ENTRY_WEB_PAGE = 'web_page'
+    def stop(self) -> None:
+        if self.__socket is None:
+            return
+        self.__socket.close()
+        self.__socket = None
+        # Another instance may have started meanwhile, so the instance file is removed only if it's still this one's.
+        try:
+            with open(self.instance_path, 'r') as f:
+                is_own_instance_file = json.load(f).get('token') == self.__token
+        except (OSError, ValueError):
+            is_own_instance_file = False
+        if is_own_instance_file:
+            os.remove(self.instance_path)
+            if self.__socket_path is not None and os.path.exists(self.__socket_path):
+                os.remove(self.__socket_path)
 
-    KEY_GROUP_ID = 'group_id'
-    KEY_GROUP_NAME = 'group_name'
-    KEY_GROUP_LISTENING_DIR = 'group_listening_dir'
-    KEY_GROUP_ENTRIES = 'group_entries'
-    KEY_ENTRY_ID = 'entry_id'
-    KEY_ENTRY_PATH = 'entry_path'
-    KEY_ENTRY_TYPE = 'entry_type'
-    KEY_ENTRY_DETAILS = 'entry_details'
-    KEY_SETTING_START_WITH_WINDOWS = 'start_with_windows'
-    KEY_SETTING_AUTO_SAVE = 'auto_save'
+    def __async_accepting(self, server_socket) -> None:
+        while True:
+            try:
+                connection, _ = server_socket.accept()
+            except OSError:
+                # The socket was closed by `stop`.
+                return
+            threading.Thread(target=self.__async_handling, args=(connection,), daemon=True).start()
 
-    def __init__(self, groups_path, settings_path) -> None:
-        self.groups_path = groups_path
-        self.__saved_groups_data = []
-        self.groups_data = []
-        self.settings_path = settings_path
-        self.__saved_settings = dict()
-        self.settings = dict()
+    def __async_handling(self, connection) -> None:
+        import hmac
+        with connection:
+            connection.settimeout(InstanceClient.DEFAULT_TIMEOUT_S)
+            try:
+                with connection.makefile('rb') as f:
+                    line = f.readline(self.MAX_REQUEST_SIZE)
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError('The request is not a JSON object')
+            except (OSError, ValueError):
+                return
+            if not hmac.compare_digest(str(request.get('token', '')), self.__token):
+                response = {'ok': False, 'error': 'Invalid token.'}
+            elif request.get('command') == self.COMMAND_PING:
+                response = {'ok': True, 'message': 'pong'}
+            else:
+                response = self.on_request(request)
+            try:
+                connection.sendall(json.dumps(response).encode('utf-8') + b'\n')
+            except OSError:
+                pass
 
-    def load_groups_data(self):
-        if os.path.isfile(self.groups_path):
-            with open(self.groups_path, 'r') as f:
-                self.__saved_groups_data = json.load(f)
-                self.groups_data = deepcopy(self.__saved_groups_data)
 
-    def load_settings(self):
-        if os.path.isfile(self.settings_path):
-            with open(self.settings_path, 'r') as f:
-                self.__saved_settings = json.load(f)
-                self.settings = deepcopy(self.__saved_settings)
+class InstanceClient:
+    """Sends requests to the running instance of the application (see `InstanceServer`)."""
 
-    def save_group_data(self):
-        self.__saved_groups_data = deepcopy(self.groups_data)
-        os.makedirs(os.path.split(self.groups_path)[0], exist_ok=True)
-        with open(self.groups_path, 'w') as f:
-            json.dump(self.__saved_groups_data, f, indent='\t')
-    
-    def save_settings(self):
-        self.__saved_settings = deepcopy(self.settings)
-        os.makedirs(os.path.split(self.settings_path)[0], exist_ok=True)
-        with open(self.settings_path, 'w') as f:
-            json.dump(self.__saved_settings, f, indent='\t')
+    DEFAULT_TIMEOUT_S = 5
 
-    def revert_changes(self):
-        self.groups_data = deepcopy(self.__saved_groups_data)
-        self.settings = deepcopy(self.__saved_settings)
-    
-    def refresh_ids(self, for_groups=False, for_group_with_id=None):
-        if for_groups:
-            for index, group in enumerate(self.groups_data):
-                group[AppData.KEY_GROUP_ID] = index
-        if for_group_with_id is not None:
-            for index, entry in enumerate(self.groups_data[for_group_with_id][AppData.KEY_GROUP_ENTRIES]):
-                entry[AppData.KEY_ENTRY_ID] = index
+    def __init__(self, instance_path, timeout_s=DEFAULT_TIMEOUT_S) -> None:
+        self.instance_path = instance_path
+        self.timeout_s = timeout_s
+
+    def send(self, command, **arguments) -> dict:
+        """Sends a command and returns the response. Raises `ConnectionError` if there is no running instance to respond."""
+
+        try:
+            with open(self.instance_path, 'r') as f:
+                instance = json.load(f)
+            address = instance['address']
+            request = {**arguments, 'token': instance['token'], 'command': command}
+            family = socket.AF_UNIX if isinstance(address, str) else socket.AF_INET
+            with socket.socket(family, socket.SOCK_STREAM) as connection:
+                connection.settimeout(self.timeout_s)
+                connection.connect(address if isinstance(address, str) else tuple(address))
+                connection.sendall(json.dumps(request).encode('utf-8') + b'\n')
+                with connection.makefile('rb') as f:
+                    response = json.loads(f.readline())
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            raise ConnectionError(f'No running instance responded: {error}') from error
+        return response
+
+    def is_instance_running(self) -> bool:
+        try:
+            return self.send(InstanceServer.COMMAND_PING).get('ok', False)
+        except ConnectionError:
+            return False
 
 
 class AppInterface:
@@ -133,9 +3903,9 @@ class AppInterface:
 
     After the `App` class instance completes its initialization (which involves instantiating the interfaces), 
     it gives a reference to itself (`self.app` property) to each registered interface in the class and calls their 
-    `start` method. Therefore, an interface should do its basic initialization in the constructor, and do in the 
-    `start` method the initialization which involves other systems/interfaces in the application (accessed via the 
-    `self.app` property).
+    `start` method (the first interface is started before the window is first painted, the others right after it). 
+    Therefore, an interface should do its basic initialization in the constructor, and do in the `start` method the 
+    initialization which involves other systems/interfaces in the application (accessed via the `self.app` property).
 
     The `on_show` method is called each time the interface becomes visible on the screen.
     """
@@ -158,21 +3928,32 @@ class MainInterface(AppInterface):
     """
 
     KEY_TREE_MAIN = '-MAIN_TREE-'
+    KEY_INPUT_SEARCH_GROUPS = '-SEARCH_GROUPS_INPUT-'
     KEY_BUTTON_OPEN_GROUP = '-OPEN_GROUP_BUTTON-'
+    KEY_BUTTON_CANCEL_OPENING = '-CANCEL_OPENING_BUTTON-'
     KEY_BUTTON_NEW_GROUP = '-NEW_GROUP_BUTTON-'
     KEY_BUTTON_EDIT_GROUP = '-EDIT_GROUP_BUTTON-'
+    KEY_BUTTON_RENAME_GROUP = '-RENAME_GROUP_BUTTON-'
     KEY_BUTTON_DELETE_GROUP = '-DELETE_GROUP_BUTTON-'
     KEY_BUTTON_SAVE_CHANGES = '-SAVE_CHANGES_BUTTON-'
     KEY_BUTTON_REVERT_CHANGES = '-REVERT_CHANGES_BUTTON-'
+    KEY_BUTTON_UNDO = '-UNDO_BUTTON-'
+    KEY_BUTTON_REDO = '-REDO_BUTTON-'
     KEY_BUTTON_HELP = '-HELP_BUTTON-'
     KEY_BUTTON_EXIT = '-EXIT_BUTTON-'
     KEY_STATUS_BAR_GROUPS = '-GROUPS_STATUS_BAR-'
     KEY_CHECKBOX_START_WITH_WINDOWS = '-START_WITH_WINDOWS-'
     KEY_CHECKBOX_AUTO_SAVE = '-AUTO_SAVE-'
+    KEY_EVENT_OPENING_PROGRESS = '-OPENING_PROGRESS_EVENT-'
+    KEY_EVENT_OPENING_FINISHED = '-OPENING_FINISHED_EVENT-'
+    KEY_EVENT_SAVE_FINISHED = '-SAVE_FINISHED_EVENT-'
 
     def __init__(self) -> None:
         super().__init__()
         self.win_layout = [[
+                sg.Text('Search:', pad=((15, 5), (15, 0))),
+                sg.Input(key=self.KEY_INPUT_SEARCH_GROUPS, enable_events=True, expand_x=True, pad=((0, 15), (15, 0)))
+            ],[
                 sg.Tree(data=sg.TreeData(), 
                         key=self.KEY_TREE_MAIN, 
                         headings=['Entries'],
@@ -191,11 +3972,15 @@ class MainInterface(AppInterface):
                         enable_events=True),
                 sg.Column([
                         [sg.Button('Open Group', key=self.KEY_BUTTON_OPEN_GROUP, expand_x=True, pad=((0, 0), (7, 0)), disabled=True)],
+                        [sg.Button('Cancel Opening', key=self.KEY_BUTTON_CANCEL_OPENING, expand_x=True, pad=((0, 0), (7, 0)), disabled=True)],
                         [sg.Button('New Group', key=self.KEY_BUTTON_NEW_GROUP, expand_x=True, pad=((0, 0), (7, 0)))],
                         [sg.Button('Edit Group', key=self.KEY_BUTTON_EDIT_GROUP, expand_x=True, pad=((0, 0), (7, 0)), disabled=True)],
+                        [sg.Button('Rename Group', key=self.KEY_BUTTON_RENAME_GROUP, expand_x=True, pad=((0, 0), (7, 0)), disabled=True)],
                         [sg.Button('Delete Group', key=self.KEY_BUTTON_DELETE_GROUP, expand_x=True, pad=((0, 0), (7, 0)), disabled=True)],
                         [sg.Button('Save Changes', key=self.KEY_BUTTON_SAVE_CHANGES, expand_x=True, pad=((0, 0), (35, 0)), disabled=True)],
                         [sg.Button('Revert Changes', key=self.KEY_BUTTON_REVERT_CHANGES, expand_x=True, pad=((0, 0), (7, 0)), disabled=True)],
+                        [sg.Button('Undo', key=self.KEY_BUTTON_UNDO, expand_x=True, pad=((0, 3), (7, 0)), disabled=True),
+                         sg.Button('Redo', key=self.KEY_BUTTON_REDO, expand_x=True, pad=((3, 0), (7, 0)), disabled=True)],
                         [sg.Button('Help', key=self.KEY_BUTTON_HELP, expand_x=True, pad=((0, 0), (35, 0)))],
                         [sg.Button('Exit', key=self.KEY_BUTTON_EXIT, expand_x=True, pad=((0, 0), (7, 7)))],
                         ],
@@ -209,61 +3994,117 @@ class MainInterface(AppInterface):
                         auto_size_text=True,
                         font=('Verdana', 10, 'normal'))
             ],[
-                sg.Checkbox('Launch the application when Windows starts', key=self.KEY_CHECKBOX_START_WITH_WINDOWS, enable_events=True),
-                sg.Checkbox('Auto save changes (once per minute)', key=self.KEY_CHECKBOX_AUTO_SAVE, enable_events=True)
+                sg.Checkbox('Launch the application at login', key=self.KEY_CHECKBOX_START_WITH_WINDOWS, enable_events=True),
+                sg.Checkbox('Auto save changes', key=self.KEY_CHECKBOX_AUTO_SAVE, enable_events=True)
             ]
         ]
         self.win_events = {
             self.KEY_TREE_MAIN: [self.on_tree_event],
+            self.KEY_INPUT_SEARCH_GROUPS: [self.on_input_search],
             self.KEY_BUTTON_OPEN_GROUP: [self.on_button_open_group],
+            self.KEY_BUTTON_CANCEL_OPENING: [self.on_button_cancel_opening],
             self.KEY_BUTTON_NEW_GROUP: [self.on_button_new_group],
             self.KEY_BUTTON_EDIT_GROUP: [self.on_button_edit_group],
+            self.KEY_BUTTON_RENAME_GROUP: [self.on_button_rename_group],
             self.KEY_BUTTON_DELETE_GROUP: [self.on_button_delete_group],
             self.KEY_BUTTON_SAVE_CHANGES: [self.on_button_save_changes],
             self.KEY_BUTTON_REVERT_CHANGES: [self.on_button_revert_changes],
+            self.KEY_BUTTON_UNDO: [self.on_button_undo],
+            self.KEY_BUTTON_REDO: [self.on_button_redo],
             self.KEY_BUTTON_HELP: [self.on_button_help],
             self.KEY_BUTTON_EXIT: [self.on_button_exit],
             self.KEY_CHECKBOX_START_WITH_WINDOWS: [self.on_checkbox_start_with_windows],
             self.KEY_CHECKBOX_AUTO_SAVE: [self.on_checkbox_auto_save]
         }
         self.groups_status_bar_lock = threading.Lock()
-        self.check_if_saving_lock = threading.Lock()
-        self.is_saving = threading.Event()
+        self.search_query = ''
         self.made_changes = False
         self.tree_dirty = False
+        self.group_openings = set()
     
     def start(self) -> None:
         super().start()
         settings = self.app.app_data.settings
         window = self.app.window
 
-        window[self.KEY_TREE_MAIN].update(self.__create_groups_tree_data())
+        self.groups_tree = TreeRowsView(window[self.KEY_TREE_MAIN], settings.get(AppData.KEY_SETTING_TREE_REBUILD_RATIO, TreeRowsView.DEFAULT_REBUILD_RATIO))
+        self.update_groups_tree()
+        window.bind('<Control-z>', self.KEY_BUTTON_UNDO)
+        window.bind('<Control-y>', self.KEY_BUTTON_REDO)
         if AppData.KEY_SETTING_START_WITH_WINDOWS in settings and settings[AppData.KEY_SETTING_START_WITH_WINDOWS]:
             window[self.KEY_CHECKBOX_START_WITH_WINDOWS].update(value=True)
         if AppData.KEY_SETTING_AUTO_SAVE in settings and settings[AppData.KEY_SETTING_AUTO_SAVE]:
             window[self.KEY_CHECKBOX_AUTO_SAVE].update(value=True)
 
-        if sg.WIN_CLOSE_ATTEMPTED_EVENT in self.app.win_global_events:
-            self.app.win_global_events[sg.WIN_CLOSE_ATTEMPTED_EVENT].append(self.__on_exit)
-        else:
-            self.app.win_global_events[sg.WIN_CLOSE_ATTEMPTED_EVENT] = [self.__on_exit]
+        for event_key, action in ((sg.WIN_CLOSE_ATTEMPTED_EVENT, self.__on_exit), 
+                                  (self.KEY_EVENT_OPENING_PROGRESS, self.__on_opening_progress), 
+                                  (self.KEY_EVENT_OPENING_FINISHED, self.__on_opening_finished),
+                                  (self.KEY_EVENT_SAVE_FINISHED, self.__on_save_finished),
+                                  (App.KEY_EVENT_SEARCH_INDEX_READY, self.__on_search_index_ready)):
+            if event_key in self.app.win_global_events:
+                self.app.win_global_events[event_key].append(action)
+            else:
+                self.app.win_global_events[event_key] = [action]
 
-        self.auto_save_enabled = threading.Event()
-        if AppData.KEY_SETTING_AUTO_SAVE in settings and settings[AppData.KEY_SETTING_AUTO_SAVE]:
-            self.auto_save_enabled.set()
-        threading.Thread(target=self.__async_auto_saving, daemon=True).start()
+        self.group_opener = GroupOpener(
+            self.app.browser_launcher,
+            self.app.launch_planner,
+            settings.get(AppData.KEY_SETTING_OPENING_MAX_WORKERS, GroupOpener.DEFAULT_MAX_WORKERS),
+            settings.get(AppData.KEY_SETTING_OPENING_ENTRY_TIMEOUT_S, GroupOpener.DEFAULT_ENTRY_TIMEOUT_S),
+            self.app.health_checker,
+            self.app.launch_telemetry,
+            settings.get(AppData.KEY_SETTING_LAUNCH_ORDER, AppData.LAUNCH_ORDER_STORED) == AppData.LAUNCH_ORDER_SLOWEST_FIRST)
+        self.app.instance_commands[InstanceServer.COMMAND_OPEN_GROUP] = self.__on_open_group_request
+        self.app.instance_commands[InstanceServer.COMMAND_RELOAD] = self.__on_reload_request
+
+        self.auto_saver = AutoSaver(
+            self.__save_data,
+            lambda requested, error: window.write_event_value(self.KEY_EVENT_SAVE_FINISHED, (requested, error)),
+            settings.get(AppData.KEY_SETTING_AUTO_SAVE_DEBOUNCE_S, AutoSaver.DEFAULT_DEBOUNCE_S),
+            settings.get(AppData.KEY_SETTING_AUTO_SAVE_MAX_LATENCY_S, AutoSaver.DEFAULT_MAX_LATENCY_S))
+        self.auto_saver.set_enabled(settings.get(AppData.KEY_SETTING_AUTO_SAVE, False))
+        self.app.app_data.on_change_actions.append(self.auto_saver.notify_changed)
+        self.app.on_shutdown_actions.append(self.auto_saver.stop)
 
     def on_show(self) -> None:
         super().on_show()
-        window = self.app.window
         if self.tree_dirty:
-            window[self.KEY_TREE_MAIN].update(self.__create_groups_tree_data())
+            self.update_groups_tree()
             self.tree_dirty = False
         if self.made_changes:
-            window[self.KEY_BUTTON_SAVE_CHANGES].update(disabled=False)
-            window[self.KEY_BUTTON_REVERT_CHANGES].update(disabled=False)
+            self.update_change_buttons()
             self.made_changes = False
 
+    def update_groups_tree(self) -> None:
+        app_data = self.app.app_data
+        groups = app_data.groups_data.values()
+        # Only the groups matching the search are shown.
+        if self.search_query:
+            found_group_ids = app_data.search_groups(self.search_query)
+            # The groups are all shown until they can be searched, and then the search is done again.
+            if found_group_ids is not None:
+                groups = (group for group in groups if group.id in found_group_ids)
+        self.groups_tree.update(self.__create_group_tree_row(group) for group in groups)
+
+    def update_groups_tree_rows(self, group_ids) -> None:
+        # The changed groups may start or stop matching the search.
+        if self.search_query:
+            self.update_groups_tree()
+            return
+        groups_data = self.app.app_data.groups_data
+        self.groups_tree.update_rows(self.__create_group_tree_row(groups_data[group_id]) for group_id in group_ids)
+
+    def update_change_buttons(self) -> None:
+        """Enables the buttons for saving, reverting, undoing and redoing the changes only if there is something to do."""
+
+        app_data = self.app.app_data
+        window = self.app.window
+        has_unsaved_changes = app_data.has_unsaved_changes()
+        window[self.KEY_BUTTON_SAVE_CHANGES].update(disabled=not has_unsaved_changes)
+        window[self.KEY_BUTTON_REVERT_CHANGES].update(disabled=not has_unsaved_changes)
+        window[self.KEY_BUTTON_UNDO].update(disabled=not app_data.operation_log.can_undo())
+        window[self.KEY_BUTTON_REDO].update(disabled=not app_data.operation_log.can_redo())
+
     def update_groups_status_bar(self, message) -> None:
         with self.groups_status_bar_lock:
             self.app.window[self.KEY_STATUS_BAR_GROUPS].update(value=message)
@@ -273,63 +4114,102 @@ class MainInterface(AppInterface):
         should_disable = False if values[self.KEY_TREE_MAIN] else True
         window[self.KEY_BUTTON_OPEN_GROUP].update(disabled=should_disable)
         window[self.KEY_BUTTON_EDIT_GROUP].update(disabled=should_disable)
+        window[self.KEY_BUTTON_RENAME_GROUP].update(disabled=should_disable)
         window[self.KEY_BUTTON_DELETE_GROUP].update(disabled=should_disable)
+        if values[self.KEY_TREE_MAIN]:
+            # The files of the selected group are checked before it's opened, so the opening doesn't wait for them. The groups
+            # whose entries are not loaded are left as they are, since selecting them must not load them.
+            group = self.app.app_data.groups_data.get(values[self.KEY_TREE_MAIN][0])
+            if group is not None and group.is_loaded():
+                self.app.health_checker.check(entry.path for entry in group.entries if entry.type != AppData.ENTRY_WEB_PAGE)
     
+    def on_input_search(self, values) -> None:
+        self.search_query = values[self.KEY_INPUT_SEARCH_GROUPS].strip()
+        self.update_groups_tree()
+        shown_keys = self.groups_tree.get_shown_keys()
+        self.on_tree_event({self.KEY_TREE_MAIN: [key for key in values[self.KEY_TREE_MAIN] if key in shown_keys]})
+
     def on_button_open_group(self, values) -> None:
+        self.open_group(values[self.KEY_TREE_MAIN][0])
+
+    def open_group(self, group_id) -> None:
         app_data = self.app.app_data
-        selected_group_id = values[self.KEY_TREE_MAIN][0]
-        group_name = app_data.groups_data[selected_group_id][AppData.KEY_GROUP_NAME]
-        entries_to_open = deepcopy(app_data.groups_data[selected_group_id][AppData.KEY_GROUP_ENTRIES])
-        threading.Thread(target=self.__async_group_opening, args=(group_name, entries_to_open)).start()
+        group_name = app_data.groups_data[group_id].name
+        # The entries are never modified in place, so copying the list is enough to keep them from changing while opening.
+        entries_to_open = list(app_data.groups_data[group_id].entries)
+        window = self.app.window
+        self.update_groups_status_bar(f"({time.strftime('%H:%M:%S', time.localtime())}) Opening \"{group_name}\" group...")
+        opening = self.group_opener.open(
+            group_id,
+            group_name, 
+            entries_to_open,
+            lambda opening: window.write_event_value(self.KEY_EVENT_OPENING_PROGRESS, opening),
+            lambda opening: window.write_event_value(self.KEY_EVENT_OPENING_FINISHED, opening))
+        self.group_openings.add(opening)
+        window[self.KEY_BUTTON_CANCEL_OPENING].update(disabled=False)
+
+    def on_button_cancel_opening(self, _) -> None:
+        for opening in self.group_openings:
+            opening.cancel()
     
     def on_button_new_group(self, _) -> None:
-        window = self.app.window
         group_name = sg.popup_get_text('How should the group be named?', 'Input a name for the new group')
         if group_name is not None and group_name != '':
-            self.app.app_data.groups_data.append({
-                AppData.KEY_GROUP_ID: len(self.app.app_data.groups_data),
-                AppData.KEY_GROUP_NAME: group_name, 
-                AppData.KEY_GROUP_ENTRIES: []
-            })
-            window[self.KEY_TREE_MAIN].update(self.__create_groups_tree_data())
-            window[self.KEY_BUTTON_SAVE_CHANGES].update(disabled=False)
-            window[self.KEY_BUTTON_REVERT_CHANGES].update(disabled=False)
+            self.app.app_data.add_group(group_name)
+            self.update_groups_tree()
+            self.update_change_buttons()
     
     def on_button_edit_group(self, values) -> None:
         selected_group_id = values[self.KEY_TREE_MAIN][0]
-        group_to_edit = self.app.app_data.groups_data[selected_group_id]
-        self.app.get_interface(App.KEY_INTERFACE_GROUP_EDIT).group = group_to_edit
+        self.app.get_interface(App.KEY_INTERFACE_GROUP_EDIT).group_id = selected_group_id
         self.app.change_shown_interface(App.KEY_INTERFACE_GROUP_EDIT)
 
+    def on_button_rename_group(self, values) -> None:
+        app_data = self.app.app_data
+        group_id = values[self.KEY_TREE_MAIN][0]
+        group_name = sg.popup_get_text('How should the group be named?', 'Input a new name for the group', app_data.groups_data[group_id].name)
+        if group_name is not None and group_name != '':
+            app_data.rename_group(group_id, group_name)
+            self.update_groups_tree_rows([group_id])
+            self.update_change_buttons()
+
     def on_button_delete_group(self, values) -> None:
         app_data = self.app.app_data
-        window = self.app.window
-        tmp = []
-        for group in app_data.groups_data:
-            if group[AppData.KEY_GROUP_ID] not in values[self.KEY_TREE_MAIN]:
-                tmp.append(group)
-            elif AppData.KEY_GROUP_LISTENING_DIR in group:
+        for group_id in values[self.KEY_TREE_MAIN]:
+            group = app_data.groups_data[group_id]
+            if group.listening_dir is not None:
                 self.app.get_interface(App.KEY_INTERFACE_GROUP_EDIT).remove_listener(group)
-        app_data.groups_data = tmp
-        app_data.refresh_ids(for_groups=True)
-        window[self.KEY_TREE_MAIN].update(self.__create_groups_tree_data())
-        window[self.KEY_BUTTON_SAVE_CHANGES].update(disabled=False)
-        window[self.KEY_BUTTON_REVERT_CHANGES].update(disabled=False)
+        app_data.delete_groups(values[self.KEY_TREE_MAIN])
+        self.app.launch_planner.keep_plans(app_data.groups_data)
+        self.groups_tree.remove_rows(values[self.KEY_TREE_MAIN])
+        self.update_change_buttons()
 
     def on_button_save_changes(self, _) -> None:
-        self.__save_changes()
+        window = self.app.window
+        self.update_groups_status_bar(f"({time.strftime('%H:%M:%S', time.localtime())}) Saving changes...")
+        window[self.KEY_BUTTON_SAVE_CHANGES].update(disabled=True)
+        window[self.KEY_BUTTON_REVERT_CHANGES].update(disabled=True)
+        self.auto_saver.save_now()
 
     def on_button_revert_changes(self, _)-> None:
         app_data = self.app.app_data
         window = self.app.window
         app_data.revert_changes()
+        self.app.launch_planner.keep_plans(app_data.groups_data)
+        # The reverted groups may listen to other directories.
+        self.app.get_interface(App.KEY_INTERFACE_GROUP_EDIT).restart_listeners()
         window[self.KEY_CHECKBOX_START_WITH_WINDOWS].update(app_data.settings.get(AppData.KEY_SETTING_START_WITH_WINDOWS, False))
         window[self.KEY_CHECKBOX_AUTO_SAVE].update(app_data.settings.get(AppData.KEY_SETTING_AUTO_SAVE, False))
-        window[self.KEY_TREE_MAIN].update(self.__create_groups_tree_data())
-        window[self.KEY_BUTTON_SAVE_CHANGES].update(disabled=True)
-        window[self.KEY_BUTTON_REVERT_CHANGES].update(disabled=True)
+        self.update_groups_tree()
+        self.update_change_buttons()
         self.update_groups_status_bar(f"({time.strftime('%H:%M:%S', time.localtime())}) Changes have been reverted!")
 
+    def on_button_undo(self, _) -> None:
+        self.__change_history(self.app.app_data.undo, 'undone')
+
+    def on_button_redo(self, _) -> None:
+        self.__change_history(self.app.app_data.redo, 'redone')
+
     def on_button_help(self, _) -> None:
         self.app.change_shown_interface(App.KEY_INTERFACE_HELP)
     
@@ -337,133 +4217,173 @@ class MainInterface(AppInterface):
         self.__on_exit(None)
 
     def on_checkbox_start_with_windows(self, values) -> None:
-        self.app.app_data.settings[AppData.KEY_SETTING_START_WITH_WINDOWS] = values[self.KEY_CHECKBOX_START_WITH_WINDOWS]
-        self.app.window[self.KEY_BUTTON_SAVE_CHANGES].update(disabled=False)
-        self.app.window[self.KEY_BUTTON_REVERT_CHANGES].update(disabled=False)
+        self.app.app_data.change_setting(AppData.KEY_SETTING_START_WITH_WINDOWS, values[self.KEY_CHECKBOX_START_WITH_WINDOWS])
+        self.update_change_buttons()
 
     def on_checkbox_auto_save(self, values) -> None:
         checked = values[self.KEY_CHECKBOX_AUTO_SAVE]
-        if checked:
-            self.auto_save_enabled.set()
-        else:
-            self.auto_save_enabled.clear()
-        self.app.app_data.settings[AppData.KEY_SETTING_AUTO_SAVE] = checked
-        self.app.window[self.KEY_BUTTON_SAVE_CHANGES].update(disabled=False)
-        self.app.window[self.KEY_BUTTON_REVERT_CHANGES].update(disabled=False)
+        self.auto_saver.set_enabled(checked)
+        self.app.app_data.change_setting(AppData.KEY_SETTING_AUTO_SAVE, checked)
+        self.update_change_buttons()
 
-    def __async_group_opening(self, group_name, entries_to_open) -> None:
-        self.update_groups_status_bar(f"({time.strftime('%H:%M:%S', time.localtime())}) Opening \"{group_name}\" group...")
-        tabs_opened = 0
-        for entry in entries_to_open:
-            if entry[AppData.KEY_ENTRY_TYPE] == AppData.ENTRY_WEB_PAGE:
-                # For some browsers (e.g. Firefox), if they are closed when group opening starts, it may be required to wait a bit for 
-                # them to initialize on opening the first tab before opening others.
-                if tabs_opened == 1:
-                    time.sleep(1.5)
-                # Using this approach because os.startfile(URL) will not work if the URL specified by user doesn't contain the protocol.
-                # Also, in this case, webbrowser.open(URL) will use Microsoft Edge regardless of the default browser.
-                subprocess.Popen([self.app.default_browser_path, entry[AppData.KEY_ENTRY_PATH]], creationflags=subprocess.DETACHED_PROCESS)
-                tabs_opened += 1
-            elif os.path.isfile(entry[AppData.KEY_ENTRY_PATH]):
-                os.startfile(entry[AppData.KEY_ENTRY_PATH])
-        self.update_groups_status_bar(f"({time.strftime('%H:%M:%S', time.localtime())}) Group \"{group_name}\" opened.")
-    
-    def __async_auto_saving(self) -> None:
-        auto_save_delay_s = 60
-        while True:
-            time.sleep(auto_save_delay_s)
-            if self.auto_save_enabled.is_set() and not self.app.window[self.KEY_BUTTON_SAVE_CHANGES].Disabled:
-                self.__save_changes()
-
-    def __create_groups_tree_data(self) -> sg.TreeData:
-        new_tree_data = sg.TreeData()
-        for group in self.app.app_data.groups_data:
-            new_tree_data.insert('', group[AppData.KEY_GROUP_ID], f'  {group[AppData.KEY_GROUP_NAME]}', [len(group[AppData.KEY_GROUP_ENTRIES])], AppData.ICON_OTHER_FILE)
-        return new_tree_data
-    
-    def __save_changes(self) -> None:
-        with self.check_if_saving_lock:
-            if self.is_saving.is_set():
-                return
-            else:
-                self.is_saving.set()
+    def __on_opening_progress(self, values) -> None:
+        opening = values[self.KEY_EVENT_OPENING_PROGRESS]
+        if not opening.is_finished():
+            self.update_groups_status_bar(f"({time.strftime('%H:%M:%S', time.localtime())}) Opening \"{opening.group_name}\" group: {opening.get_progress_message()}...")
 
-        if threading.current_thread() is threading.main_thread():
-            self.update_groups_status_bar(f"({time.strftime('%H:%M:%S', time.localtime())}) Saving changes...")
+    def __on_opening_finished(self, values) -> None:
+        opening = values[self.KEY_EVENT_OPENING_FINISHED]
+        self.group_openings.discard(opening)
+        if not self.group_openings:
+            self.app.window[self.KEY_BUTTON_CANCEL_OPENING].update(disabled=True)
+        if opening.is_cancelled():
+            self.update_groups_status_bar(f"({time.strftime('%H:%M:%S', time.localtime())}) Opening of \"{opening.group_name}\" group cancelled ({opening.get_progress_message()}).")
         else:
-            self.update_groups_status_bar(f"({time.strftime('%H:%M:%S', time.localtime())}) Auto save: Saving changes...")
+            self.update_groups_status_bar(f"({time.strftime('%H:%M:%S', time.localtime())}) Group \"{opening.group_name}\" opened ({opening.get_progress_message()}).")
+    
+    def __on_open_group_request(self, request) -> dict:
+        group_name = request.get('group_name')
+        group = next((group for group in self.app.app_data.groups_data.values() if group.name == group_name), None)
+        if group is None:
+            return {'ok': False, 'error': f'There is no group named "{group_name}".'}
+        self.open_group(group.id)
+        return {'ok': True, 'message': f'Opening "{group_name}" group...'}
 
+    def __on_reload_request(self, _) -> dict:
+        app_data = self.app.app_data
         window = self.app.window
+        if app_data.has_unsaved_changes():
+            return {'ok': False, 'error': 'The application has unsaved changes.'}
+        if self.app.get_current_interface_key() == App.KEY_INTERFACE_GROUP_EDIT:
+            self.app.change_shown_interface(App.KEY_INTERFACE_MAIN)
+        app_data.load_groups_data()
+        app_data.load_settings()
+        self.app.launch_planner.keep_plans(app_data.groups_data)
+        self.app.get_interface(App.KEY_INTERFACE_GROUP_EDIT).restart_listeners()
+        window[self.KEY_CHECKBOX_START_WITH_WINDOWS].update(app_data.settings.get(AppData.KEY_SETTING_START_WITH_WINDOWS, False))
+        window[self.KEY_CHECKBOX_AUTO_SAVE].update(app_data.settings.get(AppData.KEY_SETTING_AUTO_SAVE, False))
+        self.auto_saver.set_enabled(app_data.settings.get(AppData.KEY_SETTING_AUTO_SAVE, False))
+        self.update_groups_tree()
+        self.update_change_buttons()
+        self.update_groups_status_bar(f"({time.strftime('%H:%M:%S', time.localtime())}) The saved data has been reloaded!")
+        return {'ok': True, 'message': 'The saved data has been reloaded.'}
+
+    def __on_search_index_ready(self, _) -> None:
+        if self.search_query:
+            self.update_groups_tree()
+
+    def __on_save_finished(self, values) -> None:
+        requested, error = values[self.KEY_EVENT_SAVE_FINISHED]
+        prefix = '' if requested else 'Auto save: '
+        if error is not None:
+            self.update_groups_status_bar(f"({time.strftime('%H:%M:%S', time.localtime())}) {prefix}Saving changes failed ({error})!")
+        else:
+            self.update_groups_status_bar(f"({time.strftime('%H:%M:%S', time.localtime())}) {prefix}Changes have been successfully saved!")
+        # Changes may have been made while saving.
+        self.update_change_buttons()
+
+    def __change_history(self, change, verb) -> None:
+        group_edit_interface = self.app.get_interface(App.KEY_INTERFACE_GROUP_EDIT)
+        # The operation may start or stop groups from listening (e.g. by deleting or restoring them).
+        listeners = group_edit_interface.get_listeners()
+        operation = change()
+        if operation is None:
+            return
+        group_edit_interface.update_listeners(listeners)
+        self.app.launch_planner.keep_plans(self.app.app_data.groups_data)
+        self.update_groups_tree()
+        self.update_change_buttons()
+        self.update_groups_status_bar(f"({time.strftime('%H:%M:%S', time.localtime())}) \"{operation.name}\" has been {verb}.")
+
+    @staticmethod
+    def __create_group_tree_row(group) -> tuple:
+        return (group.id, f'  {group.name}', [group.get_entries_count()], AppData.ICON_OTHER_FILE)
+    
+    def __save_data(self) -> None:
+        # Called on the writer thread of the auto saver, so it must not use the window.
         app_data = self.app.app_data
-        window[self.KEY_BUTTON_SAVE_CHANGES].update(disabled=True)
-        window[self.KEY_BUTTON_REVERT_CHANGES].update(disabled=True)
         app_data.save_group_data()
         app_data.save_settings()
         self.__set_start_with_windows(app_data.settings.get(AppData.KEY_SETTING_START_WITH_WINDOWS, False))
-
-        if threading.current_thread() is threading.main_thread():
-            self.update_groups_status_bar(f"({time.strftime('%H:%M:%S', time.localtime())}) Changes have been successfully saved!")
-        else:
-            self.update_groups_status_bar(f"({time.strftime('%H:%M:%S', time.localtime())}) Auto save: Changes have been successfully saved!")
-
-        self.is_saving.clear()
     
     def __set_start_with_windows(self, enabled: bool) -> None:
-        app_key = 'OpenMyFiles'
-        path_to_exe = None
+        command = None
         if enabled:
             # For using this application as an executable made with PyInstaller:
             # The PyInstaller way of finding out if this script is running or not as an executable made by PyInstaller.
             if getattr(sys, 'frozen', False):
-                path_to_exe = f'"{sys.executable}"'
-            else:
-                path_to_exe = f'"{sys.executable}" "{os.path.realpath(__file__)}"'
-        with winreg.OpenKey(winreg.HKEY_CURRENT_USER, "Software\\Microsoft\\Windows\\CurrentVersion\\Run", access=winreg.KEY_SET_VALUE) as reg_key:
-            if path_to_exe is None:
-                try:
-                    winreg.DeleteValue(reg_key, app_key)
-                except FileNotFoundError:
-                    pass
+                command = (sys.executable,)
             else:
-                winreg.SetValueEx(reg_key, app_key, 0, winreg.REG_SZ, path_to_exe)
+                command = (sys.executable, os.path.realpath(__file__))
+        self.app.launcher_backend.set_start_at_login(command)
     
     def __on_exit(self, _) -> None:
-        if self.app.window[self.KEY_BUTTON_SAVE_CHANGES].Disabled:
+        if not self.app.app_data.has_unsaved_changes():
             self.app.signal_shutdown()
             return
-        response = sg.popup_yes_no('\n== Save changes? ==\n')
-        if response is not None:
-            if response == 'Yes':
-                self.__save_changes()
-            self.app.signal_shutdown()
+        # With auto saving enabled, the last changes are saved without asking, instead of being lost. If that save fails,
+        # the user is asked as without auto saving.
+        message = '\n== Save changes? ==\n'
+        if self.auto_saver.is_enabled():
+            if self.auto_saver.flush():
+                self.app.signal_shutdown()
+                return
+            message = '\n== Saving changes failed! Try again? ==\n'
+        response = sg.popup_yes_no(message)
+        if response is None:
+            return
+        # If the save fails, the application stays open so the changes are not lost (the error is shown in the status bar).
+        if response == 'Yes' and not self.auto_saver.flush():
+            return
+        self.app.signal_shutdown()
 
 
 class GroupEditInterface(AppInterface):
     """The interface shown for group editing."""
 
     KEY_TREE_GROUP_EDIT = '-GROUP_EDIT_TREE-'
+    KEY_INPUT_SEARCH_ENTRIES = '-SEARCH_ENTRIES_INPUT-'
     KEY_BUTTON_ADD_FILES = '-ADD_FILES_BUTTON-'
     KEY_BUTTON_ADD_WEB_PAGE = '-ADD_WEB_PAGE_BUTTON-'
+    KEY_BUTTON_ADD_FOLDER = '-ADD_FOLDER_BUTTON-'
     KEY_BUTTON_DELETE_ENTRIES = '-DELETE_ENTRIES_BUTTON-'
     KEY_BUTTON_EDIT_DETAILS = '-EDIT_DETAILS_BUTTON-'
+    KEY_BUTTON_LAUNCH_STATS = '-LAUNCH_STATS_BUTTON-'
     KEY_BUTTON_BACK = '-GROUP_EDIT_BACK_BUTTON-'
     KEY_BUTTON_LISTEN_TO_DIR = 'LISTEN_DIR_BUTTON'
     KEY_STATUS_BAR_ENTRIES = '-ENTRIES_STATUS_BAR-'
     KEY_LABEL_GROUP_NAME = '-GROUP_NAME_LABEL-'
+    KEY_EVENT_LISTENING_BATCH = '-LISTENING_BATCH_EVENT-'
+    KEY_EVENT_LISTENING_RECONCILED = '-LISTENING_RECONCILED_EVENT-'
+    KEY_EVENT_LISTENING_DIRS_MISSING = '-LISTENING_DIRS_MISSING_EVENT-'
+    KEY_EVENT_FOLDER_FILES_FOUND = '-FOLDER_FILES_FOUND_EVENT-'
+    KEY_EVENT_FOLDER_IMPORT_FINISHED = '-FOLDER_IMPORT_FINISHED_EVENT-'
+    KEY_INPUT_INCLUDE_PATTERNS = '-INCLUDE_PATTERNS_INPUT-'
+    KEY_INPUT_EXCLUDE_PATTERNS = '-EXCLUDE_PATTERNS_INPUT-'
+    KEY_CHECKBOX_RECURSIVE = '-RECURSIVE_CHECKBOX-'
+
+    HEALTH_STATE_TEXTS = {
+        EntryHealthChecker.STATE_OK: 'OK',
+        EntryHealthChecker.STATE_MISSING: 'Missing',
+        EntryHealthChecker.STATE_SLOW: 'Slow'
+    }
 
     def __init__(self) -> None:
         super().__init__()
         self.win_layout = [[
                 sg.Text('<Name> Group', key=self.KEY_LABEL_GROUP_NAME, font=('Arial', 16, 'normal'), pad=15)
+            ],[
+                sg.Text('Search:', pad=((15, 5), (0, 10))),
+                sg.Input(key=self.KEY_INPUT_SEARCH_ENTRIES, enable_events=True, expand_x=True, pad=((0, 15), (0, 10)))
             ],[
                 sg.Tree(data=sg.TreeData(), 
                         key=self.KEY_TREE_GROUP_EDIT, 
-                        headings=['Details'],
+                        headings=['Details', 'Status'],
                         header_font=sg.DEFAULT_FONT, 
                         select_mode=sg.TABLE_SELECT_MODE_EXTENDED, 
                         num_rows=20,
                         auto_size_columns=False,
-                        col_widths=[35],
+                        col_widths=[35, 10],
                         col0_width=55,
                         col0_heading='Path',
                         justification='center',
@@ -477,9 +4397,11 @@ class GroupEditInterface(AppInterface):
                 sg.Column([[
                         sg.Input(key=self.KEY_BUTTON_ADD_FILES, visible=False, enable_events=True), 
                         sg.FilesBrowse('Add Files', self.KEY_BUTTON_ADD_FILES),
+                        sg.Button('Add Folder', key=self.KEY_BUTTON_ADD_FOLDER),
                         sg.Button('Add Web Page', key=self.KEY_BUTTON_ADD_WEB_PAGE),
                         sg.Button('Delete Selected Entries', key=self.KEY_BUTTON_DELETE_ENTRIES, disabled=True),
                         sg.Button('Edit Selected Details', key=self.KEY_BUTTON_EDIT_DETAILS, disabled=True),
+                        sg.Button('Launch Stats', key=self.KEY_BUTTON_LAUNCH_STATS),
                         sg.Button('Start Listening', key=self.KEY_BUTTON_LISTEN_TO_DIR),
                         sg.Button('Back', key=self.KEY_BUTTON_BACK),
                         ]],
@@ -496,49 +4418,124 @@ class GroupEditInterface(AppInterface):
         ]
         self.win_events = {
             self.KEY_TREE_GROUP_EDIT: [self.on_tree_event],
+            self.KEY_INPUT_SEARCH_ENTRIES: [self.on_input_search],
             self.KEY_BUTTON_ADD_FILES: [self.on_button_add_files],
+            self.KEY_BUTTON_ADD_FOLDER: [self.on_button_add_folder],
             self.KEY_BUTTON_ADD_WEB_PAGE: [self.on_button_add_web_page],
             self.KEY_BUTTON_DELETE_ENTRIES: [self.on_button_delete_entries],
             self.KEY_BUTTON_EDIT_DETAILS: [self.on_button_edit_details],
+            self.KEY_BUTTON_LAUNCH_STATS: [self.on_button_launch_stats],
             self.KEY_BUTTON_LISTEN_TO_DIR: [self.on_button_listen_dir],
             self.KEY_BUTTON_BACK: [self.on_button_back]
         }
-        self.group = None
+        self.group_id = None
+        self.search_query = ''
+
+    @property
+    def group(self) -> Group:
+        """The working version of the edited group (it's replaced by a copy when first changed after a save)."""
+
+        return None if self.group_id is None else self.app.app_data.groups_data[self.group_id]
     
     def start(self) -> None:
         super().start()
-        self.listening_event_handler = PatternMatchingEventHandler('*', None, True, True)
-        self.listening_event_handler.on_created = self.__listening_on_created
-        self.listening_event_handler.on_deleted = self.__listening_on_deleted
-        self.listening_event_handler.on_moved = self.__listening_on_moved
+        settings = self.app.app_data.settings
+        # The watchdog events are coalesced in batches which are applied in the event loop thread.
+        self.listening_events = ListeningEventQueue(
+            lambda: self.app.window.write_event_value(self.KEY_EVENT_LISTENING_BATCH, None),
+            settings.get(AppData.KEY_SETTING_LISTENING_BATCH_WINDOW_MS, ListeningEventQueue.DEFAULT_BATCH_WINDOW_MS),
+            settings.get(AppData.KEY_SETTING_LISTENING_MAX_QUEUE_DEPTH, ListeningEventQueue.DEFAULT_MAX_QUEUE_DEPTH))
+        if self.app.event_loop_profiler is not None:
+            self.app.event_loop_profiler.metrics_providers['listening_events'] = self.listening_events.get_metrics
+        for event_key, action in ((self.KEY_EVENT_LISTENING_BATCH, self.__on_listening_batch),
+                                  (self.KEY_EVENT_LISTENING_RECONCILED, self.__on_listening_reconciled),
+                                  (self.KEY_EVENT_LISTENING_DIRS_MISSING, self.__on_listening_dirs_missing),
+                                  (self.KEY_EVENT_FOLDER_FILES_FOUND, self.__on_folder_files_found),
+                                  (self.KEY_EVENT_FOLDER_IMPORT_FINISHED, self.__on_folder_import_finished),
+                                  (App.KEY_EVENT_ENTRIES_CHECKED, self.__on_entries_checked)):
+            if event_key in self.app.win_global_events:
+                self.app.win_global_events[event_key].append(action)
+            else:
+                self.app.win_global_events[event_key] = [action]
+
+        self.folder_importer = FolderImporter(
+            self.app.launcher_backend.get_file_entry_type,
+            settings.get(AppData.KEY_SETTING_FOLDER_IMPORT_MAX_WORKERS, FolderImporter.DEFAULT_MAX_WORKERS))
+        self.folder_import_batch_size = max(1, settings.get(AppData.KEY_SETTING_FOLDER_IMPORT_BATCH_SIZE, FolderImporter.DEFAULT_BATCH_SIZE))
+        # Key:group_id, Value:FolderImport
+        self.folder_imports = dict()
+
+        # Large groups are shown through a virtual view, which inserts in the widget only the rows around the visible ones.
+        self.entries_tree = VirtualTreeRowsView(
+            self.app.window[self.KEY_TREE_GROUP_EDIT], 
+            settings.get(AppData.KEY_SETTING_TREE_REBUILD_RATIO, TreeRowsView.DEFAULT_REBUILD_RATIO),
+            settings.get(AppData.KEY_SETTING_VIRTUAL_TREE_THRESHOLD, VirtualTreeRowsView.DEFAULT_THRESHOLD))
+
         self.listening_observer = Observer()
-        self.listening_watches = []
-        for group in self.app.app_data.groups_data:
-            if AppData.KEY_GROUP_LISTENING_DIR in group:
-                if os.path.isdir(group[AppData.KEY_GROUP_LISTENING_DIR]):
-                    self.listening_watches.append(self.listening_observer.schedule(self.listening_event_handler, group[AppData.KEY_GROUP_LISTENING_DIR]))
-                else:
-                    group.pop(AppData.KEY_GROUP_LISTENING_DIR)
-        self.listening_observer.start()
+        self.watch_registry = WatchRegistry(
+            self.listening_observer, 
+            self.listening_events.push_created, 
+            self.listening_events.push_deleted, 
+            self.listening_events.push_moved)
+        # Scheduling the watches may take a while for many directories, so the listeners are started in the background. 
+        # The methods which change the watches wait for them to be started.
+        self.listeners_started = threading.Event()
+        threading.Thread(target=self.__async_starting_listeners, args=(self.get_listeners(),), daemon=True).start()
         self.app.on_shutdown_actions.append(self.__on_app_shutdown)
 
     def on_show(self) -> None:
         super().on_show()
         window = self.app.window
-        window[self.KEY_LABEL_GROUP_NAME].update(f'{self.group[AppData.KEY_GROUP_NAME]} Group')
-        window[self.KEY_TREE_GROUP_EDIT].update(self.__create_entries_tree_data())
-        if AppData.KEY_GROUP_LISTENING_DIR in self.group:
+        window[self.KEY_LABEL_GROUP_NAME].update(f'{self.group.name} Group')
+        self.search_query = ''
+        window[self.KEY_INPUT_SEARCH_ENTRIES].update('')
+        self.entries_tree.reset()
+        self.__update_entries_tree()
+        if self.group.listening_dir is not None:
             window[self.KEY_BUTTON_LISTEN_TO_DIR].update('Stop Listening')
-            window[self.KEY_STATUS_BAR_ENTRIES].update(value=f"Listening on {self.group[AppData.KEY_GROUP_LISTENING_DIR]}")
+            window[self.KEY_STATUS_BAR_ENTRIES].update(value=f"Listening on {self.group.listening_dir}")
         else:
             window[self.KEY_BUTTON_LISTEN_TO_DIR].update('Start Listening')
             window[self.KEY_STATUS_BAR_ENTRIES].update(value='')
+        folder_import = self.folder_imports.get(self.group_id)
+        window[self.KEY_BUTTON_ADD_FOLDER].update('Add Folder' if folder_import is None else 'Cancel Import')
+        if folder_import is not None:
+            window[self.KEY_STATUS_BAR_ENTRIES].update(value=f'Importing {folder_import.folder_path}: {folder_import.get_progress_message()}')
     
+    def restart_listeners(self) -> None:
+        """Listens again to the directories of the groups, e.g. after the groups data was reloaded."""
+
+        self.listeners_started.wait()
+        self.watch_registry.unsubscribe_all()
+        listening_dirs, missing_listeners = self.__schedule_listeners(self.get_listeners())
+        self.__stop_missing_listeners(missing_listeners)
+        threading.Thread(target=self.__async_reconciling, args=(listening_dirs,), daemon=True).start()
+
     def remove_listener(self, group) -> None:
-        path_to_listen = group[AppData.KEY_GROUP_LISTENING_DIR]
-        watch = [watch for watch in self.listening_watches if watch.path == path_to_listen][0]
-        self.listening_observer.unschedule(watch)
-        self.listening_watches.remove(watch)
+        self.listeners_started.wait()
+        self.watch_registry.unsubscribe(group.listening_dir, group.listening_filter)
+
+    def get_listeners(self) -> dict:
+        """Returns the directory and the filter of each listening group. Key:group_id, Value:(listening_dir, listening_filter)"""
+
+        return {group.id: (group.listening_dir, group.listening_filter) for group in self.app.app_data.groups_data.values() if group.listening_dir is not None}
+
+    def update_listeners(self, old_listeners) -> None:
+        """
+        Listens to the directories of the groups which changed since the given listeners were returned by `get_listeners`
+        (e.g. by undoing an operation). The directories are not reconciled, so the undone changes are not made again.
+        """
+
+        new_listeners = self.get_listeners()
+        if new_listeners == old_listeners:
+            return
+        self.listeners_started.wait()
+        for group_id, listener in old_listeners.items():
+            if new_listeners.get(group_id) != listener:
+                self.watch_registry.unsubscribe(*listener)
+        for group_id, listener in new_listeners.items():
+            if old_listeners.get(group_id) != listener:
+                self.watch_registry.subscribe(*listener)
 
     def on_tree_event(self, values) -> None:
         window = self.app.window
@@ -546,150 +4543,325 @@ class GroupEditInterface(AppInterface):
         window[self.KEY_BUTTON_DELETE_ENTRIES].update(disabled=should_disable)
         window[self.KEY_BUTTON_EDIT_DETAILS].update(disabled=should_disable)
 
+    def on_input_search(self, values) -> None:
+        self.search_query = values[self.KEY_INPUT_SEARCH_ENTRIES].strip()
+        shown_entry_ids = self.__update_entries_tree()
+        self.on_tree_event({self.KEY_TREE_GROUP_EDIT: [key for key in values[self.KEY_TREE_GROUP_EDIT] if key in shown_entry_ids]})
+
     def on_button_add_files(self, values) -> None:
-        window = self.app.window
-        new_entries = values[self.KEY_BUTTON_ADD_FILES].split(';')
-        for index, entry in enumerate(new_entries, start=len(self.group[AppData.KEY_GROUP_ENTRIES])):
-            if entry.split('.')[-1] == 'exe':
-                self.group[AppData.KEY_GROUP_ENTRIES].append({
-                    AppData.KEY_ENTRY_ID: index,
-                    AppData.KEY_ENTRY_PATH: entry, 
-                    AppData.KEY_ENTRY_TYPE: AppData.ENTRY_EXE_FILE, 
-                    AppData.KEY_ENTRY_DETAILS: ''
-                })
-            else:
-                self.group[AppData.KEY_GROUP_ENTRIES].append({
-                    AppData.KEY_ENTRY_ID: index,
-                    AppData.KEY_ENTRY_PATH: entry, 
-                    AppData.KEY_ENTRY_TYPE: AppData.ENTRY_OTHER_FILE, 
-                    AppData.KEY_ENTRY_DETAILS: ''
-                })
-        window[self.KEY_TREE_GROUP_EDIT].update(self.__create_entries_tree_data())
+        new_entries = [(entry_path, self.app.launcher_backend.get_file_entry_type(entry_path)) for entry_path in values[self.KEY_BUTTON_ADD_FILES].split(';')]
+        # The files which are already in the group are skipped.
+        if not self.app.app_data.add_entries(self.group_id, new_entries):
+            return
+        self.__update_entries_tree()
         main_interface = self.app.get_interface(App.KEY_INTERFACE_MAIN)
         main_interface.made_changes = True
         main_interface.tree_dirty = True
 
-    def on_button_add_web_page(self, values) -> None:
+    def on_button_add_folder(self, _) -> None:
         window = self.app.window
+        folder_import = self.folder_imports.get(self.group_id)
+        if folder_import is not None:
+            folder_import.cancel()
+            return
+        folder_path = sg.popup_get_folder('Select the folder to import:', title='Select Folder')
+        if folder_path is None or folder_path == '':
+            return
+        files_filter = self.__popup_files_filter('Select Files to Import')
+        if files_filter is None:
+            return
+        # The files are added in batches as they are found, so the group can still be used meanwhile.
+        self.folder_imports[self.group_id] = self.folder_importer.start(
+            self.group_id,
+            folder_path,
+            files_filter,
+            lambda folder_import: window.write_event_value(self.KEY_EVENT_FOLDER_FILES_FOUND, folder_import),
+            lambda folder_import: window.write_event_value(self.KEY_EVENT_FOLDER_IMPORT_FINISHED, folder_import))
+        window[self.KEY_BUTTON_ADD_FOLDER].update('Cancel Import')
+        window[self.KEY_STATUS_BAR_ENTRIES].update(value=f'Importing {folder_path}...')
+
+    def on_button_add_web_page(self, values) -> None:
         added_url = sg.popup_get_text("What's the web address of your desired web page?", "Input URL")
-        if added_url is not None and added_url != '':
-            self.group[AppData.KEY_GROUP_ENTRIES].append({
-                AppData.KEY_ENTRY_ID: len(self.group[AppData.KEY_GROUP_ENTRIES]),
-                AppData.KEY_ENTRY_PATH: added_url,
-                AppData.KEY_ENTRY_TYPE: AppData.ENTRY_WEB_PAGE, 
-                AppData.KEY_ENTRY_DETAILS: ''
-            })
-            window[self.KEY_TREE_GROUP_EDIT].update(self.__create_entries_tree_data())
+        if added_url is not None and added_url != '' and self.app.app_data.add_entries(self.group_id, [(added_url, AppData.ENTRY_WEB_PAGE)]):
+            self.__update_entries_tree()
             main_interface = self.app.get_interface(App.KEY_INTERFACE_MAIN)
             main_interface.made_changes = True
             main_interface.tree_dirty = True
 
     def on_button_delete_entries(self, values) -> None:
-        window = self.app.window
-        self.group[AppData.KEY_GROUP_ENTRIES][:] = [entry for entry in self.group[AppData.KEY_GROUP_ENTRIES] if entry[AppData.KEY_ENTRY_ID] not in values[self.KEY_TREE_GROUP_EDIT]]
-        self.app.app_data.refresh_ids(for_group_with_id=self.group[AppData.KEY_GROUP_ID])
-        window[self.KEY_TREE_GROUP_EDIT].update(self.__create_entries_tree_data())
+        self.app.app_data.delete_entries(self.group_id, values[self.KEY_TREE_GROUP_EDIT])
+        self.entries_tree.remove_rows(values[self.KEY_TREE_GROUP_EDIT])
         main_interface = self.app.get_interface(App.KEY_INTERFACE_MAIN)
         main_interface.made_changes = True
         main_interface.tree_dirty = True
 
     def on_button_edit_details(self, values) -> None:
-        window = self.app.window
-        selected_entries = [entry for entry in self.group[AppData.KEY_GROUP_ENTRIES] if entry[AppData.KEY_ENTRY_ID] in values[self.KEY_TREE_GROUP_EDIT]]
-        old_details = selected_entries[0][AppData.KEY_ENTRY_DETAILS] if len(selected_entries) == 1 else ''
+        entries = self.group.entries_by_id
+        selected_entries = [entries[entry_id] for entry_id in values[self.KEY_TREE_GROUP_EDIT] if entry_id in entries]
+        old_details = selected_entries[0].details if len(selected_entries) == 1 else ''
         new_details = sg.popup_get_text('What are the details of those entries?', 'Input details for selected entries', old_details)
         if new_details is not None:
-            for entry in selected_entries:
-                entry[AppData.KEY_ENTRY_DETAILS] = new_details
-            window[self.KEY_TREE_GROUP_EDIT].update(self.__create_entries_tree_data())
+            self.app.app_data.change_entries_details(self.group_id, values[self.KEY_TREE_GROUP_EDIT], new_details)
+            self.__update_entries_tree()
             self.app.get_interface(App.KEY_INTERFACE_MAIN).made_changes = True
 
+    def on_button_launch_stats(self, _) -> None:
+        sg.popup_scrolled(
+            self.app.launch_telemetry.get_report(self.group.entries), 
+            title=f'{self.group.name} Launch Stats', 
+            size=(100, 20), 
+            font=('Courier New', 10, 'normal'))
+
     def on_button_listen_dir(self, _) -> None:
         window = self.app.window
         if window[self.KEY_BUTTON_LISTEN_TO_DIR].get_text().startswith('Start'):
             path_to_listen = sg.popup_get_folder('Select the directory to listen:', title='Select Directory')
             if path_to_listen is not None and path_to_listen != '':
-                self.listening_watches.append(self.listening_observer.schedule(self.listening_event_handler, path_to_listen))
-                self.group[AppData.KEY_GROUP_LISTENING_DIR] = path_to_listen
+                listening_filter = self.__popup_files_filter('Select Files to Listen To')
+                if listening_filter is None:
+                    return
+                self.listeners_started.wait()
+                self.watch_registry.subscribe(path_to_listen, listening_filter)
+                self.app.app_data.change_listening_dir(self.group_id, path_to_listen, listening_filter)
+                # The files which are already in the directory are added to the group in the background.
+                threading.Thread(target=self.__async_reconciling, args=([path_to_listen], [self.group_id]), daemon=True).start()
                 window[self.KEY_BUTTON_LISTEN_TO_DIR].update('Stop Listening')
                 window[self.KEY_STATUS_BAR_ENTRIES].update(value=f"Listening on {path_to_listen}")
                 self.app.get_interface(App.KEY_INTERFACE_MAIN).made_changes = True
         else:
             self.remove_listener(self.group)
-            self.group.pop(AppData.KEY_GROUP_LISTENING_DIR)
+            self.app.app_data.change_listening_dir(self.group_id, None)
             window[self.KEY_BUTTON_LISTEN_TO_DIR].update('Start Listening')
             window[self.KEY_STATUS_BAR_ENTRIES].update(value='')
             self.app.get_interface(App.KEY_INTERFACE_MAIN).made_changes = True
 
     def on_button_back(self, _) -> None:
-        self.group = None
+        self.group_id = None
         self.app.change_shown_interface(App.KEY_INTERFACE_MAIN)
 
-    def __create_entries_tree_data(self) -> sg.TreeData:
-        new_tree_data = sg.TreeData()
-        for entry in self.group[AppData.KEY_GROUP_ENTRIES]:
-            icon = AppData.ICON_OTHER_FILE
-            if entry[AppData.KEY_ENTRY_TYPE] == AppData.ENTRY_EXE_FILE:
-                icon = AppData.ICON_EXE_FILE
-            elif entry[AppData.KEY_ENTRY_TYPE] == AppData.ENTRY_WEB_PAGE:
-                icon = AppData.ICON_WEB_PAGE
-            new_tree_data.insert('', entry[AppData.KEY_ENTRY_ID], f'  {entry[AppData.KEY_ENTRY_PATH]}', [entry[AppData.KEY_ENTRY_DETAILS]], icon)
-        return new_tree_data
+    def __update_entries_tree(self):
+        """Shows the entries of the group which match the search, and returns their ids."""
 
-    def __listening_on_created(self, event):
-        file_path = event.src_path.replace(os.sep, '/')
-        if file_path.split('.')[-1] == 'exe':
-            entry_type = AppData.ENTRY_EXE_FILE
+        entries = self.group.entries
+        if self.search_query:
+            # The entries are shown in the order of their ids.
+            entries_by_id = self.group.entries_by_id
+            entries = [entries_by_id[entry_id] for entry_id in sorted(self.app.app_data.search_entries(self.search_query, self.group_id))]
+        # Only the shown files whose states are not cached (or expired) are checked in the background, and their rows are
+        # updated afterwards.
+        unchecked_paths = []
+        self.entries_tree.update([self.__create_entry_tree_row(entry, unchecked_paths) for entry in entries])
+        if unchecked_paths:
+            self.app.health_checker.check(unchecked_paths)
+        return {entry.id for entry in entries}
+
+    def __create_entry_tree_row(self, entry, unchecked_paths) -> tuple:
+        icon = AppData.ICON_OTHER_FILE
+        state_text = ''
+        if entry.type == AppData.ENTRY_WEB_PAGE:
+            icon = AppData.ICON_WEB_PAGE
         else:
-            entry_type = AppData.ENTRY_OTHER_FILE
-        path_to_listen = os.path.split(file_path)[0]
-        
-        for group in self.app.app_data.groups_data:
-            if AppData.KEY_GROUP_LISTENING_DIR in group and group[AppData.KEY_GROUP_LISTENING_DIR] == path_to_listen:
-                group[AppData.KEY_GROUP_ENTRIES].append({
-                    AppData.KEY_ENTRY_ID: len(group[AppData.KEY_GROUP_ENTRIES]),
-                    AppData.KEY_ENTRY_PATH: file_path, 
-                    AppData.KEY_ENTRY_TYPE: entry_type, 
-                    AppData.KEY_ENTRY_DETAILS: ''
-                })
-                self.app.window[MainInterface.KEY_TREE_MAIN].update(key=group[AppData.KEY_GROUP_ID], value=[len(group[AppData.KEY_GROUP_ENTRIES])])
-        
-        self.__on_listening_event(path_to_listen)
-
-    def __listening_on_deleted(self, event) -> None:
-        file_path = event.src_path.replace(os.sep, '/')
-        path_to_listen = os.path.split(file_path)[0]
-
-        for group in self.app.app_data.groups_data:
-            if AppData.KEY_GROUP_LISTENING_DIR in group and group[AppData.KEY_GROUP_LISTENING_DIR] == path_to_listen:
-                group[AppData.KEY_GROUP_ENTRIES][:] = [entry for entry in group[AppData.KEY_GROUP_ENTRIES] if entry[AppData.KEY_ENTRY_PATH] != file_path]
-                self.app.app_data.refresh_ids(for_group_with_id=group[AppData.KEY_GROUP_ID])
-                self.app.window[MainInterface.KEY_TREE_MAIN].update(key=group[AppData.KEY_GROUP_ID], value=[len(group[AppData.KEY_GROUP_ENTRIES])])
-        
-        self.__on_listening_event(path_to_listen)
-
-    def __listening_on_moved(self, event) -> None:
-        old_file_path = event.src_path.replace(os.sep, '/')
-        new_file_path = event.dest_path.replace(os.sep, '/')
-        path_to_listen = os.path.split(old_file_path)[0]
-
-        for group in self.app.app_data.groups_data:
-            if AppData.KEY_GROUP_LISTENING_DIR in group and group[AppData.KEY_GROUP_LISTENING_DIR] == path_to_listen:
-                for entry in group[AppData.KEY_GROUP_ENTRIES]:
-                    if entry[AppData.KEY_ENTRY_PATH] == old_file_path:
-                        entry[AppData.KEY_ENTRY_PATH] = new_file_path
-        
-        self.__on_listening_event(path_to_listen)
-
-    def __on_listening_event(self, path_to_listen) -> None:
-        window = self.app.window
-        if self.group is not None and AppData.KEY_GROUP_LISTENING_DIR in self.group and self.group[AppData.KEY_GROUP_LISTENING_DIR] == path_to_listen:
-            window[self.KEY_TREE_GROUP_EDIT].update(self.__create_entries_tree_data())
-        window[MainInterface.KEY_BUTTON_SAVE_CHANGES].update(disabled=False)
-        window[MainInterface.KEY_BUTTON_REVERT_CHANGES].update(disabled=False)
-        window.refresh()
+            if entry.type == AppData.ENTRY_EXE_FILE:
+                icon = AppData.ICON_EXE_FILE
+            state = self.app.health_checker.get_state(entry.path)
+            if state is None:
+                unchecked_paths.append(entry.path)
+            state_text = self.HEALTH_STATE_TEXTS.get(state, '')
+        return (entry.id, f'  {entry.path}', [entry.details, state_text], icon)
+
+    def __popup_files_filter(self, title):
+        """Asks for the files of a directory to listen to or to import. Returns their filter, or None if it was canceled."""
+
+        default_filter = ListeningFilter()
+        popup = sg.Window(title, [
+                [sg.Text('Include the files matching (patterns separated by ";"):')],
+                [sg.Input('; '.join(default_filter.include_patterns), key=self.KEY_INPUT_INCLUDE_PATTERNS, size=60)],
+                [sg.Text('Exclude the files matching (patterns separated by ";"):')],
+                [sg.Input('; '.join(default_filter.exclude_patterns), key=self.KEY_INPUT_EXCLUDE_PATTERNS, size=60)],
+                [sg.Checkbox('Include the files in subdirectories', key=self.KEY_CHECKBOX_RECURSIVE)],
+                [sg.Button('Ok'), sg.Button('Cancel')]
+            ], 
+            modal=True)
+        event, values = popup.read()
+        popup.close()
+        if event != 'Ok':
+            return None
+        include_patterns = [pattern.strip() for pattern in values[self.KEY_INPUT_INCLUDE_PATTERNS].split(';') if pattern.strip()]
+        exclude_patterns = [pattern.strip() for pattern in values[self.KEY_INPUT_EXCLUDE_PATTERNS].split(';') if pattern.strip()]
+        return ListeningFilter(include_patterns or ListeningFilter.DEFAULT_INCLUDE_PATTERNS, exclude_patterns, values[self.KEY_CHECKBOX_RECURSIVE])
+
+    def __on_listening_batch(self, _) -> None:
+        start_time = time.perf_counter()
+        changes = self.listening_events.take_batch()
+        self.__apply_listening_changes(changes)
+        self.app.app_data.listening_snapshots.apply_changes(changes)
+        self.listening_events.record_batch_duration((time.perf_counter() - start_time) * 1000)
+
+    def __on_folder_files_found(self, values) -> None:
+        folder_import = values[self.KEY_EVENT_FOLDER_FILES_FOUND]
+        self.__add_folder_files(folder_import)
+        # The batches are bounded so the window stays responsive, and the next one is taken after the pending events.
+        if folder_import.has_pending_files() and not folder_import.is_cancelled():
+            self.app.window.write_event_value(self.KEY_EVENT_FOLDER_FILES_FOUND, folder_import)
+
+    def __on_folder_import_finished(self, values) -> None:
+        folder_import = values[self.KEY_EVENT_FOLDER_IMPORT_FINISHED]
+        while folder_import.has_pending_files() and not folder_import.is_cancelled():
+            self.__add_folder_files(folder_import)
+        self.folder_imports.pop(folder_import.group_id, None)
+        if self.group_id == folder_import.group_id:
+            window = self.app.window
+            status = 'Cancelled importing' if folder_import.is_cancelled() else 'Imported'
+            window[self.KEY_BUTTON_ADD_FOLDER].update('Add Folder')
+            window[self.KEY_STATUS_BAR_ENTRIES].update(value=f'{status} {folder_import.folder_path}: {folder_import.get_progress_message()}')
+
+    def __add_folder_files(self, folder_import) -> None:
+        app_data = self.app.app_data
+        group_id = folder_import.group_id
+        # The group may have been deleted meanwhile.
+        if group_id not in app_data.groups_data:
+            folder_import.cancel()
+        if folder_import.is_cancelled():
+            return
+        new_files = folder_import.take_batch(self.folder_import_batch_size)
+        if not new_files:
+            return
+        with app_data.recording_operation('Import Folder'):
+            # The files which are already in the group are skipped.
+            added_count = app_data.add_entries(group_id, new_files)
+        folder_import.record_added(len(new_files), added_count)
+        if added_count:
+            # The batches of the import are undone at once.
+            operation_log = app_data.operation_log
+            if folder_import.operation is None or not operation_log.merge_last(folder_import.operation):
+                folder_import.operation = operation_log.peek_undo()
+            main_interface = self.app.get_interface(App.KEY_INTERFACE_MAIN)
+            main_interface.update_groups_tree_rows([group_id])
+            if self.group_id == group_id:
+                self.__update_entries_tree()
+            main_interface.update_change_buttons()
+        if self.group_id == group_id:
+            self.app.window[self.KEY_STATUS_BAR_ENTRIES].update(value=f'Importing {folder_import.folder_path}: {folder_import.get_progress_message()}')
+
+    def __on_entries_checked(self, _) -> None:
+        checked_paths = self.app.health_checker.take_checked_paths()
+        if self.group_id is not None and self.group_id in self.app.app_data.groups_data and any(entry.path in checked_paths for entry in self.group.entries):
+            self.__update_entries_tree()
+
+    def __on_listening_reconciled(self, values) -> None:
+        listening_dir, group_ids, changes, fresh_snapshot = values[self.KEY_EVENT_LISTENING_RECONCILED]
+        app_data = self.app.app_data
+        listening_group_ids = app_data.get_groups_listening_to(listening_dir)
+        # The groups may have stopped listening to the directory meanwhile.
+        if group_ids is not None:
+            listening_group_ids = [group_id for group_id in group_ids if group_id in listening_group_ids]
+        if not listening_group_ids:
+            return
+        self.__apply_listening_changes(changes, listening_group_ids)
+        app_data.listening_snapshots.set_snapshot(listening_dir, fresh_snapshot)
+
+    def __apply_listening_changes(self, changes, group_ids=None) -> None:
+        """Applies the listening changes to the given groups, or else to the groups listening to the changed directories."""
+
+        app_data = self.app.app_data
+        changed_group_ids = set()
+        # The cached states of the changed files are stale, so they are checked again when their rows are updated.
+        self.app.health_checker.invalidate([path for _, file_path, _, moved_from_path in changes for path in (file_path, moved_from_path) if path is not None])
+        # The created files come last in the changes, so they are added at once for each group. Key:group_id, Value:list[(path, type)]
+        new_entries = dict()
+        # The changes of the batch are undone at once.
+        with app_data.recording_operation('Directory Changes'):
+            for path_to_listen, file_path, exists, moved_from_path in changes:
+                relative_path = ListeningSnapshots.get_relative_path(path_to_listen, file_path)
+                for group_id in (group_ids if group_ids is not None else app_data.get_groups_listening_to(path_to_listen)):
+                    # The changes are filtered for all the groups listening to the directory, so they are filtered again for each one.
+                    if not app_data.groups_data[group_id].listening_filter.matches(relative_path):
+                        if moved_from_path is not None and app_data.delete_entries_with_path(group_id, moved_from_path):
+                            changed_group_ids.add(group_id)
+                        continue
+                    if moved_from_path is not None and app_data.change_entries_path(group_id, moved_from_path, file_path):
+                        changed_group_ids.add(group_id)
+                    elif exists:
+                        new_entries.setdefault(group_id, []).append((file_path, self.app.launcher_backend.get_file_entry_type(file_path)))
+                    elif app_data.delete_entries_with_path(group_id, file_path):
+                        changed_group_ids.add(group_id)
+            for group_id, entries in new_entries.items():
+                if app_data.add_entries(group_id, entries):
+                    changed_group_ids.add(group_id)
+
+        # The UI is updated once for the whole batch.
+        if changed_group_ids:
+            self.app.get_interface(App.KEY_INTERFACE_MAIN).update_groups_tree_rows(changed_group_ids)
+            if self.group_id in changed_group_ids:
+                self.__update_entries_tree()
+            self.app.get_interface(App.KEY_INTERFACE_MAIN).update_change_buttons()
+
+    def __on_listening_dirs_missing(self, values) -> None:
+        self.__stop_missing_listeners(values[self.KEY_EVENT_LISTENING_DIRS_MISSING])
+
+    def __stop_missing_listeners(self, missing_listeners) -> None:
+        """Stops the groups listening to missing directories from listening, unless they changed their directory meanwhile."""
+
+        listeners = self.get_listeners()
+        group_ids = [group_id for group_id, listening_dir in missing_listeners.items() if listeners.get(group_id, (None,))[0] == listening_dir]
+        changed_group_ids = self.app.app_data.clear_listening_dirs(group_ids)
+        if not changed_group_ids:
+            return
+        main_interface = self.app.get_interface(App.KEY_INTERFACE_MAIN)
+        main_interface.update_groups_tree_rows(changed_group_ids)
+        main_interface.update_change_buttons()
+        if self.group_id in changed_group_ids:
+            self.app.window[self.KEY_BUTTON_LISTEN_TO_DIR].update('Start Listening')
+            self.app.window[self.KEY_STATUS_BAR_ENTRIES].update(value='')
+
+    def __async_starting_listeners(self, listeners) -> None:
+        listening_dirs, missing_listeners = self.__schedule_listeners(listeners)
+        self.listening_observer.start()
+        self.listeners_started.set()
+        if missing_listeners:
+            self.app.window.write_event_value(self.KEY_EVENT_LISTENING_DIRS_MISSING, missing_listeners)
+        self.__async_reconciling(listening_dirs)
+
+    def __async_reconciling(self, listening_dirs, group_ids=None) -> None:
+        """
+        Scans the directories and sends their changes since the saved snapshots to the event loop thread, to be applied to 
+        the given groups (or to all the groups listening to them) as one batch per directory. The directories are scanned 
+        after being listened to, so no change is missed, and the changes which are also received by the listeners are 
+        applied only once since applying them again has no effect.
+        """
+
+        listening_snapshots = self.app.app_data.listening_snapshots
+        for listening_dir in listening_dirs:
+            try:
+                fresh_snapshot = ListeningSnapshots.scan(listening_dir, self.watch_registry.get_filters(listening_dir))
+            except OSError:
+                continue
+            if group_ids is None:
+                changes = listening_snapshots.diff(listening_dir, fresh_snapshot)
+            else:
+                # The groups which start listening get all the files in the directory.
+                changes = ListeningSnapshots.get_files_as_created(listening_dir, fresh_snapshot)
+            self.app.window.write_event_value(self.KEY_EVENT_LISTENING_RECONCILED, (listening_dir, group_ids, changes, fresh_snapshot))
+
+    def __schedule_listeners(self, listeners) -> tuple:
+        """
+        Listens to the directories of the given listeners (see `get_listeners`). Returns the listened directories and the 
+        missing ones, which are left to be cleared in the event loop thread. Key:group_id, Value:listening_dir
+        """
+
+        listening_dirs = []
+        missing_listeners = dict()
+        for group_id, (listening_dir, listening_filter) in listeners.items():
+            if os.path.isdir(listening_dir):
+                self.watch_registry.subscribe(listening_dir, listening_filter)
+                if listening_dir not in listening_dirs:
+                    listening_dirs.append(listening_dir)
+            else:
+                missing_listeners[group_id] = listening_dir
+        return listening_dirs, missing_listeners
 
     def __on_app_shutdown(self) -> None:
+        self.listeners_started.wait()
         self.listening_observer.stop()
         self.listening_observer.join()
 
@@ -720,12 +4892,182 @@ class HelpInterface(AppInterface):
         }
     
     def on_hyperlink_click(self, _) -> None:
-        os.startfile('https://github.com/ioan45/open-my-files')
+        self.app.launcher_backend.open_with_default('https://github.com/ioan45/open-my-files')
     
     def on_button_back(self, _) -> None:
         self.app.change_shown_interface(App.KEY_INTERFACE_MAIN)
     
 
+class StartupProfiler:
+    """
+    Records the time at which each startup phase ended. The latest runs are kept in a log file, one JSON object per line:
+    ```
+    {"date": <type_str>, "phases_ms": {<phase_name>: <type_float>, ...}}
+    ```
+    """
+
+    PHASE_GUI_MODULES_IMPORTED = 'gui_modules_imported'
+    PHASE_DATA_LOADED = 'data_loaded'
+    PHASE_FIRST_PAINT = 'first_paint'
+    PHASE_INTERFACES_STARTED = 'interfaces_started'
+    PHASE_STARTUP_FINISHED = 'startup_finished'
+
+    MAX_LOG_RECORDS = 100
+
+    def __init__(self, start_time=MODULE_LOAD_TIME) -> None:
+        self.start_time = start_time
+        # Key:phase_name, Value:milliseconds since the start time
+        self.phases_ms = dict()
+
+    def mark(self, phase_name) -> None:
+        self.phases_ms[phase_name] = round((time.perf_counter() - self.start_time) * 1000, 1)
+
+    def save(self, log_path) -> None:
+        record = json.dumps({'date': time.strftime('%Y-%m-%dT%H:%M:%S'), 'phases_ms': self.phases_ms})
+        records = []
+        if os.path.isfile(log_path):
+            with open(log_path, 'r') as f:
+                records = f.read().splitlines()
+        records = records[-(self.MAX_LOG_RECORDS - 1):] + [record]
+        os.makedirs(os.path.split(log_path)[0], exist_ok=True)
+        write_file_atomically(log_path, '\n'.join(records) + '\n')
+
+
+class EventLoopProfiler:
+    """
+    Opt-in instrumentation of the event loop, which records the latency of each event key and the handlers slower than
+    the threshold with a sample of their stack. The stats are exported to a JSON file when shown and at exit.
+    """
+
+    # The upper bounds of the histogram buckets, the last bucket holding the longer latencies.
+    HISTOGRAM_BOUNDS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+    DEFAULT_SLOW_HANDLER_THRESHOLD_MS = 100
+    MAX_SLOW_HANDLER_RECORDS = 100
+
+    def __init__(self, stats_path, slow_handler_threshold_ms=DEFAULT_SLOW_HANDLER_THRESHOLD_MS) -> None:
+        self.stats_path = stats_path
+        self.slow_handler_threshold_ms = slow_handler_threshold_ms
+        # Key:provider_name, Value:get_metrics() -> dict
+        self.metrics_providers = dict()
+        # Key:event_key, Value:[count, total_ms, max_ms, list[bucket_count]]
+        self.__events_stats = dict()
+        self.__slow_handlers = deque(maxlen=self.MAX_SLOW_HANDLER_RECORDS)
+        self.__lock = threading.Lock()
+        # The thread of the event loop, whose stack is sampled. It's the thread which creates the profiler.
+        self.__thread_id = threading.get_ident()
+        # The (event_key, handler, start_time) of the running handler, and the stack sampled while it was running.
+        self.__running_handler = None
+        self.__stack_sample = None
+        self.__handler_started = threading.Event()
+        threading.Thread(target=self.__async_sampling, daemon=True).start()
+
+    @contextmanager
+    def measuring_event(self, event_key):
+        """Records the time taken by the `with` block (e.g. handling an event) in the histogram of the event key."""
+
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.__record_event(str(event_key), (time.perf_counter() - start_time) * 1000)
+
+    def run_handler(self, event_key, handler, *arguments):
+        """Runs a handler of an event, logging it if it takes longer than the slow handler threshold."""
+
+        running_handler = (event_key, handler, time.perf_counter())
+        with self.__lock:
+            self.__running_handler = running_handler
+            self.__stack_sample = None
+        self.__handler_started.set()
+        try:
+            return handler(*arguments)
+        finally:
+            duration_ms = (time.perf_counter() - running_handler[2]) * 1000
+            with self.__lock:
+                self.__running_handler = None
+                stack_sample = self.__stack_sample
+            if duration_ms > self.slow_handler_threshold_ms:
+                self.__slow_handlers.append({
+                    'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                    'event': str(event_key),
+                    'handler': getattr(handler, '__qualname__', repr(handler)),
+                    'duration_ms': round(duration_ms, 1),
+                    'stack': stack_sample or []
+                })
+
+    def get_stats(self) -> dict:
+        with self.__lock:
+            events_stats = {
+                event_key: {
+                    'count': count,
+                    'total_ms': round(total_ms, 1),
+                    'max_ms': round(max_ms, 1),
+                    'histogram_ms': {label: bucket_count for label, bucket_count in zip(self.__get_bucket_labels(), bucket_counts) if bucket_count}
+                }
+                for event_key, (count, total_ms, max_ms, bucket_counts) in self.__events_stats.items()
+            }
+            slow_handlers = list(self.__slow_handlers)
+        metrics = dict()
+        for provider_name, get_metrics in self.metrics_providers.items():
+            metrics[provider_name] = get_metrics()
+        return {'events': events_stats, 'slow_handlers': slow_handlers, 'metrics': metrics}
+
+    def get_report(self) -> str:
+        """Returns a summary of the stats, from the event key which took the longest in total."""
+
+        stats = self.get_stats()
+        lines = [f"{'Count':>7}  {'Mean (ms)':>9}  {'Max (ms)':>9}  {'Total (ms)':>10}  Event"]
+        for event_key, event_stats in sorted(stats['events'].items(), key=lambda item: item[1]['total_ms'], reverse=True):
+            mean_ms = event_stats['total_ms'] / event_stats['count']
+            lines.append(f"{event_stats['count']:>7}  {mean_ms:>9.1f}  {event_stats['max_ms']:>9.1f}  {event_stats['total_ms']:>10.1f}  {event_key}")
+        lines.append('')
+        lines.append(f"Handlers slower than {self.slow_handler_threshold_ms} ms (the latest {len(stats['slow_handlers'])}):")
+        for slow_handler in reversed(stats['slow_handlers']):
+            lines.append(f"{slow_handler['date']}  {slow_handler['duration_ms']:.1f} ms  {slow_handler['handler']} ({slow_handler['event']})")
+            lines.extend('    ' + line for line in ''.join(slow_handler['stack'][-3:]).rstrip().splitlines())
+        for provider_name, metrics in stats['metrics'].items():
+            lines.append('')
+            lines.append(f'{provider_name}: {json.dumps(metrics)}')
+        return '\n'.join(lines)
+
+    def export(self) -> None:
+        stats_json = json.dumps(self.get_stats(), indent='\t')
+        os.makedirs(os.path.split(self.stats_path)[0], exist_ok=True)
+        write_file_atomically(self.stats_path, stats_json)
+
+    def __record_event(self, event_key, duration_ms) -> None:
+        with self.__lock:
+            event_stats = self.__events_stats.get(event_key)
+            if event_stats is None:
+                event_stats = self.__events_stats[event_key] = [0, 0.0, 0.0, [0] * (len(self.HISTOGRAM_BOUNDS_MS) + 1)]
+            event_stats[0] += 1
+            event_stats[1] += duration_ms
+            event_stats[2] = max(event_stats[2], duration_ms)
+            event_stats[3][bisect_left(self.HISTOGRAM_BOUNDS_MS, duration_ms)] += 1
+
+    def __get_bucket_labels(self) -> list:
+        return [f'<={bound}' for bound in self.HISTOGRAM_BOUNDS_MS] + [f'>{self.HISTOGRAM_BOUNDS_MS[-1]}']
+
+    def __async_sampling(self) -> None:
+        import traceback
+        while True:
+            self.__handler_started.wait()
+            self.__handler_started.clear()
+            with self.__lock:
+                running_handler = self.__running_handler
+            if running_handler is None:
+                continue
+            remaining_s = running_handler[2] + self.slow_handler_threshold_ms / 1000 - time.perf_counter()
+            if remaining_s > 0:
+                time.sleep(remaining_s)
+            with self.__lock:
+                # The handler may have returned meanwhile, and another one may have started.
+                if self.__running_handler is not running_handler:
+                    continue
+                frame = sys._current_frames().get(self.__thread_id)
+                self.__stack_sample = traceback.format_stack(frame) if frame is not None else None
+
+
 class App:
     """
     The core part of the application. 
@@ -738,13 +5080,19 @@ class App:
     KEY_INTERFACE_MAIN = '-MAIN_INTERFACE-'
     KEY_INTERFACE_GROUP_EDIT = '-GROUP_EDIT_INTERFACE-'
     KEY_INTERFACE_HELP = '-HELP_INTERFACE-'
+    KEY_EVENT_INSTANCE_REQUEST = '-INSTANCE_REQUEST_EVENT-'
+    KEY_EVENT_ENTRIES_CHECKED = '-ENTRIES_CHECKED_EVENT-'
+    KEY_EVENT_SEARCH_INDEX_READY = '-SEARCH_INDEX_READY_EVENT-'
+    KEY_EVENT_SHOW_EVENT_LOOP_STATS = '-SHOW_EVENT_LOOP_STATS_EVENT-'
     
-    def __init__(self) -> None:
-        groups_data_path = os.path.join(os.getenv('LOCALAPPDATA'), 'OpenMyFiles', 'groups.json')
-        settings_data_path = os.path.join(os.getenv('LOCALAPPDATA'), 'OpenMyFiles', 'settings.json')
-        self.app_data = AppData(groups_data_path, settings_data_path)
+    def __init__(self, instance_server, startup_profiler=None) -> None:
+        self.startup_profiler = startup_profiler if startup_profiler is not None else StartupProfiler()
+        # Started by `main` before the application, so that it owns the data files. The requests are handled once the window exists.
+        self.instance_server = instance_server
+        self.app_data = create_app_data()
         self.app_data.load_groups_data()
         self.app_data.load_settings()
+        self.startup_profiler.mark(StartupProfiler.PHASE_DATA_LOADED)
 
         sg.theme('DarkAmber')
 
@@ -754,13 +5102,31 @@ class App:
             App.KEY_INTERFACE_HELP: HelpInterface()
         }
         self.__current_interface_key = App.KEY_INTERFACE_MAIN
-        self.default_browser_path = get_default_browser_path()
+        self.launcher_backend = create_launcher_backend()
+        self.launch_planner = LaunchPlanner(self.launcher_backend)
+        # It can be replaced (before the interfaces start) to open the web pages with another browser.
+        self.browser_launcher = BrowserLauncher(resolve_browser_path=self.launch_planner.get_browser_path)
+        settings = self.app_data.settings
+        # The states of the file entries are checked in the background, and the interfaces are updated in the event loop thread.
+        self.health_checker = EntryHealthChecker(
+            lambda: self.window.write_event_value(self.KEY_EVENT_ENTRIES_CHECKED, None),
+            settings.get(AppData.KEY_SETTING_HEALTH_CHECK_MAX_WORKERS, EntryHealthChecker.DEFAULT_MAX_WORKERS),
+            settings.get(AppData.KEY_SETTING_HEALTH_CHECK_TIMEOUT_S, EntryHealthChecker.DEFAULT_TIMEOUT_S),
+            settings.get(AppData.KEY_SETTING_HEALTH_CHECK_TTL_S, EntryHealthChecker.DEFAULT_TTL_S))
+        self.launch_telemetry = create_launch_telemetry()
+        # The event loop is only instrumented when enabled in the settings, so that it costs nothing otherwise.
+        self.event_loop_profiler = None
+        if settings.get(AppData.KEY_SETTING_EVENT_LOOP_PROFILING, False):
+            self.event_loop_profiler = EventLoopProfiler(
+                os.path.join(get_data_dir_path(), 'event_loop_stats.json'),
+                settings.get(AppData.KEY_SETTING_SLOW_HANDLER_THRESHOLD_MS, EventLoopProfiler.DEFAULT_SLOW_HANDLER_THRESHOLD_MS))
         self.__app_running = False
 
+        # The columns of the other interfaces are empty until their layouts are added after the first paint.
         win_layout = [[sg.Column(
-                        layout=interface.win_layout, 
+                        layout=interface.win_layout if interface_key == self.__current_interface_key else [[]], 
                         key=interface_key, 
-                        visible=False if interface_key != self.__current_interface_key else True, 
+                        visible=interface_key == self.__current_interface_key, 
                         expand_x=True, 
                         expand_y=True)
                         for interface_key, interface in self.__interfaces.items()
@@ -773,24 +5139,46 @@ class App:
         self.win_interface_events = self.__interfaces[self.__current_interface_key].win_events 
         # List of actions which will be performed on app shutdown. list[action()]
         self.on_shutdown_actions = []
+        # Commands which can be requested by other processes (see `InstanceServer`). Key:command, Value:action(request) -> response
+        self.instance_commands = {InstanceServer.COMMAND_SHOW_WINDOW: self.__on_show_window_request}
+        self.win_global_events[self.KEY_EVENT_INSTANCE_REQUEST] = [self.__on_instance_request_event]
+        self.win_global_events[self.KEY_EVENT_SHOW_EVENT_LOOP_STATS] = [self.__on_show_event_loop_stats]
+        self.window.bind('<Control-D>', self.KEY_EVENT_SHOW_EVENT_LOOP_STATS)
+        if self.event_loop_profiler is not None:
+            self.on_shutdown_actions.append(self.event_loop_profiler.export)
 
-        for interface in self.__interfaces.values():
-            interface.app = self
-            interface.start()
+        first_interface = self.__interfaces[self.__current_interface_key]
+        first_interface.app = self
+        first_interface.start()
         self.window.refresh()
+        self.startup_profiler.mark(StartupProfiler.PHASE_FIRST_PAINT)
+
+        for interface_key, interface in self.__interfaces.items():
+            if interface is not first_interface:
+                self.window.extend_layout(self.window[interface_key], interface.win_layout)
+                # The added layout is wrapped in a new column (the last window row), which must fill the interface column.
+                self.window.Rows[-1][0].expand(expand_x=True, expand_y=True)
+                interface.app = self
+                interface.start()
+        self.startup_profiler.mark(StartupProfiler.PHASE_INTERFACES_STARTED)
+
+        self.instance_server.on_request = self.__on_instance_request
+        self.on_shutdown_actions.append(self.instance_server.stop)
+        threading.Thread(target=self.__async_resolving_browser_path, daemon=True).start()
+        self.app_data.start_search_indexing(lambda: self.window.write_event_value(self.KEY_EVENT_SEARCH_INDEX_READY, None))
+        self.startup_profiler.mark(StartupProfiler.PHASE_STARTUP_FINISHED)
+        # The log is written while the event loop runs, so the startup doesn't wait for the disk.
+        threading.Thread(target=self.startup_profiler.save, args=(os.path.join(get_data_dir_path(), 'startup.log'),)).start()
 
     def run(self) -> None:
         self.__app_running = True
         while self.__app_running:
             event, values = self.window.read()
-            if event in self.win_global_events:
-                actions = copy(self.win_global_events[event])
-                for action in actions:
-                    action(values)
-            if event in self.win_interface_events:
-                actions = copy(self.win_interface_events[event])
-                for action in actions:
-                    action(values)
+            if self.event_loop_profiler is None:
+                self.__handle_event(event, values)
+            else:
+                with self.event_loop_profiler.measuring_event(event):
+                    self.__handle_event(event, values)
             if event == sg.WIN_CLOSE_ATTEMPTED_EVENT and event not in self.win_global_events and event not in self.win_interface_events:
                 self.signal_shutdown()
         self.__shutdown()
@@ -799,6 +5187,13 @@ class App:
         self.__app_running = False
 
     def change_shown_interface(self, new_interface_key: str) -> None:
+        if self.event_loop_profiler is None:
+            self.__change_shown_interface(new_interface_key)
+        else:
+            with self.event_loop_profiler.measuring_event(f'show {new_interface_key}'):
+                self.__change_shown_interface(new_interface_key)
+
+    def __change_shown_interface(self, new_interface_key: str) -> None:
         self.window[self.__current_interface_key].update(visible=False)
         self.window[new_interface_key].update(visible=True)
         self.win_interface_events = self.__interfaces[new_interface_key].win_events
@@ -809,29 +5204,295 @@ class App:
         self.window.move_to_center()
         self.window.reappear()
 
+    def __handle_event(self, event, values) -> None:
+        for win_events in (self.win_global_events, self.win_interface_events):
+            if event in win_events:
+                actions = copy(win_events[event])
+                for action in actions:
+                    if self.event_loop_profiler is None:
+                        action(values)
+                    else:
+                        self.event_loop_profiler.run_handler(event, action, values)
+
     def get_interface(self, interface_key: str) -> AppInterface:
         return self.__interfaces[interface_key]
     
     def get_current_interface_key(self) -> str:
         return self.__current_interface_key
     
+    def __async_resolving_browser_path(self) -> None:
+        # The default browser is looked up early so that opening the first web pages doesn't wait for it. 
+        try:
+            self.browser_launcher.resolve_browser_path()
+        except OSError:
+            # It will be tried again when the web pages are opened.
+            pass
+
+    def __on_instance_request(self, request) -> dict:
+        """Runs a request of another process on the event loop thread and returns its response."""
+
+        action = self.instance_commands.get(request.get('command'))
+        if action is None:
+            return {'ok': False, 'error': f"Unknown command: {request.get('command')}"}
+        response_queue = queue.SimpleQueue()
+        self.window.write_event_value(self.KEY_EVENT_INSTANCE_REQUEST, (action, request, response_queue))
+        try:
+            # The event loop may be blocked, e.g. by a popup window.
+            return response_queue.get(timeout=InstanceClient.DEFAULT_TIMEOUT_S)
+        except queue.Empty:
+            return {'ok': False, 'error': 'The application is busy.'}
+
+    def __on_instance_request_event(self, values) -> None:
+        action, request, response_queue = values[self.KEY_EVENT_INSTANCE_REQUEST]
+        try:
+            response = action(request)
+        except Exception as error:
+            response = {'ok': False, 'error': str(error)}
+        response_queue.put(response)
+
+    def __on_show_window_request(self, _) -> dict:
+        self.window.normal()
+        self.window.bring_to_front()
+        return {'ok': True, 'message': 'The application window is shown.'}
+
+    def __on_show_event_loop_stats(self, _) -> None:
+        if self.event_loop_profiler is None:
+            sg.popup(f'The event loop profiling is disabled. It can be enabled with "{AppData.KEY_SETTING_EVENT_LOOP_PROFILING}": true in settings.json.', title='Event Loop Stats')
+            return
+        self.event_loop_profiler.export()
+        sg.popup_scrolled(
+            self.event_loop_profiler.get_report(), f'Exported to {self.event_loop_profiler.stats_path}',
+            title='Event Loop Stats', 
+            size=(120, 30), 
+            font=('Courier New', 10, 'normal'))
+
     def __shutdown(self) -> None:
         for action in self.on_shutdown_actions:
             action()
         self.window.close()
+        self.app_data.wait_for_compaction()
 
 
-def get_default_browser_path() -> str:
-    """Returns the path to the default browser which is set in the Windows settings."""
-    
-    with winreg.OpenKey(winreg.HKEY_CURRENT_USER, "Software\\Microsoft\\Windows\\CurrentVersion\\Explorer\\FileExts\\.html\\UserChoice") as id_key:
-        browser_id = winreg.QueryValueEx(id_key, 'ProgId')[0]
-    with winreg.OpenKey(winreg.HKEY_CLASSES_ROOT, f"{browser_id}\\shell\\open\\command") as path_key:
-        browser_path = winreg.QueryValueEx(path_key, '')[0]
-    return browser_path.split('"')[1]
+# The startup time target of the command line commands, checked by the benchmark command.
+STARTUP_TIME_TARGET_MS = 150
+
+def create_launcher_backend() -> LauncherBackend:
+    """
+    Returns the launcher backend for the current platform. The backend can also be chosen with the `OMF_LAUNCHER_BACKEND` 
+    environment variable (`windows`, `linux` or `fake`).
+    """
+
+    backend_name = os.getenv('OMF_LAUNCHER_BACKEND') or ('windows' if os.name == 'nt' else 'linux')
+    backends = {'windows': WindowsLauncherBackend, 'linux': LinuxLauncherBackend, 'fake': FakeLauncherBackend}
+    if backend_name not in backends:
+        raise ValueError(f'Unknown launcher backend: {backend_name}')
+    return backends[backend_name]()
+
+def import_gui_modules() -> None:
+    global sg, Observer
+    import PySimpleGUI as sg
+    from watchdog.observers import Observer
+
+def get_data_dir_path() -> str:
+    """Returns the directory of the data files: in the local application data on Windows, and in the XDG data home elsewhere."""
+
+    local_app_data = os.getenv('LOCALAPPDATA')
+    if local_app_data:
+        return os.path.join(local_app_data, 'OpenMyFiles')
+    data_home = os.getenv('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+    return os.path.join(data_home, 'OpenMyFiles')
+
+def get_instance_path() -> str:
+    return os.path.join(get_data_dir_path(), 'instance.json')
+
+def create_app_data() -> AppData:
+    """Returns the application data manager for the data files of the current user, without loading them."""
+
+    data_dir_path = get_data_dir_path()
+    return AppData(os.path.join(data_dir_path, 'groups.json'), os.path.join(data_dir_path, 'settings.json'))
+
+def create_launch_telemetry() -> LaunchTelemetry:
+    return LaunchTelemetry(os.path.join(get_data_dir_path(), 'launch_stats.json'))
+
+def print_instance_response(response) -> int:
+    if response.get('ok'):
+        print(response.get('message', ''))
+        return 0
+    print(response.get('error', 'The request failed.'), file=sys.stderr)
+    return 1
+
+def run_list_command(args) -> int:
+    """Prints the saved groups, one per line, with their number of entries."""
+
+    for group in create_app_data().read_saved_groups():
+        print(f"{group.name}\t{group.get_entries_count()}")
+    return 0
+
+def run_open_command(args) -> int:
+    """
+    Opens a group through the running instance of the application if there is one. Otherwise, it opens the saved group the 
+    same way as the "Open Group" button does, without starting the GUI. Only the opened group is loaded and the default browser 
+    is looked up only when web pages are opened. Returns 0 if all entries were launched.
+    """
+
+    try:
+        return print_instance_response(InstanceClient(get_instance_path()).send(InstanceServer.COMMAND_OPEN_GROUP, group_name=args.group_name))
+    except ConnectionError:
+        pass
+
+    app_data = create_app_data()
+    group = app_data.find_saved_group(args.group_name)
+    if group is None:
+        print(f'There is no group named "{args.group_name}".', file=sys.stderr)
+        return 2
+    app_data.load_settings()
+    settings = app_data.settings
+
+    launch_planner = LaunchPlanner(create_launcher_backend())
+    browser_launcher = BrowserLauncher(resolve_browser_path=launch_planner.get_browser_path)
+    group_opener = GroupOpener(
+        browser_launcher,
+        launch_planner,
+        settings.get(AppData.KEY_SETTING_OPENING_MAX_WORKERS, GroupOpener.DEFAULT_MAX_WORKERS),
+        settings.get(AppData.KEY_SETTING_OPENING_ENTRY_TIMEOUT_S, GroupOpener.DEFAULT_ENTRY_TIMEOUT_S),
+        launch_telemetry=create_launch_telemetry(),
+        slowest_first=settings.get(AppData.KEY_SETTING_LAUNCH_ORDER, AppData.LAUNCH_ORDER_STORED) == AppData.LAUNCH_ORDER_SLOWEST_FIRST)
+    opening = group_opener.open(group.id, group.name, list(group.entries))
+    try:
+        opening.wait()
+    except KeyboardInterrupt:
+        opening.cancel()
+        opening.wait()
+    print(f'"{group.name}" group: {opening.get_progress_message()}.')
+    progress = opening.get_progress()
+    return 0 if progress[GroupOpening.RESULT_LAUNCHED] == progress['total'] else 1
+
+def run_stats_command(args) -> int:
+    """Prints the launch stats of the files of a saved group, from the slowest one."""
+
+    group = create_app_data().find_saved_group(args.group_name)
+    if group is None:
+        print(f'There is no group named "{args.group_name}".', file=sys.stderr)
+        return 2
+    print(create_launch_telemetry().get_report(group.entries))
+    return 0
+
+def run_reload_command(args) -> int:
+    """Makes the running instance of the application load again the saved data (e.g. after the data files were replaced)."""
+
+    try:
+        return print_instance_response(InstanceClient(get_instance_path()).send(InstanceServer.COMMAND_RELOAD))
+    except ConnectionError:
+        print('The application is not running.', file=sys.stderr)
+        return 2
+
+def run_export_command(args) -> int:
+    """Writes the saved groups to a file in the `groups.json` format, whatever storage layout they are saved with."""
+
+    groups_json = create_app_data().read_saved_groups_json()
+    with open(args.path, 'w') as f:
+        json.dump(groups_json, f, indent='\t')
+    print(f'{len(groups_json)} groups have been exported to "{args.path}".')
+    return 0
+
+def run_import_command(args) -> int:
+    """
+    Adds the groups from a file in the `groups.json` format to the saved groups (or replaces them with those), and saves 
+    them with the storage layout from the settings. The application must not be running, since it would overwrite them.
+    """
+
+    if InstanceClient(get_instance_path()).is_instance_running():
+        print('The application is running. Close it before importing groups.', file=sys.stderr)
+        return 2
+    try:
+        with open(args.path, 'r') as f:
+            groups = [Group.from_json(group_json) for group_json in json.load(f)]
+    except (OSError, ValueError, KeyError, TypeError) as error:
+        print(f'"{args.path}" is not a valid groups file ({error}).', file=sys.stderr)
+        return 2
+    app_data = create_app_data()
+    app_data.load_settings()
+    app_data.load_groups_data()
+    imported_entries_count = app_data.import_groups(groups, args.replace)
+    app_data.save_group_data()
+    app_data.wait_for_compaction()
+    print(f'{len(groups)} groups with {imported_entries_count} entries have been imported from "{args.path}".')
+    return 0
+
+def run_benchmark_command(args) -> int:
+    """
+    Measures the startup time of the command line commands by running the `list` command in new processes, and checks it
+    against the target. The `list` command goes through the same startup as the `open` command but doesn't launch anything.
+    """
+
+    import subprocess
+    durations_ms = []
+    gui_modules_imported = False
+    for _ in range(args.runs):
+        start_time = time.perf_counter()
+        # Python reports every imported module on stderr with -X importtime.
+        process = subprocess.run([sys.executable, '-X', 'importtime', os.path.abspath(__file__), 'list'], capture_output=True, text=True)
+        durations_ms.append((time.perf_counter() - start_time) * 1000)
+        if process.returncode != 0:
+            print(process.stderr, file=sys.stderr)
+            return 2
+        imported_modules = [line.rsplit('|', 1)[-1].strip() for line in process.stderr.splitlines()]
+        gui_modules_imported |= any(module.split('.')[0] in ('PySimpleGUI', 'watchdog') for module in imported_modules)
+    durations_ms.sort()
+    median_ms = durations_ms[len(durations_ms) // 2]
+    print(f'Startup time over {args.runs} runs: median {median_ms:.1f} ms, min {durations_ms[0]:.1f} ms, max {durations_ms[-1]:.1f} ms (target {args.target_ms} ms).')
+    if gui_modules_imported:
+        print('The GUI modules were imported by the command line commands.')
+    return 0 if median_ms <= args.target_ms and not gui_modules_imported else 1
+
+def create_argument_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='omf', description='Open My Files. Starts the GUI when no command is given.')
+    subparsers = parser.add_subparsers(dest='command')
+    list_parser = subparsers.add_parser('list', help='list the saved groups and their number of entries')
+    list_parser.set_defaults(handler=run_list_command)
+    open_parser = subparsers.add_parser('open', help='open a saved group without starting the GUI')
+    open_parser.add_argument('group_name', help='the name of the group to open')
+    open_parser.set_defaults(handler=run_open_command)
+    stats_parser = subparsers.add_parser('stats', help='show the launch times of the files of a saved group')
+    stats_parser.add_argument('group_name', help='the name of the group')
+    stats_parser.set_defaults(handler=run_stats_command)
+    reload_parser = subparsers.add_parser('reload', help='make the running application load again the saved data')
+    reload_parser.set_defaults(handler=run_reload_command)
+    export_parser = subparsers.add_parser('export', help='write the saved groups to a file in the groups.json format')
+    export_parser.add_argument('path', help='the path of the file to write')
+    export_parser.set_defaults(handler=run_export_command)
+    import_parser = subparsers.add_parser('import', help='add the groups from a file in the groups.json format to the saved groups')
+    import_parser.add_argument('path', help='the path of the file to read')
+    import_parser.add_argument('--replace', action='store_true', help='replace the saved groups instead of adding to them')
+    import_parser.set_defaults(handler=run_import_command)
+    benchmark_parser = subparsers.add_parser('benchmark', help='measure the startup time of the command line commands')
+    benchmark_parser.add_argument('--runs', type=int, default=10, help='the number of measured runs (default: 10)')
+    benchmark_parser.add_argument('--target-ms', type=float, default=STARTUP_TIME_TARGET_MS, help=f'the target median startup time (default: {STARTUP_TIME_TARGET_MS})')
+    benchmark_parser.set_defaults(handler=run_benchmark_command)
+    return parser
 
 def main():
-    app = App()
+    args = create_argument_parser().parse_args()
+    if args.command is not None:
+        sys.exit(args.handler(args))
+    # Only one instance of the application runs, so starting it again just shows the window of the running one.
+    try:
+        InstanceClient(get_instance_path()).send(InstanceServer.COMMAND_SHOW_WINDOW)
+        return
+    except ConnectionError:
+        pass
+    # Another instance may have started since, and only the instance which starts its server owns the data files.
+    instance_server = InstanceServer(get_instance_path(), lambda _: {'ok': False, 'error': 'The application is starting.'})
+    if not instance_server.start():
+        try:
+            InstanceClient(get_instance_path()).send(InstanceServer.COMMAND_SHOW_WINDOW)
+        except ConnectionError:
+            pass
+        return
+    import_gui_modules()
+    startup_profiler = StartupProfiler()
+    startup_profiler.mark(StartupProfiler.PHASE_GUI_MODULES_IMPORTED)
+    app = App(instance_server, startup_profiler)
     app.run()
 
 if __name__ == "__main__":
@@ -0,0 +1,313 @@
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from omf import AppData, ListeningFilter
+
+
+class AppDataTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.app_data = self.create_app_data()
+
+    def tearDown(self) -> None:
+        self.app_data.wait_for_compaction()
+        self.temp_dir.cleanup()
+
+    def create_app_data(self, layout=None) -> AppData:
+        app_data = AppData(os.path.join(self.temp_dir.name, 'groups.json'), os.path.join(self.temp_dir.name, 'settings.json'))
+        app_data.load_settings()
+        if layout is not None:
+            app_data.settings[AppData.KEY_SETTING_STORAGE_LAYOUT] = layout
+            app_data.save_settings()
+        app_data.load_groups_data()
+        return app_data
+
+    def reload(self) -> AppData:
+        self.app_data.wait_for_compaction()
+        self.app_data = self.create_app_data(self.app_data.settings.get(AppData.KEY_SETTING_STORAGE_LAYOUT))
+        return self.app_data
+
+    def get_saved_groups(self) -> list:
+        return [(group.name, [entry.path for entry in group.entries]) for group in self.reload().groups_data.values()]
+
+
+class SaveFailureTest(AppDataTest):
+
+    def test_a_failed_journal_write_is_saved_by_the_next_save(self):
+        group = self.app_data.add_group('Work')
+        self.app_data.add_entries(group.id, [('/docs/a.txt', AppData.ENTRY_OTHER_FILE)])
+        # The journal can't be opened for appending while a directory is in its place.
+        os.makedirs(self.app_data.journal_path)
+        with self.assertRaises(OSError):
+            self.app_data.save_group_data()
+        self.assertTrue(self.app_data.has_unsaved_changes())
+        os.rmdir(self.app_data.journal_path)
+        self.app_data.save_group_data()
+        self.assertFalse(self.app_data.has_unsaved_changes())
+        self.assertEqual(self.get_saved_groups(), [('Work', ['/docs/a.txt'])])
+
+    def test_the_changes_made_after_a_failed_save_are_saved_too(self):
+        group = self.app_data.add_group('Work')
+        os.makedirs(self.app_data.journal_path)
+        with self.assertRaises(OSError):
+            self.app_data.save_group_data()
+        self.app_data.add_entries(group.id, [('/docs/a.txt', AppData.ENTRY_OTHER_FILE)])
+        self.app_data.add_group('Other')
+        os.rmdir(self.app_data.journal_path)
+        self.app_data.save_group_data()
+        self.assertEqual(self.get_saved_groups(), [('Work', ['/docs/a.txt']), ('Other', [])])
+
+    def test_undoing_to_the_save_point_after_a_failed_save(self):
+        self.app_data.add_group('Work')
+        self.app_data.save_group_data()
+        self.app_data.add_group('Other')
+        os.replace(self.app_data.journal_path, self.app_data.journal_path + '.saved')
+        os.makedirs(self.app_data.journal_path)
+        with self.assertRaises(OSError):
+            self.app_data.save_group_data()
+        # The data on disk is still at the previous save, so undoing the unsaved change gets back to it.
+        self.app_data.undo()
+        self.assertFalse(self.app_data.has_unsaved_changes())
+        self.app_data.redo()
+        self.assertTrue(self.app_data.has_unsaved_changes())
+
+    def test_a_failed_shards_save_is_saved_by_the_next_save(self):
+        self.app_data = self.create_app_data(AppData.STORAGE_LAYOUT_SHARDED)
+        self.app_data.add_group('Work')
+        self.app_data.save_group_data()
+        group = self.app_data.add_group('Other')
+        self.app_data.add_entries(group.id, [('/docs/a.txt', AppData.ENTRY_OTHER_FILE)])
+        # The index can't be replaced while a directory is in its place.
+        os.replace(self.app_data.shards_index_path, self.app_data.shards_index_path + '.saved')
+        os.makedirs(self.app_data.shards_index_path)
+        with self.assertRaises(OSError):
+            self.app_data.save_group_data()
+        self.assertTrue(self.app_data.has_unsaved_changes())
+        os.rmdir(self.app_data.shards_index_path)
+        self.app_data.save_group_data()
+        self.assertFalse(self.app_data.has_unsaved_changes())
+        self.assertEqual(self.get_saved_groups(), [('Work', []), ('Other', ['/docs/a.txt'])])
+
+    def test_a_failed_migration_is_done_by_the_next_save(self):
+        group = self.app_data.add_group('Work')
+        self.app_data.add_entries(group.id, [('/docs/a.txt', AppData.ENTRY_OTHER_FILE)])
+        self.app_data.save_group_data()
+        self.app_data.settings[AppData.KEY_SETTING_STORAGE_LAYOUT] = AppData.STORAGE_LAYOUT_SHARDED
+        os.makedirs(self.app_data.shards_index_path)
+        with self.assertRaises(OSError):
+            self.app_data.save_group_data()
+        os.rmdir(self.app_data.shards_index_path)
+        self.app_data.save_group_data()
+        self.assertTrue(os.path.isfile(self.app_data.shards_index_path))
+        self.assertFalse(os.path.isfile(self.app_data.groups_path))
+        self.assertEqual(self.get_saved_groups(), [('Work', ['/docs/a.txt'])])
+
+    def test_a_failed_database_transaction_is_saved_by_the_next_save(self):
+        self.app_data = self.create_app_data(AppData.STORAGE_LAYOUT_SQLITE)
+        self.app_data.add_group('Work')
+        self.app_data.save_group_data()
+        group = self.app_data.add_group('Other')
+        self.app_data.add_entries(group.id, [('/docs/a.txt', AppData.ENTRY_OTHER_FILE)])
+        with sqlite3.connect(self.app_data.database_path) as connection:
+            connection.execute("CREATE TRIGGER failing_insert BEFORE INSERT ON groups BEGIN SELECT RAISE(ABORT, 'disk full'); END")
+        with self.assertRaises(sqlite3.DatabaseError):
+            self.app_data.save_group_data()
+        self.assertTrue(self.app_data.has_unsaved_changes())
+        with sqlite3.connect(self.app_data.database_path) as connection:
+            connection.execute('DROP TRIGGER failing_insert')
+        self.app_data.save_group_data()
+        self.assertFalse(self.app_data.has_unsaved_changes())
+        self.assertEqual(self.get_saved_groups(), [('Work', []), ('Other', ['/docs/a.txt'])])
+
+
+class JournalTest(AppDataTest):
+
+    def test_the_saves_are_replayed_from_the_journal(self):
+        work = self.app_data.add_group('Work')
+        other = self.app_data.add_group('Other')
+        self.app_data.add_entries(work.id, [('/docs/a.txt', AppData.ENTRY_OTHER_FILE)])
+        self.app_data.save_group_data()
+        self.app_data.rename_group(work.id, 'Job')
+        self.app_data.delete_groups([other.id])
+        self.app_data.save_group_data()
+        with open(self.app_data.journal_path, 'rb') as f:
+            self.assertEqual(len(f.read().splitlines()), 2)
+        self.assertEqual(self.get_saved_groups(), [('Job', ['/docs/a.txt'])])
+
+    def test_a_torn_record_is_dropped(self):
+        group = self.app_data.add_group('Work')
+        self.app_data.save_group_data()
+        journal_size = os.path.getsize(self.app_data.journal_path)
+        # A record interrupted while it was written.
+        with open(self.app_data.journal_path, 'ab') as f:
+            f.write(b'{"set":[{"group_id":')
+        self.assertEqual(self.get_saved_groups(), [('Work', [])])
+        self.assertEqual(os.path.getsize(self.app_data.journal_path), journal_size)
+        self.app_data.add_entries(group.id, [('/docs/a.txt', AppData.ENTRY_OTHER_FILE)])
+        self.app_data.save_group_data()
+        self.assertEqual(self.get_saved_groups(), [('Work', ['/docs/a.txt'])])
+
+    def test_the_journal_is_compacted_into_the_snapshot(self):
+        group = self.app_data.add_group('Work')
+        self.app_data.add_entries(group.id, [('/docs/a.txt', AppData.ENTRY_OTHER_FILE)])
+        with mock.patch.object(AppData, 'JOURNAL_MIN_COMPACTION_SIZE', 0):
+            self.app_data.save_group_data()
+            self.app_data.wait_for_compaction()
+        with open(self.app_data.groups_path, 'r') as f:
+            self.assertEqual([group_json[AppData.KEY_GROUP_NAME] for group_json in json.load(f)], ['Work'])
+        self.assertFalse(os.path.isfile(self.app_data.journal_path) and os.path.getsize(self.app_data.journal_path))
+        self.app_data.add_group('Other')
+        self.app_data.save_group_data()
+        self.assertEqual(self.get_saved_groups(), [('Work', ['/docs/a.txt']), ('Other', [])])
+
+
+class CopyOnWriteTest(AppDataTest):
+
+    def test_only_the_changed_groups_are_copied(self):
+        work = self.app_data.add_group('Work')
+        other = self.app_data.add_group('Other')
+        self.app_data.save_group_data()
+        self.app_data.add_entries(work.id, [('/docs/a.txt', AppData.ENTRY_OTHER_FILE)])
+        self.assertIsNot(self.app_data.groups_data[work.id], work)
+        self.assertIs(self.app_data.groups_data[other.id], other)
+        # The saved version of the changed group is left as it was.
+        self.assertEqual(list(work.entries), [])
+
+    def test_reverting_restores_the_saved_groups(self):
+        work = self.app_data.add_group('Work')
+        self.app_data.save_group_data()
+        self.app_data.add_entries(work.id, [('/docs/a.txt', AppData.ENTRY_OTHER_FILE)])
+        self.app_data.delete_groups([work.id])
+        self.app_data.add_group('Other')
+        self.app_data.revert_changes()
+        self.assertEqual(list(self.app_data.groups_data.values()), [work])
+        self.assertFalse(self.app_data.has_unsaved_changes())
+        self.assertEqual(self.app_data.find_entry_id(work.id, '/docs/a.txt'), None)
+
+
+class StorageLayoutTest(AppDataTest):
+
+    def check_round_trip(self, layout) -> None:
+        self.app_data = self.create_app_data(layout)
+        work = self.app_data.add_group('Work')
+        other = self.app_data.add_group('Other')
+        self.app_data.add_entries(work.id, [('/docs/a.txt', AppData.ENTRY_OTHER_FILE), ('https://example.com', AppData.ENTRY_WEB_PAGE)])
+        self.app_data.change_entries_details(work.id, [0], 'Notes')
+        self.app_data.change_listening_dir(other.id, '/downloads', ListeningFilter(['*.pdf'], [], True))
+        self.app_data.save_group_data()
+        app_data = self.reload()
+        # Only the groups are read, the entries are read when first needed.
+        self.assertFalse(any(group.is_loaded() for group in app_data.groups_data.values()))
+        self.assertEqual([group.get_entries_count() for group in app_data.groups_data.values()], [2, 0])
+        work, other = app_data.groups_data.values()
+        self.assertEqual([(entry.id, entry.path, entry.type, entry.details) for entry in work.entries],
+                         [(0, '/docs/a.txt', AppData.ENTRY_OTHER_FILE, 'Notes'), (1, 'https://example.com', AppData.ENTRY_WEB_PAGE, '')])
+        self.assertEqual((other.listening_dir, other.listening_filter.include_patterns, other.listening_filter.recursive), ('/downloads', ('*.pdf',), True))
+        app_data.delete_entries(work.id, [0])
+        app_data.rename_group(other.id, 'Downloads')
+        app_data.save_group_data()
+        self.assertEqual(self.get_saved_groups(), [('Work', ['https://example.com']), ('Downloads', [])])
+
+    def test_sharded_round_trip(self):
+        self.check_round_trip(AppData.STORAGE_LAYOUT_SHARDED)
+
+    def test_sqlite_round_trip(self):
+        self.check_round_trip(AppData.STORAGE_LAYOUT_SQLITE)
+
+    def test_the_groups_are_migrated_between_layouts(self):
+        group = self.app_data.add_group('Work')
+        self.app_data.add_entries(group.id, [('/docs/a.txt', AppData.ENTRY_OTHER_FILE)])
+        self.app_data.save_group_data()
+        for layout in (AppData.STORAGE_LAYOUT_SHARDED, AppData.STORAGE_LAYOUT_SQLITE, AppData.STORAGE_LAYOUT_SINGLE_FILE):
+            self.app_data.settings[AppData.KEY_SETTING_STORAGE_LAYOUT] = layout
+            self.app_data.save_settings()
+            self.app_data.save_group_data()
+            self.assertEqual(self.get_saved_groups(), [('Work', ['/docs/a.txt'])])
+
+
+class StableIdsTest(AppDataTest):
+
+    def test_the_ids_do_not_change_when_others_are_deleted(self):
+        groups = [self.app_data.add_group(name) for name in ('A', 'B', 'C')]
+        self.app_data.add_entries(groups[2].id, [(f'/docs/{name}', AppData.ENTRY_OTHER_FILE) for name in ('a', 'b', 'c')])
+        self.app_data.delete_groups([groups[1].id])
+        self.app_data.delete_entries(groups[2].id, [1])
+        self.assertEqual(list(self.app_data.groups_data), [0, 2])
+        self.assertEqual(self.app_data.find_entry_id(groups[2].id, '/docs/c'), 2)
+        self.app_data.save_group_data()
+        app_data = self.reload()
+        self.assertEqual(list(app_data.groups_data), [0, 2])
+        self.assertEqual(list(app_data.groups_data[2].entries_by_id), [0, 2])
+
+    def test_the_new_ids_follow_the_greatest_one(self):
+        groups = [self.app_data.add_group(name) for name in ('A', 'B')]
+        self.app_data.add_entries(groups[1].id, [('/docs/a', AppData.ENTRY_OTHER_FILE), ('/docs/b', AppData.ENTRY_OTHER_FILE)])
+        self.app_data.delete_entries(groups[1].id, [0])
+        self.app_data.delete_groups([groups[0].id])
+        self.app_data.save_group_data()
+        app_data = self.reload()
+        self.assertEqual(app_data.add_group('C').id, 2)
+        app_data.add_entries(1, [('/docs/c', AppData.ENTRY_OTHER_FILE)])
+        self.assertEqual(app_data.find_entry_id(1, '/docs/c'), 2)
+
+
+class UndoRedoTest(AppDataTest):
+
+    def get_groups(self) -> list:
+        return [(group.name, [entry.path for entry in group.entries]) for group in self.app_data.groups_data.values()]
+
+    def test_the_operations_are_undone_and_redone_in_order(self):
+        group = self.app_data.add_group('Work')
+        self.app_data.add_entries(group.id, [('/docs/a.txt', AppData.ENTRY_OTHER_FILE)])
+        self.app_data.rename_group(group.id, 'Job')
+        self.assertEqual(self.app_data.undo().name, 'Rename Group')
+        self.assertEqual(self.get_groups(), [('Work', ['/docs/a.txt'])])
+        self.app_data.undo()
+        self.assertEqual(self.get_groups(), [('Work', [])])
+        self.app_data.undo()
+        self.assertEqual(self.get_groups(), [])
+        self.assertIsNone(self.app_data.undo())
+        self.app_data.redo()
+        self.app_data.redo()
+        self.assertEqual(self.get_groups(), [('Work', ['/docs/a.txt'])])
+        # A new operation drops the undone ones.
+        self.app_data.delete_groups([group.id])
+        self.assertIsNone(self.app_data.redo())
+
+    def test_undoing_and_redoing_to_the_save_point(self):
+        group = self.app_data.add_group('Work')
+        self.app_data.save_group_data()
+        self.app_data.add_entries(group.id, [('/docs/a.txt', AppData.ENTRY_OTHER_FILE)])
+        self.app_data.undo()
+        self.assertFalse(self.app_data.has_unsaved_changes())
+        self.app_data.undo()
+        self.assertTrue(self.app_data.has_unsaved_changes())
+        self.app_data.redo()
+        self.assertFalse(self.app_data.has_unsaved_changes())
+        self.app_data.redo()
+        self.assertTrue(self.app_data.has_unsaved_changes())
+
+    def test_reverted_operations_can_be_redone(self):
+        group = self.app_data.add_group('Work')
+        self.app_data.save_group_data()
+        self.app_data.add_entries(group.id, [('/docs/a.txt', AppData.ENTRY_OTHER_FILE)])
+        self.app_data.rename_group(group.id, 'Job')
+        self.app_data.revert_changes()
+        self.assertEqual(self.get_groups(), [('Work', [])])
+        self.app_data.redo()
+        self.app_data.redo()
+        self.assertEqual(self.get_groups(), [('Job', ['/docs/a.txt'])])
+        self.app_data.save_group_data()
+        self.assertEqual(self.get_saved_groups(), [('Job', ['/docs/a.txt'])])
+
+
+if __name__ == '__main__':
+    unittest.main()
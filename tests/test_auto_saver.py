@@ -0,0 +1,62 @@
+import os
+import queue
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from omf import AppData, AutoSaver
+
+
+class AutoSaverTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.app_data = self.create_app_data()
+        self.saves = queue.SimpleQueue()
+        self.auto_saver = AutoSaver(self.app_data.save_group_data, lambda requested, error: self.saves.put(error), debounce_s=0.05)
+        self.app_data.on_change_actions.append(self.auto_saver.notify_changed)
+
+    def tearDown(self) -> None:
+        self.auto_saver.stop()
+        self.temp_dir.cleanup()
+
+    def create_app_data(self) -> AppData:
+        app_data = AppData(os.path.join(self.temp_dir.name, 'groups.json'), os.path.join(self.temp_dir.name, 'settings.json'))
+        app_data.load_settings()
+        app_data.load_groups_data()
+        return app_data
+
+    def test_changes_are_saved_after_the_debounce_window(self):
+        self.auto_saver.set_enabled(True)
+        self.app_data.add_group('Work')
+        self.assertIsNone(self.saves.get(timeout=5))
+        self.assertFalse(self.app_data.has_unsaved_changes())
+        self.assertEqual([group.name for group in self.create_app_data().groups_data.values()], ['Work'])
+
+    def test_a_failed_auto_save_stays_pending_until_flushed(self):
+        # The journal can't be opened for appending while a directory is in its place.
+        os.makedirs(self.app_data.journal_path)
+        self.auto_saver.set_enabled(True)
+        group = self.app_data.add_group('Work')
+        self.app_data.add_entries(group.id, [('/docs/a.txt', AppData.ENTRY_OTHER_FILE)])
+        self.assertIsInstance(self.saves.get(timeout=5), OSError)
+        self.assertTrue(self.app_data.has_unsaved_changes())
+        self.auto_saver.set_enabled(False)
+        self.assertFalse(self.auto_saver.flush(timeout=5))
+        os.rmdir(self.app_data.journal_path)
+        self.assertTrue(self.auto_saver.flush(timeout=5))
+        self.assertFalse(self.app_data.has_unsaved_changes())
+        saved_groups = list(self.create_app_data().groups_data.values())
+        self.assertEqual([(group.name, [entry.path for entry in group.entries]) for group in saved_groups], [('Work', ['/docs/a.txt'])])
+
+    def test_flush_fails_once_stopped(self):
+        self.app_data.add_group('Work')
+        self.auto_saver.stop()
+        self.assertFalse(self.auto_saver.flush(timeout=1))
+        self.assertTrue(self.app_data.has_unsaved_changes())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import os
+import subprocess
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from omf import BrowserLauncher
+
+
+class RecordingBrowserLauncher(BrowserLauncher):
+    """A browser launcher which records the browser invocations instead of starting processes."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.spawned = []
+        self.waited = []
+        self.failing_chunks = set()
+
+    def spawn(self, urls, browser_path=None):
+        self.spawned.append((browser_path, list(urls)))
+        if len(self.spawned) - 1 in self.failing_chunks:
+            raise OSError('The browser could not be started')
+        return len(self.spawned) - 1
+
+    def wait_until_ready(self, process) -> bool:
+        self.waited.append(process)
+        return True
+
+
+class BrowserLauncherTest(unittest.TestCase):
+
+    def test_split_in_chunks_keeps_the_command_lines_under_the_limit(self):
+        launcher = BrowserLauncher('browser', max_command_line_length=60)
+        urls = [f'https://example.com/{index}' for index in range(10)]
+        chunks = launcher.split_in_chunks(urls)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual([url for chunk in chunks for url in chunk], urls)
+        for chunk in chunks:
+            self.assertLessEqual(len(subprocess.list2cmdline(['browser', *chunk])), launcher.max_command_line_length)
+
+    def test_split_in_chunks_fills_a_single_chunk_when_possible(self):
+        launcher = BrowserLauncher('browser')
+        urls = [f'https://example.com/{index}' for index in range(100)]
+        self.assertEqual(launcher.split_in_chunks(urls), [urls])
+
+    def test_split_in_chunks_gives_a_too_long_url_its_own_chunk(self):
+        launcher = BrowserLauncher('browser', max_command_line_length=40)
+        long_url = 'https://example.com/' + 'a' * 100
+        chunks = launcher.split_in_chunks(['https://a.com', long_url, 'https://b.com'])
+        self.assertEqual(chunks, [['https://a.com'], [long_url], ['https://b.com']])
+
+    def test_split_in_chunks_counts_the_quoting(self):
+        launcher = BrowserLauncher('browser', max_command_line_length=len(subprocess.list2cmdline(['browser', 'https://a.com/x y'])))
+        chunks = launcher.split_in_chunks(['https://a.com/x y', 'https://b.com'])
+        self.assertEqual(chunks, [['https://a.com/x y'], ['https://b.com']])
+
+    def test_open_pages_waits_for_the_first_browser_only(self):
+        launcher = RecordingBrowserLauncher('browser', max_command_line_length=60)
+        urls = [f'https://example.com/{index}' for index in range(10)]
+        launched_chunks = []
+        self.assertTrue(launcher.open_pages(urls, lambda chunk, launched: launched_chunks.append((chunk, launched))))
+        self.assertEqual([urls for _, urls in launcher.spawned], launcher.split_in_chunks(urls))
+        self.assertEqual(launched_chunks, [(urls, True) for _, urls in launcher.spawned])
+        self.assertEqual(launcher.waited, [0])
+
+    def test_open_pages_does_not_wait_for_a_single_chunk(self):
+        launcher = RecordingBrowserLauncher('browser')
+        self.assertTrue(launcher.open_pages(['https://a.com', 'https://b.com']))
+        self.assertEqual(launcher.spawned, [('browser', ['https://a.com', 'https://b.com'])])
+        self.assertEqual(launcher.waited, [])
+
+    def test_open_pages_reports_the_failed_chunks(self):
+        launcher = RecordingBrowserLauncher('browser', max_command_line_length=30)
+        launcher.failing_chunks.add(0)
+        launched_chunks = []
+        self.assertFalse(launcher.open_pages(['https://a.com', 'https://b.com'], lambda chunk, launched: launched_chunks.append((chunk, launched))))
+        self.assertEqual(launched_chunks, [(['https://a.com'], False), (['https://b.com'], True)])
+        # The next chunks are not delayed when the first browser could not be started.
+        self.assertEqual(launcher.waited, [])
+
+    def test_open_pages_resolves_the_browser_each_time(self):
+        browser_paths = ['first-browser', 'second-browser']
+        launcher = RecordingBrowserLauncher(resolve_browser_path=lambda: browser_paths[len(launcher.spawned)])
+        launcher.open_pages(['https://a.com'])
+        launcher.open_pages(['https://b.com'])
+        self.assertEqual(launcher.spawned, [('first-browser', ['https://a.com']), ('second-browser', ['https://b.com'])])
+
+    def test_open_pages_fails_all_pages_without_a_browser(self):
+        def resolve_browser_path():
+            raise OSError('The default browser is not known')
+
+        launcher = RecordingBrowserLauncher(resolve_browser_path=resolve_browser_path)
+        launched_chunks = []
+        self.assertFalse(launcher.open_pages(['https://a.com', 'https://b.com'], lambda chunk, launched: launched_chunks.append((chunk, launched))))
+        self.assertEqual(launched_chunks, [(['https://a.com', 'https://b.com'], False)])
+        self.assertEqual(launcher.spawned, [])
+
+    def test_open_pages_with_a_fake_browser_process(self):
+        # Any program which accepts the URLs as arguments can stand for the browser.
+        launcher = BrowserLauncher(sys.executable, ready_timeout_s=10)
+        process = launcher.spawn(['-c', 'pass'])
+        self.assertTrue(launcher.wait_until_ready(process))
+        self.assertEqual(process.returncode, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import json
+import os
+import socket
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import omf
+from omf import InstanceClient, InstanceServer
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'Unix domain sockets are not available')
+class InstanceServerTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.instance_path = os.path.join(self.temp_dir.name, 'instance.json')
+        self.requests = []
+        self.server = InstanceServer(self.instance_path, self.on_request)
+        self.assertTrue(self.server.start())
+
+    def tearDown(self) -> None:
+        self.server.stop()
+        self.temp_dir.cleanup()
+
+    def on_request(self, request) -> dict:
+        self.requests.append(request)
+        return {'ok': True, 'message': f"handled {request['command']}"}
+
+    def test_the_instance_file_points_to_the_socket(self):
+        with open(self.instance_path, 'r') as f:
+            instance = json.load(f)
+        self.assertIsInstance(instance['address'], str)
+        self.assertTrue(os.path.exists(instance['address']))
+        self.assertEqual(os.stat(self.instance_path).st_mode & 0o777, 0o600)
+        self.assertEqual(os.stat(instance['address']).st_mode & 0o777, 0o600)
+
+    def test_ping_is_answered_by_the_server(self):
+        client = InstanceClient(self.instance_path)
+        self.assertEqual(client.send(InstanceServer.COMMAND_PING), {'ok': True, 'message': 'pong'})
+        self.assertTrue(client.is_instance_running())
+        self.assertEqual(self.requests, [])
+
+    def test_commands_are_passed_with_their_arguments(self):
+        response = InstanceClient(self.instance_path).send(InstanceServer.COMMAND_OPEN_GROUP, group_name='Work')
+        self.assertEqual(response, {'ok': True, 'message': 'handled open_group'})
+        self.assertEqual(len(self.requests), 1)
+        self.assertEqual(self.requests[0]['command'], InstanceServer.COMMAND_OPEN_GROUP)
+        self.assertEqual(self.requests[0]['group_name'], 'Work')
+
+    def test_a_request_with_a_wrong_token_is_refused(self):
+        with open(self.instance_path, 'r') as f:
+            instance = json.load(f)
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+            connection.settimeout(5)
+            connection.connect(instance['address'])
+            connection.sendall(json.dumps({'token': 'wrong', 'command': InstanceServer.COMMAND_RELOAD}).encode('utf-8') + b'\n')
+            with connection.makefile('rb') as f:
+                response = json.loads(f.readline())
+        self.assertEqual(response, {'ok': False, 'error': 'Invalid token.'})
+        self.assertEqual(self.requests, [])
+
+    def test_a_second_instance_does_not_start(self):
+        other_server = InstanceServer(self.instance_path, self.on_request)
+        self.assertFalse(other_server.start())
+        other_server.stop()
+        self.assertTrue(InstanceClient(self.instance_path).is_instance_running())
+
+    def test_stop_removes_the_instance_files(self):
+        with open(self.instance_path, 'r') as f:
+            socket_path = json.load(f)['address']
+        self.server.stop()
+        self.assertFalse(os.path.exists(self.instance_path))
+        self.assertFalse(os.path.exists(socket_path))
+        client = InstanceClient(self.instance_path, timeout_s=1)
+        self.assertFalse(client.is_instance_running())
+        with self.assertRaises(ConnectionError):
+            client.send(InstanceServer.COMMAND_SHOW_WINDOW)
+
+    def test_a_socket_left_by_a_stopped_instance_is_replaced(self):
+        with open(self.instance_path, 'r') as f:
+            socket_path = json.load(f)['address']
+        self.server.stop()
+        # A closed socket which was not removed, as left by an instance which was killed.
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as stale_socket:
+            stale_socket.bind(socket_path)
+        self.assertTrue(os.path.exists(socket_path))
+        self.server = InstanceServer(self.instance_path, self.on_request)
+        self.assertTrue(self.server.start())
+        self.assertEqual(InstanceClient(self.instance_path).send(InstanceServer.COMMAND_RELOAD)['message'], 'handled reload')
+
+
+@unittest.skipUnless(hasattr(socket, 'AF_UNIX'), 'Unix domain sockets are not available')
+class SecondInstanceTest(unittest.TestCase):
+
+    def test_an_instance_started_meanwhile_keeps_the_ownership(self):
+        requests = []
+        with tempfile.TemporaryDirectory() as data_dir, mock.patch.dict(os.environ, {'LOCALAPPDATA': data_dir}), \
+                mock.patch.object(sys, 'argv', ['omf.py']), mock.patch.object(omf, 'import_gui_modules') as import_gui_modules:
+            server = InstanceServer(omf.get_instance_path(), lambda request: requests.append(request['command']) or {'ok': True, 'message': ''})
+            send = InstanceClient.send
+            sent_commands = []
+
+            def send_after_other_instance_started(client, command, **arguments):
+                sent_commands.append(command)
+                # The other instance starts right after the first check made by this one.
+                if len(sent_commands) == 1:
+                    server.start()
+                    raise ConnectionError('No running instance responded')
+                return send(client, command, **arguments)
+
+            try:
+                with mock.patch.object(InstanceClient, 'send', send_after_other_instance_started):
+                    omf.main()
+            finally:
+                server.stop()
+        self.assertEqual(requests, [InstanceServer.COMMAND_SHOW_WINDOW])
+        import_gui_modules.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
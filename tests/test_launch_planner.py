@@ -0,0 +1,143 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from omf import AppData, BrowserLauncher, Entry, FakeLauncherBackend, GroupOpener, GroupOpening, LaunchPlanner, LaunchTelemetry, LinuxLauncherBackend
+
+
+class LaunchPlannerTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.backend = FakeLauncherBackend()
+        self.planner = LaunchPlanner(self.backend)
+        self.entries = [
+            Entry(0, '/docs/b.txt', AppData.ENTRY_OTHER_FILE, None),
+            Entry(1, 'https://example.com', AppData.ENTRY_WEB_PAGE, None),
+            Entry(2, '/docs/a.TXT', AppData.ENTRY_OTHER_FILE, None),
+            Entry(3, '/bin/tool.exe', AppData.ENTRY_EXE_FILE, None),
+            Entry(4, '/docs/c.pdf', AppData.ENTRY_OTHER_FILE, None)
+        ]
+
+    def test_the_plan_keeps_the_order_of_the_entries(self):
+        plan = self.planner.get_plan(0, self.entries)
+        self.assertEqual([entry for entry, _ in plan], self.entries)
+        self.assertEqual([handler for _, handler in plan], ['.txt', None, '.txt', 'executable', '.pdf'])
+
+    def test_a_handler_is_resolved_once_per_association_key(self):
+        self.planner.get_plan(0, self.entries)
+        self.assertEqual([entry.id for entry in self.backend.resolved_entries], [0, 3, 4])
+        self.assertEqual(self.planner.resolved_handlers_count, 3)
+
+    def test_opening_the_group_again_uses_the_plan(self):
+        first_plan = self.planner.get_plan(0, self.entries)
+        self.backend.resolved_entries.clear()
+        self.assertEqual(self.planner.get_plan(0, self.entries), first_plan)
+        self.assertEqual(self.backend.resolved_entries, [])
+
+    def test_the_handlers_are_shared_between_groups(self):
+        self.planner.get_plan(0, self.entries)
+        self.backend.resolved_entries.clear()
+        self.planner.get_plan(1, [Entry(0, '/other/d.txt', AppData.ENTRY_OTHER_FILE, None)])
+        self.assertEqual(self.backend.resolved_entries, [])
+
+    def test_a_changed_association_is_resolved_again(self):
+        self.planner.get_plan(0, self.entries)
+        self.backend.resolved_entries.clear()
+        self.backend.association_versions['.txt'] = 2
+        plan = self.planner.get_plan(0, self.entries)
+        self.assertEqual([entry.id for entry in self.backend.resolved_entries], [0])
+        self.assertEqual([handler for _, handler in plan], ['.txt', None, '.txt', 'executable', '.pdf'])
+        self.backend.resolved_entries.clear()
+        self.planner.get_plan(0, self.entries)
+        self.assertEqual(self.backend.resolved_entries, [])
+
+    def test_a_changed_entry_is_planned_again(self):
+        self.planner.get_plan(0, self.entries)
+        changed_entry = self.entries[4].with_changes(path='/docs/c.odt')
+        self.backend.resolved_entries.clear()
+        plan = self.planner.get_plan(0, [*self.entries[:4], changed_entry])
+        self.assertEqual(self.backend.resolved_entries, [changed_entry])
+        self.assertEqual(plan[4], (changed_entry, '.odt'))
+
+    def test_the_removed_entries_are_dropped_from_the_plan(self):
+        self.planner.get_plan(0, self.entries)
+        self.planner.get_plan(0, self.entries[:1])
+        # The dropped entries are planned again, but the handlers are kept by association key, so only the changed one is resolved.
+        self.backend.association_versions['.pdf'] = 2
+        self.backend.resolved_entries.clear()
+        self.planner.get_plan(0, self.entries)
+        self.assertEqual([entry.id for entry in self.backend.resolved_entries], [4])
+
+    def test_the_plans_of_the_dropped_groups_are_planned_again(self):
+        self.planner.get_plan(0, self.entries)
+        self.planner.get_plan(1, self.entries)
+        self.planner.keep_plans({1})
+        with mock.patch.object(self.backend, 'get_association_key', wraps=self.backend.get_association_key) as get_association_key:
+            self.planner.get_plan(1, self.entries)
+            self.assertEqual(get_association_key.call_count, 0)
+            self.planner.get_plan(0, self.entries)
+            self.assertEqual(get_association_key.call_count, len(self.entries))
+
+    def test_the_browser_path_is_cached_until_the_association_changes(self):
+        self.assertEqual(self.planner.get_browser_path(), 'fake-browser')
+        self.backend.browser_path = 'other-browser'
+        self.assertEqual(self.planner.get_browser_path(), 'fake-browser')
+        self.backend.association_versions[FakeLauncherBackend.ASSOCIATION_WEB_BROWSER] = 2
+        self.assertEqual(self.planner.get_browser_path(), 'other-browser')
+
+
+class GroupOpenerOrderTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.entries = []
+        for index, name in enumerate(('fast.txt', 'unknown.txt', 'slow.txt', 'medium.txt')):
+            path = os.path.join(self.temp_dir.name, name)
+            with open(path, 'w'):
+                pass
+            self.entries.append(Entry(index, path, AppData.ENTRY_OTHER_FILE, None))
+        self.backend = FakeLauncherBackend()
+        self.telemetry = LaunchTelemetry(os.path.join(self.temp_dir.name, 'launch_stats.json'))
+        for name, spawn_ms in (('fast.txt', 10), ('slow.txt', 1000), ('medium.txt', 100)):
+            self.telemetry.record_spawn(os.path.join(self.temp_dir.name, name), spawn_ms)
+
+    def tearDown(self) -> None:
+        self.temp_dir.cleanup()
+
+    def open_group(self, slowest_first) -> list:
+        launch_planner = LaunchPlanner(self.backend)
+        opener = GroupOpener(BrowserLauncher(resolve_browser_path=launch_planner.get_browser_path), launch_planner,
+                             max_workers=1, launch_telemetry=self.telemetry, slowest_first=slowest_first)
+        opening = opener.open(0, 'Work', self.entries)
+        self.assertTrue(opening.wait(10))
+        self.assertEqual(opening.get_progress()[GroupOpening.RESULT_LAUNCHED], len(self.entries))
+        return [os.path.basename(file_path) for file_path, _ in self.backend.launched_files]
+
+    def test_the_files_are_launched_in_the_stored_order(self):
+        self.assertEqual(self.open_group(slowest_first=False), ['fast.txt', 'unknown.txt', 'slow.txt', 'medium.txt'])
+
+    def test_the_slowest_files_are_launched_first(self):
+        # The files which were not launched yet keep their order, after the others.
+        self.assertEqual(self.open_group(slowest_first=True), ['slow.txt', 'medium.txt', 'fast.txt', 'unknown.txt'])
+
+
+class LinuxStartAtLoginTest(unittest.TestCase):
+
+    def test_the_autostart_entry_is_written_and_removed(self):
+        with tempfile.TemporaryDirectory() as config_home, mock.patch.dict(os.environ, {'XDG_CONFIG_HOME': config_home}):
+            backend = LinuxLauncherBackend()
+            desktop_path = os.path.join(config_home, 'autostart', f'{LinuxLauncherBackend.APP_NAME}.desktop')
+            backend.set_start_at_login(('/usr/bin/python3', '/opt/my "files"/omf.py'))
+            with open(desktop_path, 'r', encoding='utf-8') as f:
+                self.assertIn('Exec="/usr/bin/python3" "/opt/my \\"files\\"/omf.py"\n', f.read())
+            backend.set_start_at_login(None)
+            self.assertFalse(os.path.exists(desktop_path))
+            backend.set_start_at_login(None)
+
+
+if __name__ == '__main__':
+    unittest.main()
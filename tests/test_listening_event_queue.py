@@ -0,0 +1,75 @@
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from omf import ListeningEventQueue
+
+
+class ListeningEventQueueTest(unittest.TestCase):
+
+    def setUp(self) -> None:
+        self.batch_ready = threading.Event()
+        self.ready_count = 0
+        self.queue = ListeningEventQueue(self.on_batch_ready, batch_window_ms=50, max_queue_depth=3)
+
+    def on_batch_ready(self) -> None:
+        self.ready_count += 1
+        self.batch_ready.set()
+
+    def test_only_the_net_change_of_a_path_is_kept(self):
+        self.queue.push_created('/dir', '/dir/a.txt')
+        self.queue.push_deleted('/dir', '/dir/a.txt')
+        self.queue.push_deleted('/dir', '/dir/b.txt')
+        self.queue.push_created('/dir', '/dir/b.txt')
+        self.assertEqual(self.queue.take_batch(), [('/dir', '/dir/a.txt', False, None), ('/dir', '/dir/b.txt', True, None)])
+
+    def test_repeated_moves_are_a_single_move(self):
+        self.queue.push_moved('/dir', '/dir/a.txt', '/dir/b.txt')
+        self.queue.push_moved('/dir', '/dir/b.txt', '/dir/c.txt')
+        self.assertEqual(self.queue.take_batch(), [
+            ('/dir', '/dir/c.txt', True, '/dir/a.txt'),
+            ('/dir', '/dir/a.txt', False, None),
+            ('/dir', '/dir/b.txt', False, None)
+        ])
+
+    def test_a_moved_file_which_is_deleted_is_gone_from_its_first_path(self):
+        self.queue.push_moved('/dir', '/dir/a.txt', '/dir/b.txt')
+        self.queue.push_deleted('/dir', '/dir/b.txt')
+        self.assertEqual(self.queue.take_batch(), [('/dir', '/dir/a.txt', False, None), ('/dir', '/dir/b.txt', False, None)])
+
+    def test_the_paths_are_kept_by_scope(self):
+        self.queue.push_created('/dir', '/dir/a.txt')
+        self.queue.push_deleted('/other', '/dir/a.txt')
+        self.assertEqual(self.queue.take_batch(), [('/other', '/dir/a.txt', False, None), ('/dir', '/dir/a.txt', True, None)])
+
+    def test_the_batch_is_ready_once_after_the_batch_window(self):
+        self.queue.push_created('/dir', '/dir/a.txt')
+        self.queue.push_created('/dir', '/dir/b.txt')
+        self.assertTrue(self.batch_ready.wait(5))
+        self.queue.push_created('/dir', '/dir/c.txt')
+        self.assertEqual(self.ready_count, 1)
+        self.assertEqual(len(self.queue.take_batch()), 3)
+        self.assertEqual(self.queue.get_metrics()['batches_taken'], 1)
+
+    def test_a_full_queue_is_ready_at_once(self):
+        self.queue.batch_window_ms = 60 * 1000
+        for name in ('a.txt', 'b.txt', 'c.txt'):
+            self.queue.push_created('/dir', f'/dir/{name}')
+        self.assertTrue(self.batch_ready.is_set())
+        self.assertEqual(self.queue.get_metrics()['full_queue_flushes'], 1)
+        self.queue.take_batch()
+
+    def test_the_merged_events_are_counted(self):
+        self.queue.push_created('/dir', '/dir/a.txt')
+        self.queue.push_deleted('/dir', '/dir/a.txt')
+        self.queue.push_created('/dir', '/dir/a.txt')
+        self.queue.take_batch()
+        metrics = self.queue.get_metrics()
+        self.assertEqual((metrics['events_received'], metrics['events_merged'], metrics['last_batch_size']), (3, 2, 1))
+
+
+if __name__ == '__main__':
+    unittest.main()